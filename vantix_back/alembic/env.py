@@ -16,7 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.core.database import Base
 
 # 3. IMPORTANTE: Importamos TODOS los archivos de modelos
-from app.models import clientes, plan, visita, finanzas, kpi, crm, empleado, geo
+from app.models import clientes, plan, visita, finanzas, kpi, crm, empleado, geo, archivos, importacion, catalogo
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,30 @@
+"""add_registro_visitas_listing_indexes
+
+Revision ID: 009eb7da5c82
+Revises: bf5894163b73
+Create Date: 2026-10-18 11:02:41.517830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009eb7da5c82'
+down_revision: Union[str, Sequence[str], None] = 'bf5894163b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_registro_visitas_cliente_checkin', 'registro_visitas', ['id_cliente', 'fecha_hora_checkin', 'id_visita'], unique=False)
+    op.create_index('ix_registro_visitas_plan_checkin', 'registro_visitas', ['id_plan', 'fecha_hora_checkin'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_registro_visitas_plan_checkin', table_name='registro_visitas')
+    op.drop_index('ix_registro_visitas_cliente_checkin', table_name='registro_visitas')
@@ -0,0 +1,30 @@
+"""add_coincidencias_ambiguas_to_trabajos_importacion
+
+Revision ID: 3c91d5e07b2a
+Revises: a6f82e89c82f
+Create Date: 2026-10-18 15:02:41.187305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c91d5e07b2a'
+down_revision: Union[str, Sequence[str], None] = 'a6f82e89c82f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('trabajos_importacion', sa.Column('coincidencias_ambiguas', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'[]'::jsonb"), nullable=False))
+    op.alter_column('trabajos_importacion', 'coincidencias_ambiguas', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trabajos_importacion', 'coincidencias_ambiguas')
@@ -0,0 +1,46 @@
+"""set_fecha_hora_checkin_not_null
+
+Revision ID: 5b8c1e3f9a20
+Revises: 7d2e4b9a1f63
+Create Date: 2026-10-19 09:12:33.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8c1e3f9a20'
+down_revision: Union[str, Sequence[str], None] = '7d2e4b9a1f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # El historial de visitas pagina por (fecha_hora_checkin, id_visita): una fecha NULL quedaría fuera del cursor.
+    # Las visitas sin fecha toman el inicio de la semana de su plan (no la fecha de hoy: no deben saltar al
+    # inicio de los listados "más recientes primero" ni caer en la semana actual de los KPI)
+    op.execute(
+        "UPDATE registro_visitas v SET fecha_hora_checkin = p.fecha_inicio_semana "
+        "FROM plan_trabajo_semanal p "
+        "WHERE v.id_plan = p.id_plan AND v.fecha_hora_checkin IS NULL"
+    )
+    # Sin plan no hay fecha asociada a la visita: se usa la más antigua posible para que quede al final
+    op.execute(
+        "UPDATE registro_visitas SET fecha_hora_checkin = TIMESTAMPTZ 'epoch' WHERE fecha_hora_checkin IS NULL"
+    )
+    op.alter_column('registro_visitas', 'fecha_hora_checkin',
+               existing_type=sa.DateTime(timezone=True),
+               nullable=False,
+               existing_server_default=sa.text('CURRENT_TIMESTAMP'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('registro_visitas', 'fecha_hora_checkin',
+               existing_type=sa.DateTime(timezone=True),
+               nullable=True,
+               existing_server_default=sa.text('CURRENT_TIMESTAMP'))
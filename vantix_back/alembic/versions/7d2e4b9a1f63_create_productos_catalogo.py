@@ -0,0 +1,54 @@
+"""create_productos_catalogo
+
+Revision ID: 7d2e4b9a1f63
+Revises: 3c91d5e07b2a
+Create Date: 2026-10-18 16:40:12.518903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e4b9a1f63'
+down_revision: Union[str, Sequence[str], None] = '3c91d5e07b2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Índices trigram para la búsqueda parcial (ILIKE '%texto%') del cotizador
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_table('productos_catalogo',
+    sa.Column('id_producto', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('codigo', sa.String(length=100), nullable=True),
+    sa.Column('nombre', sa.Text(), nullable=True),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('marca', sa.String(length=255), nullable=True),
+    sa.Column('modelo', sa.String(length=255), nullable=True),
+    sa.Column('ecom_precio', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('hash_origen', sa.String(length=32), nullable=False),
+    sa.Column('fecha_sincronizacion', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('id_producto')
+    )
+    op.create_index('ix_productos_catalogo_nombre_trgm', 'productos_catalogo', ['nombre'], unique=False, postgresql_using='gin', postgresql_ops={'nombre': 'gin_trgm_ops'})
+    op.create_index('ix_productos_catalogo_codigo_trgm', 'productos_catalogo', ['codigo'], unique=False, postgresql_using='gin', postgresql_ops={'codigo': 'gin_trgm_ops'})
+    op.create_table('sincronizaciones_catalogo',
+    sa.Column('catalogo', sa.String(length=50), nullable=False),
+    sa.Column('fecha_ultima_exitosa', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('fecha_ultimo_intento', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('ultimo_error', sa.Text(), nullable=True),
+    sa.Column('total_registros', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('catalogo')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sincronizaciones_catalogo')
+    op.drop_index('ix_productos_catalogo_codigo_trgm', table_name='productos_catalogo', postgresql_using='gin', postgresql_ops={'codigo': 'gin_trgm_ops'})
+    op.drop_index('ix_productos_catalogo_nombre_trgm', table_name='productos_catalogo', postgresql_using='gin', postgresql_ops={'nombre': 'gin_trgm_ops'})
+    op.drop_table('productos_catalogo')
@@ -0,0 +1,58 @@
+"""create_trabajos_importacion
+
+Revision ID: a6f82e89c82f
+Revises: 009eb7da5c82
+Create Date: 2026-10-18 12:14:06.301954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f82e89c82f'
+down_revision: Union[str, Sequence[str], None] = '009eb7da5c82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trabajos_importacion',
+    sa.Column('id_trabajo', sa.Integer(), nullable=False),
+    sa.Column('id_empleado', sa.Integer(), nullable=True),
+    sa.Column('nombre_archivo', sa.String(length=255), nullable=False),
+    sa.Column('ruta_archivo', sa.Text(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('actualizar_existentes', sa.Boolean(), nullable=False),
+    sa.Column('estado', sa.Enum('Pendiente', 'Procesando', 'Completado', 'Fallido', name='estado_importacion_enum'), nullable=False),
+    sa.Column('hojas_total', sa.Integer(), nullable=True),
+    sa.Column('hojas_procesadas', sa.Integer(), nullable=False),
+    sa.Column('filas_procesadas', sa.Integer(), nullable=False),
+    sa.Column('registros_insertados', sa.Integer(), nullable=False),
+    sa.Column('registros_actualizados', sa.Integer(), nullable=False),
+    sa.Column('registros_omitidos', sa.Integer(), nullable=False),
+    sa.Column('hojas_leidas', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('errores', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('fecha_creacion', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.Column('fecha_inicio', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('fecha_actualizacion', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('fecha_fin', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['id_empleado'], ['empleados.id_empleado'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id_trabajo')
+    )
+    op.create_index(op.f('ix_trabajos_importacion_id_trabajo'), 'trabajos_importacion', ['id_trabajo'], unique=False)
+    op.create_index('ix_trabajos_importacion_estado_creacion', 'trabajos_importacion', ['estado', 'fecha_creacion'], unique=False)
+    op.create_index('ix_trabajos_importacion_sha256', 'trabajos_importacion', ['sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trabajos_importacion_sha256', table_name='trabajos_importacion')
+    op.drop_index('ix_trabajos_importacion_estado_creacion', table_name='trabajos_importacion')
+    op.drop_index(op.f('ix_trabajos_importacion_id_trabajo'), table_name='trabajos_importacion')
+    op.drop_table('trabajos_importacion')
+    sa.Enum(name='estado_importacion_enum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,73 @@
+"""create_archivos_evidencia
+
+Revision ID: bf5894163b73
+Revises: c54faaf39216
+Create Date: 2026-10-18 09:41:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bf5894163b73'
+down_revision: Union[str, Sequence[str], None] = 'c54faaf39216'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('archivos_evidencia',
+    sa.Column('id_archivo', sa.Integer(), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('url_miniatura', sa.Text(), nullable=True),
+    sa.Column('id_empleado', sa.Integer(), nullable=True),
+    sa.Column('tipo_actividad', sa.String(length=50), nullable=True),
+    sa.Column('tipo_registro', sa.String(length=20), nullable=True),
+    sa.Column('id_registro', sa.Integer(), nullable=True),
+    sa.Column('nombre_original', sa.String(length=255), nullable=True),
+    sa.Column('tamano_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.ForeignKeyConstraint(['id_empleado'], ['empleados.id_empleado'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id_archivo')
+    )
+    op.create_index(op.f('ix_archivos_evidencia_id_archivo'), 'archivos_evidencia', ['id_archivo'], unique=False)
+    op.create_index(op.f('ix_archivos_evidencia_url'), 'archivos_evidencia', ['url'], unique=False)
+    op.create_index(op.f('ix_archivos_evidencia_sha256'), 'archivos_evidencia', ['sha256'], unique=False)
+    op.create_index('ix_archivos_evidencia_galeria', 'archivos_evidencia', ['id_empleado', 'tipo_actividad', 'fecha_creacion', 'id_archivo'], unique=False)
+    op.create_index('ix_archivos_evidencia_registro', 'archivos_evidencia', ['tipo_registro', 'id_registro'], unique=False)
+
+    # Indexar las evidencias ya existentes (sin tamaño, hash ni miniatura)
+    for columna in ('url_foto_lugar', 'url_foto_sello'):
+        op.execute(f"""
+            INSERT INTO archivos_evidencia (url, id_empleado, tipo_actividad, tipo_registro, id_registro, fecha_creacion)
+            SELECT v.{columna}, p.id_empleado, 'Visita', 'visita', v.id_visita, COALESCE(v.fecha_hora_checkin, CURRENT_TIMESTAMP)
+            FROM registro_visitas v
+            JOIN plan_trabajo_semanal p ON p.id_plan = v.id_plan
+            WHERE v.{columna} IS NOT NULL
+        """)
+    for tabla, pk, actividad, registro in (
+        ('registro_auditoria_llamadas', 'id_llamada', 'Llamada', 'llamada'),
+        ('registro_auditoria_emails', 'id_email', 'Correo', 'email'),
+    ):
+        op.execute(f"""
+            INSERT INTO archivos_evidencia (url, id_empleado, tipo_actividad, tipo_registro, id_registro, fecha_creacion)
+            SELECT r.url_foto_prueba, p.id_empleado, '{actividad}', '{registro}', r.{pk}, COALESCE(r.fecha_hora, CURRENT_TIMESTAMP)
+            FROM {tabla} r
+            JOIN plan_trabajo_semanal p ON p.id_plan = r.id_plan
+            WHERE r.url_foto_prueba IS NOT NULL
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_archivos_evidencia_registro', table_name='archivos_evidencia')
+    op.drop_index('ix_archivos_evidencia_galeria', table_name='archivos_evidencia')
+    op.drop_index(op.f('ix_archivos_evidencia_sha256'), table_name='archivos_evidencia')
+    op.drop_index(op.f('ix_archivos_evidencia_url'), table_name='archivos_evidencia')
+    op.drop_index(op.f('ix_archivos_evidencia_id_archivo'), table_name='archivos_evidencia')
+    op.drop_table('archivos_evidencia')
@@ -0,0 +1,50 @@
+"""create_cola_subidas_remotas
+
+Revision ID: c54faaf39216
+Revises: 0866c578c0ba
+Create Date: 2026-10-18 09:30:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c54faaf39216'
+down_revision: Union[str, Sequence[str], None] = '0866c578c0ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cola_subidas_remotas',
+    sa.Column('id_subida', sa.Integer(), nullable=False),
+    sa.Column('ruta_local', sa.Text(), nullable=False),
+    sa.Column('url_local', sa.Text(), nullable=False),
+    sa.Column('nombre_remoto', sa.String(length=255), nullable=False),
+    sa.Column('nombre_empleado', sa.String(length=150), nullable=False),
+    sa.Column('tipo_actividad', sa.String(length=50), nullable=False),
+    sa.Column('estado', sa.Enum('Pendiente', 'Subido', 'Fallido', name='estado_subida_enum'), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('proximo_intento', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.Column('ultimo_error', sa.Text(), nullable=True),
+    sa.Column('url_remota', sa.Text(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.Column('fecha_subida', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id_subida')
+    )
+    op.create_index(op.f('ix_cola_subidas_remotas_id_subida'), 'cola_subidas_remotas', ['id_subida'], unique=False)
+    op.create_index(op.f('ix_cola_subidas_remotas_url_local'), 'cola_subidas_remotas', ['url_local'], unique=False)
+    op.create_index('ix_cola_subidas_remotas_estado_proximo', 'cola_subidas_remotas', ['estado', 'proximo_intento'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cola_subidas_remotas_estado_proximo', table_name='cola_subidas_remotas')
+    op.drop_index(op.f('ix_cola_subidas_remotas_url_local'), table_name='cola_subidas_remotas')
+    op.drop_index(op.f('ix_cola_subidas_remotas_id_subida'), table_name='cola_subidas_remotas')
+    op.drop_table('cola_subidas_remotas')
+    sa.Enum(name='estado_subida_enum').drop(op.get_bind(), checkfirst=True)
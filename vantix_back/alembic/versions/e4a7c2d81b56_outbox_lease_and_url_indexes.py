@@ -0,0 +1,42 @@
+"""outbox_lease_and_url_indexes
+
+Revision ID: e4a7c2d81b56
+Revises: 5b8c1e3f9a20
+Create Date: 2026-10-19 10:41:07.218554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d81b56'
+down_revision: Union[str, Sequence[str], None] = '5b8c1e3f9a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Subida tomada por un worker (proximo_intento pasa a ser el vencimiento de su lease)
+    op.execute("ALTER TYPE estado_subida_enum ADD VALUE IF NOT EXISTS 'Procesando'")
+
+    # Columnas donde el outbox reemplaza la URL local por la remota
+    op.create_index('ix_registro_visitas_url_foto_lugar', 'registro_visitas', ['url_foto_lugar'], unique=False)
+    op.create_index('ix_registro_visitas_url_foto_sello', 'registro_visitas', ['url_foto_sello'], unique=False)
+    op.create_index(op.f('ix_registro_auditoria_llamadas_url_foto_prueba'), 'registro_auditoria_llamadas', ['url_foto_prueba'], unique=False)
+    op.create_index(op.f('ix_registro_auditoria_emails_url_foto_prueba'), 'registro_auditoria_emails', ['url_foto_prueba'], unique=False)
+    op.create_index(op.f('ix_archivos_evidencia_url_miniatura'), 'archivos_evidencia', ['url_miniatura'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_archivos_evidencia_url_miniatura'), table_name='archivos_evidencia')
+    op.drop_index(op.f('ix_registro_auditoria_emails_url_foto_prueba'), table_name='registro_auditoria_emails')
+    op.drop_index(op.f('ix_registro_auditoria_llamadas_url_foto_prueba'), table_name='registro_auditoria_llamadas')
+    op.drop_index('ix_registro_visitas_url_foto_sello', table_name='registro_visitas')
+    op.drop_index('ix_registro_visitas_url_foto_lugar', table_name='registro_visitas')
+    # PostgreSQL no permite quitar valores de un enum: las subidas en curso vuelven a la cola
+    op.execute("UPDATE cola_subidas_remotas SET estado = 'Pendiente' WHERE estado = 'Procesando'")
@@ -9,6 +9,7 @@ from app import crud, models, schemas
 from app.core import security
 from app.core.config import settings
 from app.core.database import SessionLocal
+from app.services.auth.user_manager import principal_cache
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token"
@@ -23,7 +24,11 @@ def get_db() -> Generator:
 
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> models.empleado.Empleado:
+) -> schemas.EmpleadoPrincipal:
+    """
+    Resuelve el usuario del token. Retorna una copia cacheada de sus datos
+    (no el objeto ORM) para no consultar la BD en cada request.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -34,21 +39,21 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="No se pudo validar las credenciales",
         )
-    user = crud.empleado.get(db, id=token_data.sub)
+    user = principal_cache.get(db, id_empleado=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return user
 
 def get_current_active_user(
-    current_user: models.empleado.Empleado = Depends(get_current_user),
-) -> models.empleado.Empleado:
+    current_user: schemas.EmpleadoPrincipal = Depends(get_current_user),
+) -> schemas.EmpleadoPrincipal:
     if not current_user.activo:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
     return current_user
 
 def get_current_admin_user(
-    current_user: models.empleado.Empleado = Depends(get_current_active_user),
-) -> models.empleado.Empleado:
+    current_user: schemas.EmpleadoPrincipal = Depends(get_current_active_user),
+) -> schemas.EmpleadoPrincipal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1,29 +1,40 @@
-from typing import List
+from datetime import date
+from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from app import crud
+from app import crud, schemas
 from app.api import deps
-from app.models.empleado import Empleado
-from app.services.external.remote_storage import RemoteStorageService
 
 router = APIRouter()
 
-@router.get("/fotos", response_model=List[str])
+@router.get("/fotos", response_model=schemas.GaleriaFotosResponse)
 def listar_fotos_remotas(
     *,
     db: Session = Depends(deps.get_db),
     id_empleado: int = Query(..., description="ID del empleado para buscar sus fotos"),
-    activity_type: str = Query(..., description="Tipo de actividad (Visita, Llamada, Correo)"),
-    current_user: Empleado = Depends(deps.get_current_active_user)
+    activity_type: Optional[str] = Query(None, description="Tipo de actividad (Visita, Llamada, Correo)"),
+    fecha_desde: Optional[date] = Query(None, description="Solo fotos desde esta fecha (inclusive)"),
+    fecha_hasta: Optional[date] = Query(None, description="Solo fotos hasta esta fecha (inclusive)"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` de la página anterior"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user)
 ):
     """
-    Lista las URLs de todas las fotos almacenadas en el hosting para un empleado específico (por ID) y actividad.
-    El sistema busca automáticamente el nombre completo del empleado en la base de datos.
+    Lista las fotos de evidencia de un empleado específico (por ID), de la más reciente a la más antigua.
+    Se sirve desde el índice local `archivos_evidencia` (no consulta el hosting por FTP).
+    Cada foto incluye la URL de su miniatura, para que la galería no descargue los originales.
+    Paginación por cursor: usar `next_cursor` de la respuesta para pedir la siguiente página.
     """
-    # 1. Obtener el empleado de la base de datos para tener su nombre oficial
-    empleado = crud.empleado.get(db, id=id_empleado)
-    if not empleado:
+    if not crud.empleado.get(db, id=id_empleado):
         raise HTTPException(status_code=404, detail="Empleado no encontrado")
-    
-    # 2. Usar su nombre completo para buscar en el storage remoto (con la normalización ya implementada)
-    return RemoteStorageService.list_files(empleado.nombre_completo, activity_type)
+
+    archivos, next_cursor = crud.archivo_evidencia.get_page(
+        db,
+        id_empleado=id_empleado,
+        tipo_actividad=activity_type,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+        cursor=cursor,
+        limit=limit
+    )
+    return {"items": archivos, "next_cursor": next_cursor}
@@ -1,54 +1,76 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core.pagination import set_next_cursor
+from app.services.external.catalogo_productos import CATALOG_SYNCED_AT_HEADER, catalogo_productos
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.CotizacionResponse)
 def crear_cotizacion(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     cotizacion_in: schemas.CotizacionCreate
 ):
     """
     Crear una nueva cotización con sus respectivos detalles (productos).
+    El precio de cada producto (`precio_producto`) se toma de la copia local del catálogo de UpgradeDB;
+    la cabecera X-Catalog-Synced-At indica de qué fecha son esos precios.
     """
     # Validamos que el cliente enviado pertenezca a la cartera o exista
     cliente = crud.cartera.get(db, id=cotizacion_in.id_cliente)
     if not cliente:
          raise HTTPException(status_code=404, detail="El cliente especificado no existe en la cartera")
+
+    # Precios del catálogo en una sola consulta; los productos que no están en él conservan el precio enviado
+    precios = catalogo_productos.precios(db, (detalle.id_producto for detalle in cotizacion_in.detalles))
+    for detalle in cotizacion_in.detalles:
+        if detalle.id_producto in precios:
+            detalle.precio_producto = precios[detalle.id_producto]
+        elif detalle.precio_producto is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"El producto {detalle.id_producto} no está en el catálogo: indica su precio_producto"
+            )
+    sincronizado = catalogo_productos.fecha_sincronizacion(db)
+    if sincronizado:
+        response.headers[CATALOG_SYNCED_AT_HEADER] = sincronizado.isoformat()
          
     # Creamos la cabecera y el detalle utilizando el método especializado del CRUD
     return crud.cotizacion.create_with_details(db=db, obj_in=cotizacion_in, id_empleado=current_user.id_empleado)
 
 @router.get("/", response_model=List[schemas.CotizacionResponse])
 def listar_cotizaciones(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
     id_empleado: Optional[int] = Query(None, description="Filtrar por ID de empleado")
 ):
     """
     Listar cotizaciones. Se puede filtrar por empleado (vendedor).
+    Si hay más páginas, el cursor de la siguiente viene en la cabecera X-Next-Cursor.
     """
-    if id_empleado:
-        return crud.cotizacion.get_multi_by_empleado(db, id_empleado=id_empleado, skip=skip, limit=limit)
-    
     # Si no es admin y no manda filtro, solo ve sus propias cotizaciones
-    if not current_user.is_admin:
-        return crud.cotizacion.get_multi_by_empleado(db, id_empleado=current_user.id_empleado, skip=skip, limit=limit)
-        
-    return crud.cotizacion.get_multi(db, skip=skip, limit=limit)
+    if not id_empleado and not current_user.is_admin:
+        id_empleado = current_user.id_empleado
+
+    filters = {"id_empleado": id_empleado} if id_empleado else None
+    cotizaciones, next_cursor = crud.cotizacion.get_multi_page(db, filters=filters, cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return cotizaciones
 
 @router.get("/{id_cotizacion}", response_model=schemas.CotizacionResponse)
 def obtener_cotizacion(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_cotizacion: int
 ):
     """
@@ -68,7 +90,7 @@ def obtener_cotizacion(
 def actualizar_cotizacion(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_cotizacion: int,
     cotizacion_in: schemas.CotizacionUpdate
 ):
@@ -89,7 +111,7 @@ def actualizar_cotizacion(
 def eliminar_cotizacion(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_cotizacion: int
 ):
     """
@@ -1,8 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query, Response
 from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps
+from app.core.pagination import set_next_cursor
 from app.models.enums import ResultadoEstadoEnum, ResultadoLlamadaEnum
 from app.services.gamificacion.kpi_service import kpi_service
 from app.services.common.file_manager import FileManager
@@ -16,7 +17,7 @@ router = APIRouter()
 async def registrar_llamada(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_plan: int = Form(...),
     id_detalle: Optional[int] = Form(None),
     numero_destino: str = Form(...),
@@ -41,7 +42,9 @@ async def registrar_llamada(
             subdirectory="crm/llamadas", 
             prefix="call",
             employee_name=current_user.nombre_completo,
-            activity_type="Llamada"
+            activity_type="Llamada",
+            db=db,
+            id_empleado=current_user.id_empleado
         )
 
     # 3. Preparar data
@@ -57,6 +60,7 @@ async def registrar_llamada(
     
     # 4. Guardar en DB
     db_obj = crud.llamada.create(db, obj_in=llamada_in)
+    crud.archivo_evidencia.assign_owner(db, urls=[url_foto], tipo_registro="llamada", id_registro=db_obj.id_llamada)
     
     # 4.b. Marcar como realizado en la agenda
     if id_detalle:
@@ -77,15 +81,19 @@ async def registrar_llamada(
 
 @router.get("/llamadas/", response_model=List[schemas.crm.LlamadaResponse])
 def listar_llamadas(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_plan: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 100
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
 ):
-    if id_plan:
-        return crud.llamada.get_multi_by_plan(db, id_plan=id_plan, skip=skip, limit=limit)
-    return crud.llamada.get_multi(db, skip=skip, limit=limit)
+    """Si hay más páginas, el cursor de la siguiente viene en la cabecera X-Next-Cursor."""
+    filters = {"id_plan": id_plan} if id_plan else None
+    llamadas, next_cursor = crud.llamada.get_multi_page(db, filters=filters, cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return llamadas
 
 
 # --- EMAILS ---
@@ -94,7 +102,7 @@ def listar_llamadas(
 async def registrar_email(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_plan: int = Form(...),
     id_detalle: Optional[int] = Form(None),
     email_destino: str = Form(...),
@@ -116,7 +124,9 @@ async def registrar_email(
             subdirectory="crm/emails", 
             prefix="email",
             employee_name=current_user.nombre_completo,
-            activity_type="Correo"
+            activity_type="Correo",
+            db=db,
+            id_empleado=current_user.id_empleado
         )
 
     email_in = schemas.crm.EmailCreate(
@@ -128,6 +138,7 @@ async def registrar_email(
     )
 
     db_obj = crud.email.create(db, obj_in=email_in)
+    crud.archivo_evidencia.assign_owner(db, urls=[url_foto], tipo_registro="email", id_registro=db_obj.id_email)
     
     # Marcar como realizado en la agenda
     if id_detalle:
@@ -148,15 +159,19 @@ async def registrar_email(
 
 @router.get("/emails/", response_model=List[schemas.crm.EmailResponse])
 def listar_emails(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_plan: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 100
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
 ):
-    if id_plan:
-        return crud.email.get_multi_by_plan(db, id_plan=id_plan, skip=skip, limit=limit)
-    return crud.email.get_multi(db, skip=skip, limit=limit)
+    """Si hay más páginas, el cursor de la siguiente viene en la cabecera X-Next-Cursor."""
+    filters = {"id_plan": id_plan} if id_plan else None
+    emails, next_cursor = crud.email.get_multi_page(db, filters=filters, cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return emails
 
 # --- EDITAR Y ELIMINAR ---
 
@@ -164,7 +179,7 @@ def listar_emails(
 def actualizar_llamada(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_llamada: int,
     llamada_in: schemas.crm.LlamadaUpdate
 ):
@@ -177,16 +192,15 @@ def actualizar_llamada(
 def eliminar_llamada(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     id_llamada: int
 ):
     llamada = crud.llamada.get(db, id=id_llamada)
     if not llamada:
         raise HTTPException(status_code=404, detail="Registro de llamada no encontrado")
     
-    # Borrar foto si existe
-    if llamada.url_foto_prueba:
-        FileManager.delete_file(llamada.url_foto_prueba)
+    # Quitar la foto del índice y borrarla solo si ningún otro registro la reutiliza
+    FileManager.release(db, "llamada", id_llamada, [llamada.url_foto_prueba])
         
     return crud.llamada.remove(db, id=id_llamada)
 
@@ -194,7 +208,7 @@ def eliminar_llamada(
 def actualizar_email(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_email: int,
     email_in: schemas.crm.EmailUpdate
 ):
@@ -207,15 +221,14 @@ def actualizar_email(
 def eliminar_email(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     id_email: int
 ):
     email = crud.email.get(db, id=id_email)
     if not email:
         raise HTTPException(status_code=404, detail="Registro de email no encontrado")
     
-    # Borrar foto si existe
-    if email.url_foto_prueba:
-        FileManager.delete_file(email.url_foto_prueba)
+    # Quitar la foto del índice y borrarla solo si ningún otro registro la reutiliza
+    FileManager.release(db, "email", id_email, [email.url_foto_prueba])
         
     return crud.email.remove(db, id=id_email)
@@ -1,16 +1,17 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import crud, models
+from app import crud, schemas
 from app.api import deps
 from app.schemas.empleado import EmpleadoCreate, EmpleadoUpdate, EmpleadoResponse
+from app.services.auth.user_manager import principal_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[EmpleadoResponse])
 def read_empleados(
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     skip: int = 0,
     limit: int = 100
 ):
@@ -21,7 +22,7 @@ def read_empleados(
 
 @router.get("/me", response_model=EmpleadoResponse)
 def read_empleado_me(
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
 ):
     """
     Obtener el perfil del usuario actual logueado.
@@ -33,7 +34,7 @@ def read_empleado_me(
 def create_empleado(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     empleado_in: EmpleadoCreate
 ):
     """
@@ -63,7 +64,7 @@ def create_empleado(
 def update_empleado(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     id_empleado: int,
     empleado_in: EmpleadoUpdate
 ):
@@ -95,13 +96,15 @@ def update_empleado(
                 detail="Ya existe otro empleado con este correo corporativo."
             )
 
-    return crud.empleado.update(db, db_obj=empleado, obj_in=empleado_in)
+    empleado = crud.empleado.update(db, db_obj=empleado, obj_in=empleado_in)
+    principal_cache.evict(id_empleado)
+    return empleado
 
 @router.post("/{id_empleado}/toggle-active", response_model=EmpleadoResponse)
 def toggle_active_empleado(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     id_empleado: int
 ):
     """
@@ -118,4 +121,6 @@ def toggle_active_empleado(
     new_status = not empleado.activo
     update_data = {"activo": new_status}
     
-    return crud.empleado.update(db, db_obj=empleado, obj_in=update_data)
+    empleado = crud.empleado.update(db, db_obj=empleado, obj_in=update_data)
+    principal_cache.evict(id_empleado)
+    return empleado
@@ -1,8 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
+from app.core.pagination import set_next_cursor
 
 router = APIRouter()
 
@@ -10,7 +11,7 @@ router = APIRouter()
 def crear_gasto_movilidad(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     gasto_in: schemas.GastoCreate
 ):
     """
@@ -24,24 +25,28 @@ def crear_gasto_movilidad(
 
 @router.get("/", response_model=List[schemas.GastoResponse])
 def listar_gastos_movilidad(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
     id_plan: Optional[int] = Query(None, description="Filtrar por ID de Plan Semanal")
 ):
     """
     Listar gastos de movilidad. Se puede filtrar por plan.
+    Si hay más páginas, el cursor de la siguiente viene en la cabecera X-Next-Cursor.
     """
-    if id_plan:
-        return crud.gasto.get_by_plan(db, id_plan=id_plan)
-    return crud.gasto.get_multi(db, skip=skip, limit=limit)
+    filters = {"id_plan": id_plan} if id_plan else None
+    gastos, next_cursor = crud.gasto.get_multi_page(db, filters=filters, cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return gastos
 
 @router.get("/{id_gasto}", response_model=schemas.GastoResponse)
 def obtener_gasto(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_gasto: int
 ):
     """
@@ -56,7 +61,7 @@ def obtener_gasto(
 def actualizar_gasto(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_gasto: int,
     gasto_in: schemas.GastoUpdate
 ):
@@ -73,7 +78,7 @@ def actualizar_gasto(
 def eliminar_gasto(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     id_gasto: int
 ):
     """
@@ -89,7 +94,7 @@ def eliminar_gasto(
 def obtener_total_plan(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_plan: int
 ):
     """
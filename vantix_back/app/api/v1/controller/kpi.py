@@ -1,7 +1,7 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app import crud, models, schemas
+from app import crud, schemas
 from app.api import deps
 from app.services.gamificacion.kpi_service import kpi_service
 from datetime import date
@@ -13,7 +13,7 @@ router = APIRouter()
 @router.get("/informes/", response_model=List[schemas.kpi.InformeProductividadResponse])
 def listar_informes_productividad(
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_empleado: Optional[int] = Query(None, description="Filtrar informes por empleado"),
     skip: int = 0,
     limit: int = 100
@@ -31,7 +31,7 @@ def listar_informes_productividad(
 def obtener_informe_por_plan(
     id_plan: int,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user)
 ):
     """
     Obtiene el informe detallado de un plan de trabajo específico.
@@ -48,7 +48,7 @@ def actualizar_informe_flexible(
     id_informe: Optional[int] = Query(None, description="ID directo del informe"),
     id_plan: Optional[int] = Query(None, description="ID del plan asociado"),
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user)
 ):
     """
     Actualiza un informe de productividad de manera flexible.
@@ -70,7 +70,7 @@ def actualizar_informe_flexible(
 @router.get("/incentivos/", response_model=List[schemas.kpi.IncentivoPagoResponse])
 def listar_incentivos(
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_empleado: Optional[int] = Query(None),
     solo_pendientes: bool = False
 ):
@@ -87,7 +87,7 @@ def listar_incentivos(
 def marcar_incentivo_como_pagado(
     id_incentivo: int,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user)
 ):
     """
     Cambia el estado de un bono a 'Pagado'.
@@ -102,7 +102,7 @@ def marcar_incentivo_como_pagado(
 def sincronizar_informe_kpi(
     id_informe: int,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user)
 ):
     """
     Sincroniza los valores reales del informe.
@@ -115,7 +115,7 @@ def sincronizar_informe_kpi(
 def sincronizar_ventas_semanales_masivo(
     fecha_sabado: date = Query(..., description="Fecha del sábado de cierre de semana"),
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user)
 ):
     """
     Sincroniza masivamente las ventas de todos los empleados para la semana que termina
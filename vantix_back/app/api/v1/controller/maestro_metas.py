@@ -1,15 +1,16 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import crud, schemas, models
+from app import crud, schemas
 from app.api import deps
+from app.services.gamificacion.metas_cache import maestro_metas_cache
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.kpi.MaestroMetasResponse])
 def listar_metas_maestras(
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user)
 ):
     """Listar todas las metas maestras configuradas."""
     return crud.maestro_metas.get_multi(db)
@@ -18,11 +19,13 @@ def listar_metas_maestras(
 def crear_meta_maestra(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     obj_in: schemas.kpi.MaestroMetasCreate
 ):
     """Crear un nuevo conjunto de metas maestras generales. Requiere ADMIN."""
-    return crud.maestro_metas.create(db, obj_in=obj_in)
+    meta = crud.maestro_metas.create(db, obj_in=obj_in)
+    maestro_metas_cache.invalidate()
+    return meta
 
 from datetime import date
 from typing import Optional
@@ -30,25 +33,19 @@ from typing import Optional
 @router.get("/current", response_model=Optional[schemas.kpi.MaestroMetasResponse])
 def obtener_meta_maestra_actual(
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user)
 ):
     """Obtener la meta maestra configurada para la fecha actual. Retorna null si no hay."""
-    hoy = date.today()
-    meta = db.query(models.kpi.MaestroMetas).filter(
-        models.kpi.MaestroMetas.fecha_inicio_semana <= hoy,
-        models.kpi.MaestroMetas.fecha_fin_semana >= hoy
-    ).first()
-    
-    return meta
+    return maestro_metas_cache.get_by_fecha(db, date.today())
 
 @router.get("/{id_maestro}", response_model=schemas.kpi.MaestroMetasResponse)
 def obtener_meta_maestra(
     id_maestro: int,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user)
 ):
     """Obtener una meta maestra específica."""
-    meta = crud.maestro_metas.get(db, id=id_maestro)
+    meta = maestro_metas_cache.get(db, id_maestro)
     if not meta:
         raise HTTPException(status_code=404, detail="Meta no encontrada")
     return meta
@@ -58,7 +55,7 @@ def actualizar_meta_maestra(
     *,
     id_maestro: int,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     obj_in: schemas.kpi.MaestroMetasUpdate
 ):
     """Actualizar una meta maestra."""
@@ -66,16 +63,20 @@ def actualizar_meta_maestra(
     if not meta_db:
         raise HTTPException(status_code=404, detail="Meta no encontrada")
 
-    return crud.maestro_metas.update(db, db_obj=meta_db, obj_in=obj_in)
+    meta = crud.maestro_metas.update(db, db_obj=meta_db, obj_in=obj_in)
+    maestro_metas_cache.invalidate()
+    return meta
 
 @router.delete("/{id_maestro}", response_model=schemas.kpi.MaestroMetasResponse)
 def eliminar_meta_maestra(
     id_maestro: int,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user)
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user)
 ):
     """Eliminar una meta maestra."""
     meta = crud.maestro_metas.get(db, id=id_maestro)
     if not meta:
         raise HTTPException(status_code=404, detail="Meta no encontrada")
-    return crud.maestro_metas.remove(db, id=id_maestro)
+    meta = crud.maestro_metas.remove(db, id=id_maestro)
+    maestro_metas_cache.invalidate()
+    return meta
@@ -1,8 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps
+from app.core.pagination import set_next_cursor
 from app.services.sales.plan_validator import PlanValidatorService
 
 router = APIRouter()
@@ -11,7 +12,7 @@ router = APIRouter()
 def create_plan_trabajo(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     plan_in: schemas.PlanCreate,
     id_empleado: int = Query(..., description="ID del empleado dueño del plan")
 ):
@@ -26,25 +27,28 @@ def create_plan_trabajo(
 
 @router.get("/", response_model=List[schemas.PlanResponse])
 def list_planes_trabajo(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
     id_empleado: Optional[int] = None
 ):
     """
     Listar planes de trabajo.
-    Se puede filtrar por empleado.
+    Se puede filtrar por empleado. Si hay más páginas, el cursor de la siguiente viene en la cabecera X-Next-Cursor.
     """
-    if id_empleado:
-        return crud.plan.get_multi_by_owner(db, id_empleado=id_empleado, skip=skip, limit=limit)
-    return crud.plan.get_multi(db, skip=skip, limit=limit)
+    filters = {"id_empleado": id_empleado} if id_empleado else None
+    planes, next_cursor = crud.plan.get_multi_page(db, filters=filters, cursor=cursor, skip=skip, limit=limit)
+    set_next_cursor(response, next_cursor)
+    return planes
 
 @router.get("/{id_plan}", response_model=schemas.PlanResponse)
 def get_plan_trabajo(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_plan: int
 ):
     """
@@ -53,7 +57,7 @@ def get_plan_trabajo(
     - Detalles de la agenda.
     - Informe de Productividad vinculado.
     """
-    plan = crud.plan.get(db, id=id_plan)
+    plan = crud.plan.get_detail(db, id=id_plan)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan de trabajo no encontrado")
     return plan
@@ -62,7 +66,7 @@ def get_plan_trabajo(
 def update_plan_trabajo(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_plan: int,
     plan_in: schemas.PlanUpdate
 ):
@@ -73,13 +77,14 @@ def update_plan_trabajo(
     if not plan:
         raise HTTPException(status_code=404, detail="Plan de trabajo no encontrado")
     
-    return crud.plan.update(db, db_obj=plan, obj_in=plan_in)
+    crud.plan.update(db, db_obj=plan, obj_in=plan_in)
+    return crud.plan.get_detail(db, id=id_plan)
 
 @router.delete("/{id_plan}", response_model=schemas.PlanResponse)
 def delete_plan_trabajo(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     id_plan: int
 ):
     """
@@ -95,7 +100,7 @@ def delete_plan_trabajo(
 def revisar_plan_trabajo(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user), # Solo ADMINS aprueban
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user), # Solo ADMINS aprueban
     id_plan: int,
     plan_review: schemas.PlanUpdate
 ):
@@ -122,4 +127,5 @@ def revisar_plan_trabajo(
              detail="Debes incluir observaciones al rechazar un plan."
          )
 
-    return crud.plan.update(db, db_obj=plan, obj_in=plan_review)
+    crud.plan.update(db, db_obj=plan, obj_in=plan_review)
+    return crud.plan.get_detail(db, id=id_plan)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, HTTPException, Response
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from app.api import deps
+from app.core.config import settings
 from app.services.external.upgrade_db import ExternalDBService
+from app.services.external.remote_storage import RemoteStorageService
+from app.services.external.catalogo_productos import CATALOG_SYNCED_AT_HEADER, catalogo_productos
 from app.schemas.external import ExternalVentaDetalleResponse
 from app import crud, schemas
 
@@ -44,6 +47,7 @@ def mostrar_reporte_ventas(
 
 @router.get("/productos", response_model=List[schemas.external.ExternalProductoResponse])
 def mostrar_listado_productos(
+    response: Response,
     search: Optional[str] = Query(None, description="Buscar por nombre o código"),
     skip: int = Query(0, description="Cantidad de registros a saltar (offset)"),
     limit: int = Query(100, ge=1, le=1000, description="Límite máximo de productos a retornar"),
@@ -51,11 +55,49 @@ def mostrar_listado_productos(
     current_user = Depends(deps.get_current_active_user)
 ):
     """
-    Obtiene el catálogo de productos disponibles desde la base de datos externa UpgradeDB.
+    Obtiene el catálogo de productos de UpgradeDB desde su copia local (se refresca cada
+    PRODUCT_CATALOG_SYNC_MINUTES), así la búsqueda del cotizador no consulta el ERP en cada tecla.
     Se utiliza principalmente para poder armar las cotizaciones en Vantix.
     Soporta búsqueda parcial por nombre o código.
+    La cabecera X-Catalog-Synced-At indica la fecha de los datos; mientras la copia no exista
+    se consulta directo a UpgradeDB (y la fecha es la actual).
     """
-    return ExternalDBService.fetch_productos(limit=limit, offset=skip, search=search)
+    sincronizado = catalogo_productos.fecha_sincronizacion(db)
+    if sincronizado is None:
+        response.headers[CATALOG_SYNCED_AT_HEADER] = datetime.now(timezone.utc).isoformat()
+        return ExternalDBService.fetch_productos(limit=limit, offset=skip, search=search)
+
+    response.headers[CATALOG_SYNCED_AT_HEADER] = sincronizado.isoformat()
+    return catalogo_productos.buscar(db, search=search, skip=skip, limit=limit)
+
+@router.get("/productos/sincronizacion", response_model=schemas.external.ExternalCatalogoEstadoResponse)
+def estado_sincronizacion_productos(
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_admin_user)
+):
+    """Estado de la copia local del catálogo de productos (última sincronización, errores). Requiere ADMIN."""
+    estado = catalogo_productos.estado(db)
+    return estado or {"catalogo": "productos"}
+
+@router.post("/productos/sincronizacion", response_model=schemas.external.ExternalCatalogoEstadoResponse, status_code=202)
+def sincronizar_productos(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(deps.get_db),
+    current_user = Depends(deps.get_current_admin_user)
+):
+    """
+    Refresca la copia local del catálogo de productos en segundo plano (bajo el advisory lock del
+    catálogo: si otro proceso ya está sincronizando, no se lanza un segundo refresco). Requiere ADMIN.
+    Responde 503 si la sincronización está desactivada (PRODUCT_CATALOG_SYNC_ENABLED).
+    """
+    if not settings.PRODUCT_CATALOG_SYNC_ENABLED:
+        raise HTTPException(
+            status_code=503,
+            detail="La sincronización del catálogo de productos está desactivada (PRODUCT_CATALOG_SYNC_ENABLED)"
+        )
+    background_tasks.add_task(catalogo_productos.sincronizar_ahora)
+    estado = catalogo_productos.estado(db)
+    return estado or {"catalogo": "productos"}
 
 @router.get("/almacenes", response_model=List[schemas.external.ExternalAlmacenResponse])
 def mostrar_listado_almacenes(
@@ -91,3 +133,23 @@ def mostrar_listado_formas_pago(
     Obtiene el catálogo de formas de pago disponibles desde la base de datos externa UpgradeDB.
     """
     return ExternalDBService.fetch_formas_pago()
+
+@router.get("/pool-stats", response_model=schemas.external.ExternalPoolStatsResponse)
+def mostrar_estadisticas_pool(
+    current_user = Depends(deps.get_current_admin_user)
+):
+    """
+    Estadísticas del pool de conexiones hacia UpgradeDB (en uso, en espera, creadas y descartadas).
+    Sirve para dimensionar EXTERNAL_DB_POOL_MAX_SIZE bajo carga. Requiere ADMIN.
+    """
+    return ExternalDBService.pool_stats()
+
+@router.get("/storage-pool-stats", response_model=schemas.external.StoragePoolStatsResponse)
+def mostrar_estadisticas_pool_almacenamiento(
+    current_user = Depends(deps.get_current_admin_user)
+):
+    """
+    Estadísticas del pool de sesiones hacia el almacenamiento de evidencias (REMOTE_STORAGE_BACKEND).
+    Sirve para dimensionar REMOTE_STORAGE_FTP_POOL_MAX_SIZE bajo carga. Requiere ADMIN.
+    """
+    return RemoteStorageService.pool_stats()
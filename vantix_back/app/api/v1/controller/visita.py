@@ -1,8 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query, Response
 from sqlalchemy.orm import Session
 from app import crud, schemas, models
 from app.api import deps
+from app.core.pagination import set_next_cursor
 from app.models.enums import ResultadoEstadoEnum
 from app.models.visita import RegistroVisita
 from app.services.common.file_manager import FileManager
@@ -17,7 +18,7 @@ router = APIRouter()
 async def registrar_visita(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     # Campos del Formulario (Multipart)
     id_plan: int = Form(...),
     id_cliente: int = Form(...),
@@ -39,21 +40,28 @@ async def registrar_visita(
     # 1. Validar Plan (Debe ser para esta semana, hoy y estar Aprobado)
     plan = PlanValidatorService.validate_plan_exists_for_activity(db, id_empleado=current_user.id_empleado, id_plan=id_plan)
 
-    # 2. Guardar Fotos usando el servicio FileManager
-    # Se pasan los datos del empleado para la estructura de carpetas remota
-    path_lugar = await FileManager.save_upload_file(
-        foto_lugar, 
-        subdirectory="visitas", 
-        prefix="lugar",
-        employee_name=current_user.nombre_completo,
-        activity_type="Visita"
-    )
-    path_sello = await FileManager.save_upload_file(
-        foto_sello, 
-        subdirectory="visitas", 
-        prefix="sello",
-        employee_name=current_user.nombre_completo,
-        activity_type="Visita"
+    # 2. Guardar Fotos usando el servicio FileManager (ambas en paralelo)
+    # Se pasan los datos del empleado para la estructura de carpetas remota; la subida al hosting
+    # queda encolada y se confirma con el commit de la visita
+    path_lugar, path_sello = await FileManager.save_upload_files(
+        dict(
+            file=foto_lugar,
+            subdirectory="visitas",
+            prefix="lugar",
+            employee_name=current_user.nombre_completo,
+            activity_type="Visita",
+            db=db,
+            id_empleado=current_user.id_empleado
+        ),
+        dict(
+            file=foto_sello,
+            subdirectory="visitas",
+            prefix="sello",
+            employee_name=current_user.nombre_completo,
+            activity_type="Visita",
+            db=db,
+            id_empleado=current_user.id_empleado
+        )
     )
 
     # 3. Crear Objeto Visita
@@ -73,6 +81,7 @@ async def registrar_visita(
     db.add(db_visita)
     db.commit()
     db.refresh(db_visita)
+    crud.archivo_evidencia.assign_owner(db, urls=[path_lugar, path_sello], tipo_registro="visita", id_registro=db_visita.id_visita)
 
     # 3.b. Marcar como realizado en la agenda
     if id_detalle:
@@ -93,33 +102,56 @@ async def registrar_visita(
 
 @router.get("/", response_model=List[schemas.VisitaResponse])
 def listar_visitas(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor de la página anterior"),
     id_empleado: Optional[int] = None,
     id_plan: Optional[int] = None,
     id_cliente: Optional[int] = None
 ):
     """
-    Listar visitas con múltiples filtros opcionales.
+    Listar visitas con múltiples filtros opcionales (las más recientes primero, siempre paginado).
+    Si hay más páginas, el cursor de la siguiente viene en la cabecera X-Next-Cursor.
+    Para el historial completo de un cliente usar `/visitas/cliente/{id_cliente}/historial`.
     """
     if id_empleado:
-        return crud.visita.get_multi_by_owner(db, id_empleado=id_empleado, skip=skip, limit=limit)
-    
-    if id_plan:
-        return crud.visita.get_by_plan(db, id_plan=id_plan)
-        
-    if id_cliente:
-        return crud.visita.get_by_cliente(db, id_cliente=id_cliente)
+        visitas, next_cursor = crud.visita.get_page_by_owner(
+            db, id_empleado=id_empleado, cursor=cursor, skip=skip, limit=limit
+        )
+    else:
+        filters = {"id_plan": id_plan} if id_plan else {"id_cliente": id_cliente} if id_cliente else None
+        visitas, next_cursor = crud.visita.get_multi_page(db, filters=filters, cursor=cursor, skip=skip, limit=limit)
+
+    set_next_cursor(response, next_cursor)
+    return visitas
+
+@router.get("/cliente/{id_cliente}/historial", response_model=schemas.VisitaHistorialResponse)
+def historial_visitas_cliente(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
+    id_cliente: int,
+    cursor: Optional[str] = Query(None, description="`next_cursor` de la página anterior"),
+    limit: int = Query(50, ge=1, le=200)
+):
+    """
+    Historial de visitas de un cliente, de la más reciente a la más antigua.
+    Paginación por cursor: usar `next_cursor` de la respuesta para pedir la siguiente página.
+    """
+    if not crud.cartera.get(db, id=id_cliente):
+        raise HTTPException(status_code=404, detail="Cliente no encontrado")
 
-    return crud.visita.get_multi(db, skip=skip, limit=limit)
+    visitas, next_cursor = crud.visita.get_historial_cliente(db, id_cliente=id_cliente, cursor=cursor, limit=limit)
+    return {"items": visitas, "next_cursor": next_cursor}
 
 @router.put("/{id_visita}", response_model=schemas.VisitaResponse)
 def actualizar_visita(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_active_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_active_user),
     id_visita: int,
     visita_in: schemas.visita.VisitaUpdate
 ):
@@ -136,7 +168,7 @@ def actualizar_visita(
 def eliminar_visita(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: models.empleado.Empleado = Depends(deps.get_current_admin_user),
+    current_user: schemas.EmpleadoPrincipal = Depends(deps.get_current_admin_user),
     id_visita: int
 ):
     """
@@ -154,9 +186,8 @@ def eliminar_visita(
         increment=-1
     )
         
-    # 2. Borrar archivos físicos del disco para ahorrar espacio
-    FileManager.delete_file(visita.url_foto_lugar)
-    FileManager.delete_file(visita.url_foto_sello)
+    # 2. Quitar las fotos del índice y borrar del almacenamiento las que ya nadie reutiliza (contenido deduplicado)
+    FileManager.release(db, "visita", id_visita, [visita.url_foto_lugar, visita.url_foto_sello])
 
     # 3. Serializar los datos antes de borrar para evitar DetachedInstanceError en la respuesta
     # Esto carga las relaciones (como 'cliente') antes de que el objeto se desconecte de la sesión
@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Caché en memoria, thread-safe, con tiempo de vida por entrada y tamaño máximo (LRU).
+    Al superar `max_size` se descarta la entrada usada hace más tiempo.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Retorna (encontrado, valor). Permite cachear también valores None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        encontrado, value = self.lookup(key)
+        return value if encontrado else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            if self.max_size is not None:
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -19,6 +19,14 @@ class Settings(BaseSettings):
     EXTERNAL_DB_USER: str
     EXTERNAL_DB_PASSWORD: str
     EXTERNAL_DB_NAME: str
+    EXTERNAL_DB_CONNECT_TIMEOUT: int = 10  # Segundos para el handshake TCP+auth
+
+    # Pool de conexiones a UpgradeDB
+    EXTERNAL_DB_POOL_MIN_SIZE: int = 1
+    EXTERNAL_DB_POOL_MAX_SIZE: int = 10
+    EXTERNAL_DB_POOL_IDLE_TIMEOUT: int = 300  # Cierra conexiones ociosas tras N segundos
+    EXTERNAL_DB_POOL_ACQUIRE_TIMEOUT: int = 15  # Espera máxima por una conexión libre
+    EXTERNAL_DB_POOL_PING_AFTER: int = 30  # Verifica con SELECT 1 las conexiones ociosas por más de N segundos
 
     # Seguridad
     SECRET_KEY: str
@@ -26,12 +34,73 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
     # Servidor de Imágenes Remoto
+    REMOTE_STORAGE_BACKEND: str = "ftp"  # ftp | sftp | s3 | local
     REMOTE_STORAGE_HOST: Optional[str] = None
     REMOTE_STORAGE_USER: Optional[str] = None
     REMOTE_STORAGE_PASSWORD: Optional[str] = None
-    REMOTE_STORAGE_PORT: int = 22
+    REMOTE_STORAGE_PORT: int = 22  # Puerto SFTP
+    REMOTE_STORAGE_FTP_PORT: int = 21
     REMOTE_STORAGE_BASE_PATH: str
     REMOTE_STORAGE_BASE_URL: str
+    REMOTE_STORAGE_MAX_CONCURRENT_UPLOADS: int = 4  # Subidas simultáneas por worker
+    UPLOAD_MAX_FILE_SIZE_MB: int = 15  # Tamaño máximo por archivo subido
+    UPLOAD_ORPHAN_GRACE_MINUTES: int = 60  # Un archivo indexado sin registro dueño deja de contar como uso pasado este tiempo
+
+    # Procesamiento de fotos de evidencia
+    IMAGE_PROCESSING_ENABLED: bool = True
+    IMAGE_PROCESSING_WORKERS: int = 2  # Fotos procesadas a la vez por worker (CPU intensivo)
+    IMAGE_MAX_DIMENSION: int = 1600  # Lado mayor máximo en px
+    IMAGE_JPEG_QUALITY: int = 80
+    IMAGE_THUMBNAIL_SIZE: int = 320
+    IMAGE_THUMBNAIL_QUALITY: int = 70
+    IMAGE_KEEP_GPS: bool = False  # Conserva la ubicación GPS al quitar el EXIF
+
+    # Backend S3 compatible (AWS, MinIO, R2...). REMOTE_STORAGE_BASE_PATH se usa como prefijo de las claves
+    REMOTE_STORAGE_S3_ENDPOINT_URL: Optional[str] = None  # Vacío = AWS
+    REMOTE_STORAGE_S3_BUCKET: Optional[str] = None
+    REMOTE_STORAGE_S3_REGION: str = "us-east-1"
+    REMOTE_STORAGE_S3_ACCESS_KEY: Optional[str] = None
+    REMOTE_STORAGE_S3_SECRET_KEY: Optional[str] = None
+    REMOTE_STORAGE_S3_MULTIPART_CHUNK_MB: int = 8  # Archivos mayores se suben por partes de este tamaño
+    REMOTE_STORAGE_S3_MULTIPART_CONCURRENCY: int = 4  # Partes enviadas a la vez por archivo
+
+    # Backend local (carpeta servida por /static)
+    REMOTE_STORAGE_LOCAL_ROOT: str = "static/evidencias"
+    REMOTE_STORAGE_LOCAL_BASE_URL: str = "/static/evidencias"
+
+    # Pool de sesiones FTP/SFTP al hosting
+    REMOTE_STORAGE_FTP_POOL_MAX_SIZE: int = 4  # Sesiones FTP simultáneas por worker
+    REMOTE_STORAGE_FTP_IDLE_TIMEOUT: int = 120  # Cierra sesiones ociosas antes de que el hosting las corte
+    REMOTE_STORAGE_FTP_ACQUIRE_TIMEOUT: int = 30  # Espera máxima por una sesión libre
+    REMOTE_STORAGE_FTP_KEEPALIVE_AFTER: int = 15  # Envía NOOP a las sesiones ociosas por más de N segundos
+    REMOTE_STORAGE_DIR_CACHE_TTL_SECONDS: int = 86400  # Recuerda las carpetas remotas ya creadas
+
+    # Cola de subidas al hosting (outbox)
+    UPLOAD_OUTBOX_ENABLED: bool = True
+    UPLOAD_OUTBOX_POLL_SECONDS: int = 5  # Espera entre consultas cuando la cola está vacía
+    UPLOAD_OUTBOX_MAX_ATTEMPTS: int = 10  # Tras N fallos la subida queda como 'Fallido'
+    UPLOAD_OUTBOX_BACKOFF_BASE_SECONDS: int = 30  # Espera tras el primer fallo (se duplica en cada intento)
+    UPLOAD_OUTBOX_BACKOFF_MAX_SECONDS: int = 3600
+    UPLOAD_OUTBOX_LEASE_SECONDS: int = 600  # Si el worker que tomó una subida se cae, otro la retoma pasado este tiempo
+
+    # Importación masiva de cartera (trabajos en segundo plano)
+    CARTERA_IMPORT_WORKER_ENABLED: bool = True
+    CARTERA_IMPORT_DIR: str = "importaciones"  # Archivos recibidos en espera de procesarse (no es público)
+    CARTERA_IMPORT_MAX_FILE_SIZE_MB: int = 50
+    CARTERA_IMPORT_HEADER_SCAN_ROWS: int = 50  # Filas iniciales de cada hoja donde se busca el encabezado
+    CARTERA_IMPORT_CHUNK_ROWS: int = 5000  # Filas que se leen y guardan por bloque
+    CARTERA_IMPORT_POLL_SECONDS: int = 5  # Respaldo: el worker del mismo proceso se despierta al crear el trabajo
+    CARTERA_IMPORT_STALE_MINUTES: int = 30  # Un trabajo 'Procesando' sin avance por este tiempo se reintenta
+
+    # Copia local del catálogo de productos de UpgradeDB
+    PRODUCT_CATALOG_SYNC_ENABLED: bool = True
+    PRODUCT_CATALOG_SYNC_MINUTES: int = 15  # Cada cuánto se refresca (solo se traen los productos que cambiaron)
+    PRODUCT_CATALOG_SYNC_BATCH_SIZE: int = 5000  # Productos por consulta al ERP
+
+    # Cachés en memoria
+    METAS_CACHE_TTL_SECONDS: int = 300  # Respaldo para despliegues con varios workers
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # Usuario autenticado (evita un SELECT por request)
+    AUTH_PRINCIPAL_CACHE_MAX_SIZE: int = 1024
 
     SHOW_DOCS: bool = True  # Por defecto True para desarrollo
 
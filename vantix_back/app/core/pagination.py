@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response
+
+# Cabecera con el cursor de la siguiente página en los listados que responden un arreglo
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Codifica la clave de la última fila de una página en un cursor opaco (base64 url-safe).
+    Admite enteros, textos, decimales, fechas y fechas con hora.
+    """
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append({"dt": value.isoformat()})
+        elif isinstance(value, date):
+            payload.append({"d": value.isoformat()})
+        elif isinstance(value, Decimal):
+            payload.append({"n": str(value)})
+        else:
+            payload.append(value)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decodifica un cursor generado por `encode_cursor`. Responde 400 si es inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("tamaño inesperado")
+        values = []
+        for value in payload:
+            if isinstance(value, dict) and "dt" in value:
+                values.append(datetime.fromisoformat(value["dt"]))
+            elif isinstance(value, dict) and "d" in value:
+                values.append(date.fromisoformat(value["d"]))
+            elif isinstance(value, dict) and "n" in value:
+                values.append(Decimal(value["n"]))
+            else:
+                values.append(value)
+        return values
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """
+    Publica el cursor de la siguiente página en la cabecera X-Next-Cursor (sin cabecera = última página).
+    Así los listados siguen respondiendo un arreglo y los clientes actuales no cambian.
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -7,4 +7,6 @@ from .crud_crm import llamada, email
 from .crud_finanzas import gasto
 from .crud_kpi import kpi, incentivo, maestro_metas
 from .crud_geo import departamento, provincia, distrito
-from .crud_cotizacion import cotizacion
\ No newline at end of file
+from .crud_cotizacion import cotizacion
+from .crud_archivos import archivo_evidencia
+from .crud_importacion import trabajo_importacion
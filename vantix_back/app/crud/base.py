@@ -1,8 +1,10 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, tuple_
+from sqlalchemy.orm import Query, Session
 from app.core.database import Base
+from app.core.pagination import encode_cursor, decode_cursor
 
 # Definimos tipos genéricos para que Python entienda qué modelos estamos usando
 ModelType = TypeVar("ModelType", bound=Base)
@@ -10,6 +12,12 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Orden de los listados: nombre de una columna indexada y NOT NULL (None = clave primaria) y sentido
+    page_order_by: Optional[str] = None
+    page_descending: bool = False
+    # Opciones de carga (joinedload/selectinload) que necesita el schema de respuesta del listado
+    page_options: Sequence[Any] = ()
+
     def __init__(self, model: Type[ModelType]):
         """
         Objeto CRUD con métodos predeterminados para crear, leer, actualizar, eliminar (CRUD).
@@ -17,12 +25,60 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         * `model`: Una clase modelo de SQLAlchemy
         """
         self.model = model
+        mapper = inspect(model)
+        pk = getattr(model, mapper.get_property_by_column(mapper.primary_key[0]).key)
+        # Clave de orden de los listados; la clave primaria desempata y la hace única
+        self._page_columns = [pk] if self.page_order_by is None else [getattr(model, self.page_order_by), pk]
 
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         return db.query(self.model).get(id)
 
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self.get_multi_page(db, skip=skip, limit=limit)[0]
+
+    def get_multi_page(
+        self,
+        db: Session,
+        *,
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Listado paginado con orden estable (`page_order_by` + clave primaria como desempate).
+        `filters` son igualdades por columna (por ejemplo {"id_plan": 3}).
+        Retorna (filas, cursor de la siguiente página o None); ver `paginate`.
+        """
+        query = db.query(self.model).options(*self.page_options).filter_by(**(filters or {}))
+        return self.paginate(query, cursor=cursor, skip=skip, limit=limit)
+
+    def paginate(
+        self, query: Query, *, cursor: Optional[str] = None, skip: int = 0, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Pagina una consulta de este modelo.
+        - Con `cursor` (el `next_cursor` de la página anterior) usa paginación keyset: filtra por
+          "después de la última fila vista" en vez de saltar filas, así que cada página cuesta lo mismo.
+        - Sin `cursor` usa `skip` (OFFSET), por compatibilidad con los clientes existentes.
+        En ambos casos retorna el cursor de la siguiente página, opaco para el cliente.
+        """
+        columns = self._page_columns
+        if cursor:
+            values = decode_cursor(cursor, len(columns))
+            key, last = tuple_(*columns), tuple_(*values)
+            query = query.filter(key < last if self.page_descending else key > last)
+        query = query.order_by(*(c.desc() if self.page_descending else c.asc() for c in columns))
+        if skip and not cursor:
+            query = query.offset(skip)
+
+        # Se pide una fila de más solo para saber si hay otra página
+        rows = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(*(getattr(rows[-1], c.key) for c in columns))
+        return rows, next_cursor
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
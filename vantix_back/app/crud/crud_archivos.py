@@ -0,0 +1,148 @@
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
+from sqlalchemy import or_, tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
+from app.crud.base import CRUDBase
+from app.models.archivos import ArchivoEvidencia
+
+
+class CRUDArchivoEvidencia(CRUDBase[ArchivoEvidencia, BaseModel, BaseModel]):
+    def register(
+        self,
+        db: Session,
+        *,
+        url: str,
+        url_miniatura: Optional[str] = None,
+        id_empleado: Optional[int] = None,
+        tipo_actividad: Optional[str] = None,
+        nombre_original: Optional[str] = None,
+        tamano_bytes: Optional[int] = None,
+        sha256: Optional[str] = None
+    ) -> ArchivoEvidencia:
+        """Indexa un archivo recién guardado. No hace commit: se confirma junto con el registro dueño."""
+        db_obj = ArchivoEvidencia(
+            url=url,
+            url_miniatura=url_miniatura,
+            id_empleado=id_empleado,
+            tipo_actividad=tipo_actividad,
+            nombre_original=nombre_original,
+            tamano_bytes=tamano_bytes,
+            sha256=sha256
+        )
+        db.add(db_obj)
+        return db_obj
+
+    def get_by_hash(
+        self, db: Session, *, sha256: str, id_empleado: Optional[int], tipo_actividad: Optional[str]
+    ) -> Optional[ArchivoEvidencia]:
+        """Archivo ya guardado con el mismo contenido, del mismo empleado y actividad (para reutilizarlo)."""
+        return db.query(ArchivoEvidencia).filter(
+            ArchivoEvidencia.sha256 == sha256,
+            ArchivoEvidencia.id_empleado == id_empleado,
+            ArchivoEvidencia.tipo_actividad == tipo_actividad,
+            self._en_uso()
+        ).order_by(ArchivoEvidencia.id_archivo).first()
+
+    def _en_uso(self):
+        """
+        Filas que cuentan como uso de su archivo: las que tienen registro dueño y las que aún no lo
+        tienen pero son recientes (la subida cuyo registro todavía no se confirma). Una fila que
+        quedó sin dueño más allá de UPLOAD_ORPHAN_GRACE_MINUTES (falló la creación del registro)
+        no retiene el archivo ni se ofrece para reutilizarlo.
+        """
+        limite = datetime.now(timezone.utc) - timedelta(minutes=settings.UPLOAD_ORPHAN_GRACE_MINUTES)
+        return or_(ArchivoEvidencia.id_registro.isnot(None), ArchivoEvidencia.fecha_creacion >= limite)
+
+    def unreferenced(self, db: Session, urls: List[Optional[str]]) -> List[str]:
+        """
+        De las URLs dadas, las que ya ningún registro del índice usa (se pueden borrar del almacenamiento).
+        Llamar después de `remove_by_owner`, dentro de la misma transacción.
+        """
+        urls = list(dict.fromkeys(u for u in urls if u))
+        if not urls:
+            return []
+        en_uso = {
+            url for (url,) in db.query(ArchivoEvidencia.url)
+            .filter(ArchivoEvidencia.url.in_(urls), self._en_uso())
+            .distinct()
+        }
+        return [u for u in urls if u not in en_uso]
+
+    def assign_owner(self, db: Session, *, urls: List[Optional[str]], tipo_registro: str, id_registro: int) -> None:
+        """
+        Asocia los archivos (por URL) al registro que los usa: 'visita', 'llamada' o 'email'.
+        Con contenido deduplicado varias filas comparten URL: se toma una fila libre por cada uso,
+        así cada registro queda como una referencia propia.
+        """
+        ids = []
+        for url, usos in Counter(u for u in urls if u).items():
+            ids += [
+                id_archivo for (id_archivo,) in db.query(ArchivoEvidencia.id_archivo)
+                .filter(ArchivoEvidencia.url == url, ArchivoEvidencia.id_registro.is_(None))
+                .order_by(ArchivoEvidencia.id_archivo.desc())
+                .limit(usos)
+            ]
+        if not ids:
+            return
+        db.query(ArchivoEvidencia).filter(ArchivoEvidencia.id_archivo.in_(ids)).update(
+            {ArchivoEvidencia.tipo_registro: tipo_registro, ArchivoEvidencia.id_registro: id_registro},
+            synchronize_session=False
+        )
+        db.commit()
+
+    def remove_by_owner(self, db: Session, *, tipo_registro: str, id_registro: int) -> None:
+        """Quita del índice los archivos de un registro. No hace commit (se borra junto con el registro)."""
+        db.query(ArchivoEvidencia).filter(
+            ArchivoEvidencia.tipo_registro == tipo_registro,
+            ArchivoEvidencia.id_registro == id_registro
+        ).delete(synchronize_session=False)
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        id_empleado: int,
+        tipo_actividad: Optional[str] = None,
+        fecha_desde: Optional[date] = None,
+        fecha_hasta: Optional[date] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Tuple[List[ArchivoEvidencia], Optional[str]]:
+        """
+        Página de la galería de un empleado, de la más reciente a la más antigua.
+        Paginación keyset sobre (fecha_creacion, id_archivo): cada página cuesta lo mismo sin importar
+        cuántas fotos haya antes. Retorna (archivos, cursor de la siguiente página o None).
+        """
+        query = db.query(ArchivoEvidencia).filter(ArchivoEvidencia.id_empleado == id_empleado)
+        if tipo_actividad:
+            query = query.filter(ArchivoEvidencia.tipo_actividad == tipo_actividad)
+        if fecha_desde:
+            query = query.filter(ArchivoEvidencia.fecha_creacion >= datetime.combine(fecha_desde, time.min))
+        if fecha_hasta:
+            query = query.filter(ArchivoEvidencia.fecha_creacion < datetime.combine(fecha_hasta + timedelta(days=1), time.min))
+        if cursor:
+            ultima_fecha, ultimo_id = decode_cursor(cursor, 2)
+            query = query.filter(
+                tuple_(ArchivoEvidencia.fecha_creacion, ArchivoEvidencia.id_archivo) < tuple_(ultima_fecha, ultimo_id)
+            )
+
+        archivos = (
+            query.order_by(ArchivoEvidencia.fecha_creacion.desc(), ArchivoEvidencia.id_archivo.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        # Se pide una fila de más solo para saber si hay otra página
+        next_cursor = None
+        if len(archivos) > limit:
+            archivos = archivos[:limit]
+            ultimo = archivos[-1]
+            next_cursor = encode_cursor(ultimo.fecha_creacion, ultimo.id_archivo)
+        return archivos, next_cursor
+
+
+archivo_evidencia = CRUDArchivoEvidencia(ArchivoEvidencia)
@@ -1,20 +1,130 @@
-from typing import Optional, List
-from sqlalchemy.orm import Session
+import io
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Column, Integer, MetaData, Table, Text, cast, func, literal, literal_column, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
 from app.crud.base import CRUDBase
 from app.models.clientes import CarteraClientes
 from app.schemas.cartera import CarteraCreate, CarteraUpdate # Asumiendo que creaste estos schemas
 
+# Columnas que puede traer una importación masiva (Excel del API o CSV del script)
+IMPORT_COLUMNS = (
+    "nombre_cliente", "ruc_dni", "categoria", "direccion", "id_empleado",
+    "nombre_contacto", "celular_contacto", "email_contacto",
+    "nombre_gerente", "celular_gerente", "email_gerente",
+    "nombre_logistico", "celular_logistico", "email_logistico",
+    "observaciones",
+)
+# En modo "actualizar existentes" se sobrescriben estas (las vacías en el archivo no borran lo que ya hay)
+UPDATE_COLUMNS = tuple(c for c in IMPORT_COLUMNS if c not in ("ruc_dni", "observaciones"))
+
+# Tabla temporal de carga: mismas columnas que cartera_clientes (la categoría llega como texto)
+# más el orden de la fila en el archivo. Se borra sola al terminar la transacción.
+_staging = Table(
+    "tmp_importacion_cartera",
+    MetaData(),
+    Column("orden", Integer, nullable=False),
+    *(
+        Column(name, Text if name == "categoria" else CarteraClientes.__table__.c[name].type)
+        for name in IMPORT_COLUMNS
+    ),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _copy_csv(rows: List[Dict[str, Any]]) -> io.StringIO:
+    """CSV para COPY: None va sin comillas (NULL) y todo texto entre comillas (así '' no se vuelve NULL)."""
+    buffer = io.StringIO()
+    for orden, row in enumerate(rows):
+        campos = [str(orden)]
+        for name in IMPORT_COLUMNS:
+            valor = row.get(name)
+            campos.append("" if valor is None else '"' + str(valor).replace('"', '""') + '"')
+        buffer.write(",".join(campos) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
 class CRUDCartera(CRUDBase[CarteraClientes, CarteraCreate, CarteraUpdate]):
-    
+    # `CarteraResponse` anida el distrito
+    page_options = (joinedload(CarteraClientes.distrito),)
+
     # Buscar por RUC/DNI para evitar duplicados al importar o registrar
     def get_by_ruc_dni(self, db: Session, *, ruc_dni: str) -> Optional[CarteraClientes]:
         return db.query(CarteraClientes).filter(CarteraClientes.ruc_dni == ruc_dni).first()
-
-    # Obtener clientes activos asignados a un vendedor específico
-    def get_activos_by_vendedor(self, db: Session, id_vendedor: int) -> List[CarteraClientes]:
+    
+    def get_activos_by_vendedor(self, db: Session, *, id_vendedor: int) -> List[CarteraClientes]:
         return db.query(CarteraClientes).filter(
             CarteraClientes.activo == True,
             CarteraClientes.id_empleado == id_vendedor
-        ).all()
+        ).order_by(CarteraClientes.id_cliente).all()
+
+    def bulk_upsert(
+        self, db: Session, *, rows: List[Dict[str, Any]], update_existing: bool = False
+    ) -> Dict[str, int]:
+        """
+        Carga masiva de clientes en dos sentencias, sin un objeto ORM por fila:
+        1. COPY de todas las filas a una tabla temporal.
+        2. INSERT ... SELECT hacia cartera_clientes con ON CONFLICT (ruc_dni):
+           - por defecto los RUC que ya existen se omiten (DO NOTHING);
+           - con `update_existing` se actualizan sus datos (los campos vacíos del archivo no borran nada
+             y las filas que no cambian no se reescriben).
+        Si un RUC se repite en el archivo vale la primera fila. Las filas sin RUC siempre se insertan.
+        No hace commit. Retorna {"insertados", "actualizados", "omitidos"}.
+        """
+        if not rows:
+            return {"insertados": 0, "actualizados": 0, "omitidos": 0}
+
+        connection = db.connection()
+        _staging.drop(connection, checkfirst=True)
+        _staging.create(connection)
+        columnas = ", ".join(c.name for c in _staging.columns)
+        with connection.connection.cursor() as cur:
+            cur.copy_expert(f"COPY {_staging.name} ({columnas}) FROM STDIN WITH (FORMAT csv)", _copy_csv(rows))
+
+        def origen(filtro):
+            return select(
+                _staging.c.orden,
+                *(
+                    cast(_staging.c[name], CarteraClientes.categoria.type) if name == "categoria" else _staging.c[name]
+                    for name in IMPORT_COLUMNS
+                ),
+            ).where(filtro)
+
+        # Primera aparición de cada RUC (DISTINCT ON) + todas las filas sin RUC
+        con_ruc = origen(_staging.c.ruc_dni.isnot(None)).distinct(_staging.c.ruc_dni).order_by(
+            _staging.c.ruc_dni, _staging.c.orden
+        )
+        staged = union_all(con_ruc, origen(_staging.c.ruc_dni.is_(None))).subquery()
+
+        stmt = insert(CarteraClientes).from_select(
+            [*IMPORT_COLUMNS, "activo"],
+            select(*(staged.c[name] for name in IMPORT_COLUMNS), literal(True)).order_by(staged.c.orden),
+        )
+        if update_existing:
+            actual = [getattr(CarteraClientes, name) for name in UPDATE_COLUMNS]
+            nuevo = [
+                stmt.excluded[name] if name == "nombre_cliente"
+                else func.coalesce(stmt.excluded[name], getattr(CarteraClientes, name))
+                for name in UPDATE_COLUMNS
+            ]
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[CarteraClientes.ruc_dni],
+                set_=dict(zip(UPDATE_COLUMNS, nuevo)),
+                where=tuple_(*actual).is_distinct_from(tuple_(*nuevo)),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[CarteraClientes.ruc_dni])
+
+        # xmax = 0 solo en filas recién insertadas (las actualizadas por ON CONFLICT lo tienen con valor)
+        afectadas = db.execute(stmt.returning(literal_column("xmax = 0"))).scalars().all()
+        insertados = sum(1 for nueva in afectadas if nueva)
+        actualizados = len(afectadas) - insertados
+        return {
+            "insertados": insertados,
+            "actualizados": actualizados,
+            "omitidos": len(rows) - insertados - actualizados,
+        }
 
-cartera = CRUDCartera(CarteraClientes)
\ No newline at end of file
+cartera = CRUDCartera(CarteraClientes)
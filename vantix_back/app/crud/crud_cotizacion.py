@@ -1,10 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from app.crud.base import CRUDBase
 from app.models.cotizacion import Cotizacion, DetalleCotizacion
 from app.schemas.cotizacion import CotizacionCreate, CotizacionUpdate
 from typing import List, Optional
 
 class CRUDCotizacion(CRUDBase[Cotizacion, CotizacionCreate, CotizacionUpdate]):
+    # `CotizacionResponse` anida los detalles: una sola consulta extra por página
+    page_options = (selectinload(Cotizacion.detalles),)
+
     def create_with_details(
         self, db: Session, *, obj_in: CotizacionCreate, id_empleado: int
     ) -> Cotizacion:
@@ -34,12 +37,6 @@ class CRUDCotizacion(CRUDBase[Cotizacion, CotizacionCreate, CotizacionUpdate]):
     def get_multi_by_empleado(
         self, db: Session, *, id_empleado: int, skip: int = 0, limit: int = 100
     ) -> List[Cotizacion]:
-        return (
-            db.query(self.model)
-            .filter(self.model.id_empleado == id_empleado)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return self.get_multi_page(db, filters={"id_empleado": id_empleado}, skip=skip, limit=limit)[0]
 
 cotizacion = CRUDCotizacion(Cotizacion)
@@ -9,11 +9,11 @@ from app.schemas.crm import LlamadaCreate, LlamadaUpdate, EmailCreate, EmailUpda
 
 class CRUDLlamada(CRUDBase[RegistroLlamada, LlamadaCreate, LlamadaUpdate]):
     def get_multi_by_plan(self, db: Session, *, id_plan: int, skip: int = 0, limit: int = 100) -> List[RegistroLlamada]:
-        return db.query(RegistroLlamada).filter(RegistroLlamada.id_plan == id_plan).offset(skip).limit(limit).all()
+        return self.get_multi_page(db, filters={"id_plan": id_plan}, skip=skip, limit=limit)[0]
 
 class CRUDEmail(CRUDBase[RegistroEmail, EmailCreate, EmailUpdate]):
     def get_multi_by_plan(self, db: Session, *, id_plan: int, skip: int = 0, limit: int = 100) -> List[RegistroEmail]:
-        return db.query(RegistroEmail).filter(RegistroEmail.id_plan == id_plan).offset(skip).limit(limit).all()
+        return self.get_multi_page(db, filters={"id_plan": id_plan}, skip=skip, limit=limit)[0]
 
 llamada = CRUDLlamada(RegistroLlamada)
 email = CRUDEmail(RegistroEmail)
\ No newline at end of file
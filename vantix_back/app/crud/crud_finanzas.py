@@ -9,7 +9,7 @@ from app.schemas.finanzas import GastoCreate, GastoUpdate
 class CRUDGasto(CRUDBase[GastoMovilidad, GastoCreate, GastoUpdate]):
     
     def get_by_plan(self, db: Session, *, id_plan: int) -> List[GastoMovilidad]:
-        return db.query(GastoMovilidad).filter(GastoMovilidad.id_plan == id_plan).all()
+        return db.query(GastoMovilidad).filter(GastoMovilidad.id_plan == id_plan).order_by(GastoMovilidad.id_gasto).all()
 
     # Extra: Sumar todo lo gastado en una semana
     def get_total_gasto_by_plan(self, db: Session, *, id_plan: int) -> Decimal:
@@ -0,0 +1,20 @@
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.enums import EstadoImportacionEnum
+from app.models.importacion import TrabajoImportacion
+
+
+class CRUDTrabajoImportacion(CRUDBase[TrabajoImportacion, BaseModel, BaseModel]):
+    def get_en_curso_by_hash(
+        self, db: Session, *, sha256: str, actualizar_existentes: bool
+    ) -> Optional[TrabajoImportacion]:
+        """Trabajo pendiente o en proceso del mismo archivo (un reintento del admin lo reutiliza)."""
+        return db.query(TrabajoImportacion).filter(
+            TrabajoImportacion.sha256 == sha256,
+            TrabajoImportacion.actualizar_existentes == actualizar_existentes,
+            TrabajoImportacion.estado.in_([EstadoImportacionEnum.PENDIENTE, EstadoImportacionEnum.PROCESANDO])
+        ).order_by(TrabajoImportacion.id_trabajo.desc()).first()
+
+trabajo_importacion = CRUDTrabajoImportacion(TrabajoImportacion)
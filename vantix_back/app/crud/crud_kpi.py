@@ -1,4 +1,5 @@
 from typing import List, Optional
+from datetime import date
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 
@@ -43,6 +44,13 @@ class CRUDMaestroMetas(CRUDBase[MaestroMetas, MaestroMetasCreate, MaestroMetasUp
         """Obtiene la primera meta marcada como activa."""
         return db.query(MaestroMetas).filter(MaestroMetas.is_active == 1).first()
 
+    def get_by_fecha(self, db: Session, *, fecha: date) -> Optional[MaestroMetas]:
+        """Obtiene la meta configurada para la semana que contiene la fecha indicada."""
+        return db.query(MaestroMetas).filter(
+            MaestroMetas.fecha_inicio_semana <= fecha,
+            MaestroMetas.fecha_fin_semana >= fecha
+        ).first()
+
 kpi = CRUDKpi(InformeProductividad)
 incentivo = CRUDIncentivo(IncentivoPago)
 maestro_metas = CRUDMaestroMetas(MaestroMetas)
\ No newline at end of file
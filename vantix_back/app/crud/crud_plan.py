@@ -1,12 +1,26 @@
-from typing import List
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, selectinload
 from app.crud.base import CRUDBase
+from app.models.clientes import CarteraClientes
+from app.models.kpi import InformeProductividad
 from app.models.plan import PlanTrabajoSemanal, DetallePlanTrabajo
 from app.schemas.plan import PlanCreate, PlanUpdate, DetallePlanCreate, DetallePlanUpdate
 from pydantic import BaseModel
 
+# Lo que serializa `PlanResponse`, cargado en bloque: la agenda (con su cliente y distrito) en una
+# sola consulta extra por página, y el informe KPI con su meta en el mismo JOIN que los planes.
+# Sin esto, cada plan dispara consultas perezosas por su agenda, por cada cliente y por su informe.
+PLAN_RESPONSE_OPTIONS = (
+    selectinload(PlanTrabajoSemanal.detalles_agenda)
+    .joinedload(DetallePlanTrabajo.cliente)
+    .joinedload(CarteraClientes.distrito),
+    joinedload(PlanTrabajoSemanal.informe_kpi).joinedload(InformeProductividad.maestro),
+)
+
 # 1. CRUD DE LA CABECERA
 class CRUDPlan(CRUDBase[PlanTrabajoSemanal, PlanCreate, PlanUpdate]):
+    page_options = PLAN_RESPONSE_OPTIONS
+
     def create_with_owner(
         self, db: Session, *, obj_in: PlanCreate, id_empleado: int
     ) -> PlanTrabajoSemanal:
@@ -22,8 +36,17 @@ class CRUDPlan(CRUDBase[PlanTrabajoSemanal, PlanCreate, PlanUpdate]):
         db.refresh(db_obj)
         return db_obj
 
+    def get_detail(self, db: Session, *, id: int) -> Optional[PlanTrabajoSemanal]:
+        """Plan con su agenda e informe KPI ya cargados (para responder con `PlanResponse`)."""
+        return (
+            db.query(PlanTrabajoSemanal)
+            .options(*PLAN_RESPONSE_OPTIONS)
+            .filter(PlanTrabajoSemanal.id_plan == id)
+            .first()
+        )
+
     def get_multi_by_owner(self, db: Session, *, id_empleado: int, skip: int = 0, limit: int = 100) -> List[PlanTrabajoSemanal]:
-        return db.query(PlanTrabajoSemanal).filter(PlanTrabajoSemanal.id_empleado == id_empleado).offset(skip).limit(limit).all()
+        return self.get_multi_page(db, filters={"id_empleado": id_empleado}, skip=skip, limit=limit)[0]
 
     def get_active_plan_for_date(self, db: Session, *, id_empleado: int, date_to_check) -> PlanTrabajoSemanal:
         """
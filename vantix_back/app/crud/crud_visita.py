@@ -1,28 +1,48 @@
-from typing import List
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
 from app.crud.base import CRUDBase
+from app.models.clientes import CarteraClientes
 from app.models.visita import RegistroVisita
 from app.schemas.visita import VisitaCreate, VisitaUpdate
 
 class CRUDVisita(CRUDBase[RegistroVisita, VisitaCreate, VisitaUpdate]):
-    
-    def get_by_plan(self, db: Session, *, id_plan: int) -> List[RegistroVisita]:
-        return db.query(RegistroVisita).filter(RegistroVisita.id_plan == id_plan).all()
+    # Listados: las más recientes primero. `VisitaResponse` anida el cliente (con su distrito): se trae
+    # en el mismo JOIN que las visitas, en lugar de una consulta perezosa a cartera_clientes por visita.
+    page_order_by = "fecha_hora_checkin"
+    page_descending = True
+    page_options = (joinedload(RegistroVisita.cliente).joinedload(CarteraClientes.distrito),)
+
+    def get_by_plan(self, db: Session, *, id_plan: int, skip: int = 0, limit: int = 100) -> List[RegistroVisita]:
+        return self.get_multi_page(db, filters={"id_plan": id_plan}, skip=skip, limit=limit)[0]
         
-    def get_by_cliente(self, db: Session, *, id_cliente: int) -> List[RegistroVisita]:
+    def get_by_cliente(self, db: Session, *, id_cliente: int, skip: int = 0, limit: int = 100) -> List[RegistroVisita]:
         # Útil para el historial: "Muéstrame todas las visitas que le hicimos a este cliente"
-        return db.query(RegistroVisita).filter(RegistroVisita.id_cliente == id_cliente).all()
+        return self.get_multi_page(db, filters={"id_cliente": id_cliente}, skip=skip, limit=limit)[0]
 
-    def get_multi_by_owner(self, db: Session, *, id_empleado: int, skip: int = 0, limit: int = 100) -> List[RegistroVisita]:
+    def get_historial_cliente(
+        self, db: Session, *, id_cliente: int, cursor: Optional[str] = None, limit: int = 50
+    ) -> Tuple[List[RegistroVisita], Optional[str]]:
+        """
+        Historial de visitas de un cliente, de la más reciente a la más antigua.
+        Paginación keyset sobre (fecha_hora_checkin, id_visita): un cliente con miles de visitas
+        cuesta lo mismo en la página 1 que en la 100. Retorna (visitas, cursor de la siguiente página o None).
+        """
+        return self.get_multi_page(db, filters={"id_cliente": id_cliente}, cursor=cursor, limit=limit)
+
+    def get_page_by_owner(
+        self, db: Session, *, id_empleado: int, cursor: Optional[str] = None, skip: int = 0, limit: int = 100
+    ) -> Tuple[List[RegistroVisita], Optional[str]]:
         # Join con PlanTrabajoSemanal para filtrar por empleado
         from app.models.plan import PlanTrabajoSemanal
-        return (
+        query = (
             db.query(RegistroVisita)
+            .options(*self.page_options)
             .join(PlanTrabajoSemanal, RegistroVisita.id_plan == PlanTrabajoSemanal.id_plan)
             .filter(PlanTrabajoSemanal.id_empleado == id_empleado)
-            .offset(skip)
-            .limit(limit)
-            .all()
         )
+        return self.paginate(query, cursor=cursor, skip=skip, limit=limit)
+
+    def get_multi_by_owner(self, db: Session, *, id_empleado: int, skip: int = 0, limit: int = 100) -> List[RegistroVisita]:
+        return self.get_page_by_owner(db, id_empleado=id_empleado, skip=skip, limit=limit)[0]
 
-visita = CRUDVisita(RegistroVisita)
\ No newline at end of file
+visita = CRUDVisita(RegistroVisita)
@@ -1,12 +1,34 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.services.common.upload_outbox import upload_outbox
+from app.services.sales.cartera_import_jobs import cartera_import_jobs
+from app.services.external.catalogo_productos import CATALOG_SYNCED_AT_HEADER, catalogo_productos
+from app.services.external.storage import reset_backend
+from app.core.pagination import NEXT_CURSOR_HEADER
 import os
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Worker que sube al hosting las evidencias encoladas
+    upload_outbox.start()
+    # Worker de las importaciones masivas de cartera
+    cartera_import_jobs.start()
+    # Worker que refresca la copia local del catálogo de productos de UpgradeDB
+    catalogo_productos.start()
+    yield
+    upload_outbox.stop()
+    cartera_import_jobs.stop()
+    catalogo_productos.stop()
+    # Cerrar las sesiones ociosas con el almacenamiento de evidencias
+    reset_backend()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.SHOW_DOCS else None,
     docs_url="/docs" if settings.SHOW_DOCS else None,
     redoc_url="/redoc" if settings.SHOW_DOCS else None,
@@ -26,6 +48,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # El navegador solo deja leer al frontend las cabeceras expuestas (cursor de paginación, fecha del catálogo)
+    expose_headers=[NEXT_CURSOR_HEADER, CATALOG_SYNCED_AT_HEADER],
 )
 
 # Montar carpeta estática para servir las fotos
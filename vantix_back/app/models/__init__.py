@@ -7,3 +7,6 @@ from .finanzas import GastoMovilidad
 from .kpi import InformeProductividad, IncentivoPago
 from .geo import Departamento, Provincia, Distrito
 from .cotizacion import Cotizacion, DetalleCotizacion
+from .archivos import SubidaPendiente, ArchivoEvidencia
+from .importacion import TrabajoImportacion
+from .catalogo import ProductoCatalogo, SincronizacionCatalogo
@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum, text
+from app.core.database import Base
+from app.models.enums import EstadoSubidaEnum
+
+class SubidaPendiente(Base):
+    """
+    Cola (outbox) de archivos de evidencia guardados localmente que faltan subir al hosting.
+    Se inserta en la misma transacción que el registro (visita, llamada, email) que usa el archivo.
+    """
+    __tablename__ = "cola_subidas_remotas"
+
+    id_subida = Column(Integer, primary_key=True, index=True)
+
+    # Archivo local y URL provisional (la que se guarda en las columnas url_foto_*)
+    ruta_local = Column(Text, nullable=False)
+    url_local = Column(Text, nullable=False, index=True)
+
+    # Datos para armar la ruta remota Empleado/Actividad/archivo
+    nombre_remoto = Column(String(255), nullable=False)
+    nombre_empleado = Column(String(150), nullable=False)
+    tipo_actividad = Column(String(50), nullable=False)
+
+    estado = Column(SQLEnum(EstadoSubidaEnum, name="estado_subida_enum", values_callable=lambda obj: [e.value for e in obj]), nullable=False, default=EstadoSubidaEnum.PENDIENTE)
+    intentos = Column(Integer, nullable=False, default=0)
+    proximo_intento = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+    ultimo_error = Column(Text)
+
+    url_remota = Column(Text)
+    fecha_creacion = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+    fecha_subida = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # El worker busca siempre las pendientes cuyo próximo intento ya venció
+        Index("ix_cola_subidas_remotas_estado_proximo", "estado", "proximo_intento"),
+    )
+
+
+class ArchivoEvidencia(Base):
+    """
+    Índice local de todos los archivos de evidencia guardados (hosting o static local).
+    La galería se sirve desde esta tabla, sin listar carpetas por FTP.
+    """
+    __tablename__ = "archivos_evidencia"
+
+    id_archivo = Column(Integer, primary_key=True, index=True)
+
+    # URL actual (la local se reemplaza por la remota cuando termina la subida)
+    url = Column(Text, nullable=False, index=True)
+    url_miniatura = Column(Text, index=True)
+
+    id_empleado = Column(Integer, ForeignKey("empleados.id_empleado", ondelete="SET NULL"))
+    tipo_actividad = Column(String(50))  # 'Visita', 'Llamada', 'Correo'
+
+    # Registro dueño del archivo ('visita', 'llamada', 'email' + su id)
+    tipo_registro = Column(String(20))
+    id_registro = Column(Integer)
+
+    nombre_original = Column(String(255))
+    tamano_bytes = Column(BigInteger)
+    sha256 = Column(String(64), index=True)
+    fecha_creacion = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))
+
+    __table_args__ = (
+        # Galería: fotos de un empleado/actividad, más recientes primero (paginación keyset)
+        Index("ix_archivos_evidencia_galeria", "id_empleado", "tipo_actividad", "fecha_creacion", "id_archivo"),
+        Index("ix_archivos_evidencia_registro", "tipo_registro", "id_registro"),
+    )
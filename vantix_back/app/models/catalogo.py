@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Text, Numeric, DateTime, Index, text
+from app.core.database import Base
+
+class ProductoCatalogo(Base):
+    """
+    Copia local del catálogo de productos de UpgradeDB (extcs.productos + extcs.marcas).
+    La búsqueda del cotizador y los precios de las cotizaciones se leen de aquí, sin consultar el ERP;
+    un worker la refresca cada PRODUCT_CATALOG_SYNC_MINUTES trayendo solo los productos que cambiaron.
+    """
+    __tablename__ = "productos_catalogo"
+
+    id_producto = Column(Integer, primary_key=True, autoincrement=False)  # Mismo id que en UpgradeDB
+    codigo = Column(String(100))
+    nombre = Column(Text)
+    descripcion = Column(Text)
+    marca = Column(String(255))
+    modelo = Column(String(255))
+    ecom_precio = Column(Numeric(15, 2))
+
+    hash_origen = Column(String(32), nullable=False)  # md5 de la fila en UpgradeDB: si no cambia, no se vuelve a traer
+    fecha_sincronizacion = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))  # Última vez que cambió
+
+    __table_args__ = (
+        # Búsqueda parcial (ILIKE '%texto%') por nombre o código
+        Index("ix_productos_catalogo_nombre_trgm", "nombre", postgresql_using="gin", postgresql_ops={"nombre": "gin_trgm_ops"}),
+        Index("ix_productos_catalogo_codigo_trgm", "codigo", postgresql_using="gin", postgresql_ops={"codigo": "gin_trgm_ops"}),
+    )
+
+
+class SincronizacionCatalogo(Base):
+    """Estado de la sincronización de cada catálogo copiado de UpgradeDB (una fila por catálogo)."""
+    __tablename__ = "sincronizaciones_catalogo"
+
+    catalogo = Column(String(50), primary_key=True)  # 'productos'
+    fecha_ultima_exitosa = Column(DateTime(timezone=True))  # Hasta aquí la copia está al día
+    fecha_ultimo_intento = Column(DateTime(timezone=True))
+    ultimo_error = Column(Text)
+    total_registros = Column(Integer, nullable=False, default=0)
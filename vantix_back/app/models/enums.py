@@ -39,4 +39,16 @@ class EstadoPlanEnum(str, enum.Enum):
     BORRADOR = 'Borrador'
     ENVIADO = 'Enviado'
     APROBADO = 'Aprobado'
-    RECHAZADO = 'Rechazado'
\ No newline at end of file
+    RECHAZADO = 'Rechazado'
+
+class EstadoSubidaEnum(str, enum.Enum):
+    PENDIENTE = 'Pendiente'
+    PROCESANDO = 'Procesando'
+    SUBIDO = 'Subido'
+    FALLIDO = 'Fallido'
+
+class EstadoImportacionEnum(str, enum.Enum):
+    PENDIENTE = 'Pendiente'
+    PROCESANDO = 'Procesando'
+    COMPLETADO = 'Completado'
+    FALLIDO = 'Fallido'
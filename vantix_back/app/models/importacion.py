@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, Enum as SQLEnum, text
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.database import Base
+from app.models.enums import EstadoImportacionEnum
+
+class TrabajoImportacion(Base):
+    """
+    Importación masiva de cartera en segundo plano.
+    El request solo guarda el archivo y crea el trabajo; un worker lo procesa hoja por hoja
+    y va actualizando aquí el avance (el frontend lo consulta por su id).
+    """
+    __tablename__ = "trabajos_importacion"
+
+    id_trabajo = Column(Integer, primary_key=True, index=True)
+    id_empleado = Column(Integer, ForeignKey("empleados.id_empleado", ondelete="SET NULL"))  # Quién lo subió
+
+    nombre_archivo = Column(String(255), nullable=False)
+    ruta_archivo = Column(Text, nullable=False)
+    sha256 = Column(String(64), nullable=False)  # Reenviar el mismo archivo no crea otro trabajo
+    actualizar_existentes = Column(Boolean, nullable=False, default=False)
+
+    estado = Column(SQLEnum(EstadoImportacionEnum, name="estado_importacion_enum", values_callable=lambda obj: [e.value for e in obj]), nullable=False, default=EstadoImportacionEnum.PENDIENTE)
+
+    # Avance
+    hojas_total = Column(Integer)
+    hojas_procesadas = Column(Integer, nullable=False, default=0)
+    filas_procesadas = Column(Integer, nullable=False, default=0)
+    registros_insertados = Column(Integer, nullable=False, default=0)
+    registros_actualizados = Column(Integer, nullable=False, default=0)
+    registros_omitidos = Column(Integer, nullable=False, default=0)
+    hojas_leidas = Column(JSONB, nullable=False, default=list)  # 'Hoja (Asignado a ID: n)'
+    errores = Column(JSONB, nullable=False, default=list)  # Hojas que fallaron (las demás se guardan igual)
+    coincidencias_ambiguas = Column(JSONB, nullable=False, default=list)  # Hojas con varios vendedores posibles (quedan sin asignar)
+
+    fecha_creacion = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+    fecha_inicio = Column(DateTime(timezone=True))
+    fecha_actualizacion = Column(DateTime(timezone=True))  # Latido del worker: se renueva en cada hoja
+    fecha_fin = Column(DateTime(timezone=True))
+
+    __table_args__ = (
+        # El worker toma el trabajo pendiente más antiguo
+        Index("ix_trabajos_importacion_estado_creacion", "estado", "fecha_creacion"),
+        Index("ix_trabajos_importacion_sha256", "sha256"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Numeric, Enum as SQLEnum, text
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Numeric, Enum as SQLEnum, text, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.enums import ResultadoEstadoEnum
@@ -13,7 +13,7 @@ class RegistroVisita(Base):
     id_cliente = Column(Integer, ForeignKey("cartera_clientes.id_cliente", ondelete="RESTRICT"))
     nombre_tecnico = Column(String(150)) # Movido desde el plan a la visita
     
-    fecha_hora_checkin = Column(DateTime(timezone=True), server_default=text("CURRENT_TIMESTAMP"))
+    fecha_hora_checkin = Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"))  # Orden keyset del historial: nunca NULL
     observaciones = Column(Text)
     
     # Evidencia fotográfica
@@ -28,4 +28,13 @@ class RegistroVisita(Base):
 
     # Relaciones
     plan = relationship("PlanTrabajoSemanal", back_populates="visitas")
-    cliente = relationship("CarteraClientes")
\ No newline at end of file
+    cliente = relationship("CarteraClientes")
+
+    __table_args__ = (
+        # Historial por cliente (paginación keyset, más recientes primero) y visitas de un plan
+        Index("ix_registro_visitas_cliente_checkin", "id_cliente", "fecha_hora_checkin", "id_visita"),
+        Index("ix_registro_visitas_plan_checkin", "id_plan", "fecha_hora_checkin"),
+        # El outbox reemplaza la URL local por la remota al terminar cada subida
+        Index("ix_registro_visitas_url_foto_lugar", "url_foto_lugar"),
+        Index("ix_registro_visitas_url_foto_sello", "url_foto_sello"),
+    )
@@ -1,13 +1,13 @@
 from .maestro import MaestroCreate, MaestroUpdate, MaestroResponse
 from .cartera import CarteraCreate, CarteraUpdate, CarteraResponse
 from .plan import PlanCreate, PlanUpdate, PlanResponse, DetallePlanCreate, DetallePlanUpdate, DetallePlanResponse
-from .visita import VisitaCreate, VisitaResponse, VisitaBase
+from .visita import VisitaCreate, VisitaResponse, VisitaBase, VisitaHistorialResponse
 from .geo import (
     DepartamentoCreate, DepartamentoUpdate, DepartamentoResponse,
     ProvinciaCreate, ProvinciaUpdate, ProvinciaResponse,
     DistritoCreate, DistritoUpdate, DistritoResponse
 )
-from .empleado import EmpleadoCreate, EmpleadoUpdate, EmpleadoResponse
+from .empleado import EmpleadoCreate, EmpleadoUpdate, EmpleadoResponse, EmpleadoPrincipal
 from .finanzas import GastoCreate, GastoUpdate, GastoResponse
 from .kpi import (
     InformeProductividadResponse, KpiUpdate,
@@ -16,3 +16,5 @@ from .kpi import (
 from .crm import LlamadaCreate, LlamadaResponse, EmailCreate, EmailResponse
 from . import token
 from .cotizacion import CotizacionCreate, CotizacionUpdate, CotizacionResponse, DetalleCotizacionCreate, DetalleCotizacionUpdate, DetalleCotizacionResponse
+from .almacenamiento import FotoEvidenciaResponse, GaleriaFotosResponse
+from .importacion import TrabajoImportacionResponse
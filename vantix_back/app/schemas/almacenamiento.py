@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class FotoEvidenciaResponse(BaseModel):
+    id_archivo: int
+    url: str
+    url_miniatura: Optional[str] = None  # None en fotos subidas antes de generar miniaturas
+    tipo_actividad: Optional[str] = None
+    tipo_registro: Optional[str] = None
+    id_registro: Optional[int] = None
+    tamano_bytes: Optional[int] = None
+    fecha_creacion: datetime
+
+    class Config:
+        from_attributes = True
+
+class GaleriaFotosResponse(BaseModel):
+    items: List[FotoEvidenciaResponse]
+    next_cursor: Optional[str] = None  # Enviar como `cursor` para obtener la siguiente página
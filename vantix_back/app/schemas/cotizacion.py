@@ -15,7 +15,8 @@ class DetalleCotizacionBase(BaseModel):
     id_moneda: int
 
 class DetalleCotizacionCreate(DetalleCotizacionBase):
-    pass
+    # Se toma del catálogo de productos (copia local de UpgradeDB); solo hace falta si el producto no está en él
+    precio_producto: Optional[Decimal] = None
 
 class DetalleCotizacionUpdate(BaseModel):
     id_detalle: Optional[int] = None # Si es nuevo puede no tener
@@ -34,4 +34,19 @@ class EmpleadoResponse(EmpleadoBase):
     fecha_ingreso: Optional[date] = None # Puede ser null al inicio o default
 
     class Config:
-        from_attributes = True # ¡Vital! Permite leer datos del modelo SQLAlchemy
\ No newline at end of file
+        from_attributes = True # ¡Vital! Permite leer datos del modelo SQLAlchemy
+
+# Principal: Datos del usuario autenticado que se cachean entre requests (sin validar formato)
+class EmpleadoPrincipal(BaseModel):
+    id_empleado: int
+    nombre_completo: str
+    dni: str
+    cargo: Optional[str] = None
+    email_corporativo: Optional[str] = None
+    is_admin: Optional[bool] = False
+    activo: Optional[bool] = True
+    id_vendedor_externo: Optional[int] = None
+    fecha_ingreso: Optional[date] = None
+
+    class Config:
+        from_attributes = True
@@ -42,3 +42,26 @@ class ExternalFormaPagoResponse(BaseModel):
     nombre: str
     efectivo: Optional[bool] = None
     inactivo: Optional[bool] = None
+
+class ExternalCatalogoEstadoResponse(BaseModel):
+    catalogo: str
+    fecha_ultima_exitosa: Optional[datetime] = None  # Fecha de los datos que entrega la copia local
+    fecha_ultimo_intento: Optional[datetime] = None
+    ultimo_error: Optional[str] = None
+    total_registros: int = 0
+
+    class Config:
+        from_attributes = True
+
+class ExternalPoolStatsResponse(BaseModel):
+    size: int
+    max_size: int
+    in_use: int
+    idle: int
+    waiting: int
+    created: int
+    discarded: int
+
+class StoragePoolStatsResponse(BaseModel):
+    backend: str
+    pool: Optional[ExternalPoolStatsResponse] = None  # Solo FTP/SFTP mantienen sesiones
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.models.enums import EstadoImportacionEnum
+
+
+class CandidatoEmpleado(BaseModel):
+    id_empleado: int
+    nombre_completo: str
+    puntaje: float  # 0 a 1
+    tipo: str  # 'exacta', 'palabras' o 'aproximada'
+
+
+class CoincidenciaAmbigua(BaseModel):
+    """Hoja cuyo nombre coincide con varios empleados: se importó sin asignar."""
+    hoja: str
+    candidatos: List[CandidatoEmpleado]
+
+
+class TrabajoImportacionResponse(BaseModel):
+    id_trabajo: int
+    nombre_archivo: str
+    actualizar_existentes: bool
+    estado: EstadoImportacionEnum
+
+    # Avance (se actualiza al terminar cada hoja)
+    hojas_total: Optional[int] = None
+    hojas_procesadas: int = 0
+    filas_procesadas: int = 0
+    registros_insertados: int = 0
+    registros_actualizados: int = 0
+    registros_omitidos: int = 0
+    hojas_leidas: List[str] = []
+    errores: List[str] = []
+    coincidencias_ambiguas: List[CoincidenciaAmbigua] = []
+
+    fecha_creacion: Optional[datetime] = None
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 from app.models.enums import ResultadoEstadoEnum
@@ -49,4 +49,8 @@ class VisitaResponse(VisitaBase):
     cliente: Optional[CarteraResponse] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class VisitaHistorialResponse(BaseModel):
+    items: List[VisitaResponse]
+    next_cursor: Optional[str] = None  # Enviar como `cursor` para obtener la siguiente página
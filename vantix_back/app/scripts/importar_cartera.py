@@ -1,103 +1,102 @@
-import pandas as pd
+"""
+Importación de cartera desde la línea de comandos (por ejemplo, los CSV nocturnos del equipo comercial).
+Usa el mismo motor que `POST /cartera/importar-masivo/`: lectura en streaming, limpieza por bloques
+y carga con COPY + INSERT ... ON CONFLICT por RUC/DNI (los RUC que ya existen se omiten, o se
+actualizan con --actualizar-existentes). Hace commit cada --tamano-lote filas.
+A diferencia del endpoint, también importa los bloques de gerente y logístico y une las observaciones
+e interacciones del archivo en `observaciones`.
+
+    python app/scripts/importar_cartera.py "Cartera 2026 - 4. Jose Leonardo.csv" --tamano-lote 10000
+"""
+import argparse
 import os
 import sys
+import time
+from typing import Optional
 
 # Esto permite que el script encuentre la carpeta "app" de tu proyecto
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.models.clientes import CarteraClientes
-from app.models.enums import CategoriaClienteEnum
+from app.services.sales.cartera_import import CarteraImportService
 
-def limpiar_dato(valor):
-    """Convierte los valores vacíos (NaN) de pandas en None para la Base de Datos"""
-    if pd.isna(valor) or str(valor).strip() == '':
-        return None
-    return str(valor).strip()
 
-def mapear_categoria(valor):
-    """Convierte el texto del Excel al Enum de la Base de Datos"""
-    valor = limpiar_dato(valor)
-    if not valor: return None
-    
-    val_upper = valor.upper()
-    if 'GOBIERNO' in val_upper: return CategoriaClienteEnum.GOBIERNO
-    if 'CORPORATIVO' in val_upper: return CategoriaClienteEnum.CORPORATIVO
-    if 'RETAIL' in val_upper: return CategoriaClienteEnum.RETAIL
-    return None
+def importar_archivo(
+    ruta_archivo: str,
+    *,
+    tamano_lote: int,
+    actualizar_existentes: bool = False,
+    id_empleado: Optional[int] = None
+) -> dict:
+    db = SessionLocal()
+    inicio = time.perf_counter()
+
+    def al_terminar_lote(resumen: dict) -> None:
+        db.commit()
+        segundos = time.perf_counter() - inicio
+        print(
+            f"  {resumen['filas_procesadas']} filas ({resumen['filas_procesadas'] / segundos:,.0f} filas/s): "
+            f"{resumen['registros_insertados']} nuevos, {resumen['registros_actualizados']} actualizados, "
+            f"{resumen['registros_omitidos_o_duplicados']} omitidos"
+        )
 
-def importar_excel_a_bd(ruta_archivo: str):
-    db: Session = SessionLocal()
-    
     print(f"Leyendo archivo: {ruta_archivo}...")
-    # Leemos el CSV (o puedes usar pd.read_excel si es .xlsx)
-    df = pd.read_csv(ruta_archivo)
-    
-    clientes_nuevos = []
-    
-    for index, row in df.iterrows():
-        nombre = limpiar_dato(row.get('Nombre del cliente'))
-        if not nombre:
-            continue # Si la fila no tiene nombre, la saltamos
-            
-        ruc_dni = limpiar_dato(row.get('RUC / DNI'))
-        
-        # Corrección: Pandas a veces lee los RUCs como decimales (Ej: 20123.0)
-        if ruc_dni and ruc_dni.endswith('.0'):
-            ruc_dni = ruc_dni[:-2]
-            
-        # EVITAR DUPLICADOS: Si el RUC ya está en la BD, lo saltamos
-        if ruc_dni:
-            existe = db.query(CarteraClientes).filter(CarteraClientes.ruc_dni == ruc_dni).first()
-            if existe:
-                print(f"-> Omitiendo RUC {ruc_dni} (Ya existe en la Base de Datos)")
-                continue
+    try:
+        resumen = CarteraImportService.importar_libro(
+            db,
+            ruta_archivo,
+            actualizar_existentes=actualizar_existentes,
+            id_empleado=id_empleado,
+            tamano_bloque=tamano_lote,
+            columnas_extendidas=True,
+            al_terminar_bloque=al_terminar_lote
+        )
+    finally:
+        db.close()
+    segundos = time.perf_counter() - inicio
 
-        # Unir Observaciones e Interacciones en un solo campo
-        obs = limpiar_dato(row.get('Observaciones'))
-        interaccion = limpiar_dato(row.get('Detalle de interacción'))
-        obs_final = " | ".join(filter(None, [obs, interaccion]))
+    for hoja in resumen["hojas_leidas"]:
+        print(f"-> Hoja importada: {hoja}")
+    for ambigua in resumen["coincidencias_ambiguas"]:
+        candidatos = ", ".join(f"{c['nombre_completo']} (ID {c['id_empleado']})" for c in ambigua["candidatos"])
+        print(f"-> Hoja '{ambigua['hoja']}' sin asignar, nombre ambiguo: {candidatos}")
+    for error in resumen["errores"]:
+        print(f"-> Error: {error}")
+
+    print(
+        f"{resumen['filas_procesadas']} filas en {segundos:.1f} s "
+        f"({resumen['filas_procesadas'] / max(segundos, 1e-9):,.0f} filas/s): "
+        f"{resumen['registros_insertados']} nuevos, {resumen['registros_actualizados']} actualizados, "
+        f"{resumen['registros_omitidos_o_duplicados']} omitidos o duplicados"
+    )
+    print("¡Proceso completado con ÉXITO! ✅" if not resumen["errores"] else "Proceso completado con errores ⚠️")
+    return resumen
 
-        # Crear el objeto SQLAlchemy
-        nuevo_cliente = CarteraClientes(
-            nombre_cliente=nombre,
-            ruc_dni=ruc_dni,
-            categoria=mapear_categoria(row.get('Categoría del cliente')),
-            direccion=limpiar_dato(row.get('Dirección')),
-            
-            # Contacto Principal
-            nombre_contacto=limpiar_dato(row.get('Nombre del contacto')),
-            celular_contacto=limpiar_dato(row.get('Celular')),
-            email_contacto=limpiar_dato(row.get('Correo electrónico')),
-            
-            # Gerencia
-            nombre_gerente=limpiar_dato(row.get('Gerente General')),
-            celular_gerente=limpiar_dato(row.get('Celular 2')),
-            email_gerente=limpiar_dato(row.get('Correo electrónico 2')),
-            
-            # Logística/TI
-            nombre_logistico=limpiar_dato(row.get('Logístico/TI')),
-            celular_logistico=limpiar_dato(row.get('Celular 3')),
-            email_logistico=limpiar_dato(row.get('Correo Electrónico')),
-            
-            observaciones=obs_final if obs_final else None
-        )
-        
-        clientes_nuevos.append(nuevo_cliente)
-        
-    # Inserción Masiva (Bulk Insert)
-    if clientes_nuevos:
-        print(f"Insertando {len(clientes_nuevos)} clientes en la Base de Datos...")
-        db.add_all(clientes_nuevos)
-        db.commit()
-        print("¡Proceso completado con ÉXITO! ✅")
-    else:
-        print("No se encontraron clientes nuevos para insertar. ⚠️")
-        
-    db.close()
 
 if __name__ == "__main__":
-    # Cambia esto por el nombre de tu archivo exacto
-    archivo_csv = "Cartera activa por cada ejecutivo comercial 2026.xlsx - 4. Jose Leonardo.csv"
-    importar_excel_a_bd(archivo_csv)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Importa una cartera de clientes desde un archivo .csv, .xlsx o .xls")
+    parser.add_argument("archivo", help="Ruta del archivo; en un libro, cada hoja es la cartera de un vendedor")
+    parser.add_argument(
+        "--tamano-lote", type=int, default=settings.CARTERA_IMPORT_CHUNK_ROWS,
+        help="Filas que se guardan por commit (por defecto CARTERA_IMPORT_CHUNK_ROWS)"
+    )
+    parser.add_argument(
+        "--actualizar-existentes", action="store_true",
+        help="Actualiza los datos de los clientes cuyo RUC ya existe (por defecto se omiten)"
+    )
+    parser.add_argument(
+        "--id-empleado", type=int,
+        help="Asigna todo el archivo a este vendedor (por defecto se busca por el nombre de la hoja)"
+    )
+    args = parser.parse_args()
+    if args.tamano_lote < 1:
+        parser.error("--tamano-lote debe ser mayor que 0")
+
+    resumen = importar_archivo(
+        args.archivo,
+        tamano_lote=args.tamano_lote,
+        actualizar_existentes=args.actualizar_existentes,
+        id_empleado=args.id_empleado
+    )
+    sys.exit(1 if resumen["errores"] else 0)
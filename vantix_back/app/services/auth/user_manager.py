@@ -0,0 +1,45 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.empleado import EmpleadoPrincipal
+
+
+class PrincipalCache:
+    """
+    Caché de corta duración del usuario autenticado (id_empleado -> datos del empleado).
+
+    Evita consultar `empleados` por clave primaria en cada request autenticado.
+    Guarda solo los campos públicos del empleado (EmpleadoPrincipal), nunca el hash de la contraseña.
+    Los endpoints que editan o activan/desactivan empleados deben llamar a `evict`, para que
+    los cambios (por ejemplo, una desactivación) tengan efecto de inmediato; el TTL corto
+    cubre los demás workers.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self._cache = TTLCache(ttl_seconds, max_size=max_size)
+
+    def get(self, db: Session, id_empleado: int) -> Optional[EmpleadoPrincipal]:
+        principal = self._cache.get(id_empleado)
+        if principal:
+            return principal
+
+        empleado = crud.empleado.get(db, id=id_empleado)
+        if not empleado:
+            return None
+        principal = EmpleadoPrincipal.model_validate(empleado)
+        self._cache.set(id_empleado, principal)
+        return principal
+
+    def evict(self, id_empleado: int) -> None:
+        self._cache.pop(id_empleado)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_PRINCIPAL_CACHE_MAX_SIZE
+)
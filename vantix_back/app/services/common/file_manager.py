@@ -1,16 +1,75 @@
-import shutil
+import io
 import os
+import asyncio
+import functools
+import hashlib
+import anyio
 from uuid import uuid4
 from fastapi import UploadFile, HTTPException
 from pathlib import Path
-from typing import Optional
+from sqlalchemy.orm import Session
+from typing import BinaryIO, List, NamedTuple, Optional
+from app import crud
 from app.core.config import settings
-from app.services.external.remote_storage import RemoteStorageService
+from app.services.common.image_processor import image_processor
+from app.services.common.nombres import normalizar_nombre
+from app.services.common.upload_outbox import upload_outbox
+from app.services.external.remote_storage import RemoteStorageService, THUMBNAIL_DIR
 
-# Directorio base para archivos locales (como fallback o temporal)
+# Directorio base para archivos locales (como fallback o en espera de subirse)
 BASE_UPLOAD_DIR = Path("static/uploads")
+# URL con la que /static sirve esos archivos
+LOCAL_URL_PREFIX = "/static/uploads/"
+
+# Los uploads se copian por bloques de tamaño fijo (nunca se cargan enteros en memoria)
+CHUNK_SIZE = 1024 * 1024
+
+
+class StoredFile(NamedTuple):
+    """Resultado de guardar un archivo en disco: URL local, ruta, tamaño y SHA-256."""
+    url: str
+    path: Path
+    size: int
+    sha256: str
+
+
+class _UploadReader:
+    """
+    Envuelve el archivo recibido: lo entrega por bloques, calcula el SHA-256 al vuelo
+    y corta con 413 apenas se supera el tamaño máximo.
+    """
+
+    def __init__(self, source: BinaryIO, max_bytes: int):
+        self._source = source
+        self._max_bytes = max_bytes
+        self.seek(0)
+
+    def read(self, size: int = CHUNK_SIZE) -> bytes:
+        chunk = self._source.read(size if size and size > 0 else CHUNK_SIZE)
+        self.size += len(chunk)
+        if self.size > self._max_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"El archivo supera el tamaño máximo permitido ({self._max_bytes // (1024 * 1024)} MB)"
+            )
+        self._hash.update(chunk)
+        return chunk
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Solo se admite volver al inicio (reinicia el conteo y el hash); cualquier otra posición falla."""
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("El upload solo admite seek(0)")
+        self._source.seek(0)
+        self.size = 0
+        self._hash = hashlib.sha256()
+        return 0
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
 
 class FileManager:
+    _upload_limiter: Optional[anyio.CapacityLimiter] = None
     
     @staticmethod
     async def save_upload_file(
@@ -18,12 +77,19 @@ class FileManager:
         subdirectory: str = "general", 
         prefix: Optional[str] = None,
         employee_name: Optional[str] = None,
-        activity_type: Optional[str] = None
+        activity_type: Optional[str] = None,
+        db: Optional[Session] = None,
+        id_empleado: Optional[int] = None
     ) -> str:
         """
         Guarda un archivo subido. 
         Si el servidor remoto está configurado, lo sube allá con la estructura de carpetas solicitada.
         De lo contrario, lo guarda localmente.
+        Si se pasa `db`, no espera al hosting: guarda el archivo localmente, encola la subida
+        (se confirma con el commit del registro) y retorna la URL local, que el worker
+        reemplazará por la remota cuando la subida termine. Con `db` el archivo además
+        queda indexado en `archivos_evidencia` (galería) y se guarda por contenido: si ya
+        existe el mismo archivo, se reutiliza (en ese caso `prefix` no se usa).
         """
         if not file or not file.filename:
             raise HTTPException(status_code=400, detail="Archivo no válido o sin nombre")
@@ -42,63 +108,306 @@ class FileManager:
         unique_name = f"{uuid4()}{file_ext}"
         if prefix:
             unique_name = f"{prefix}_{unique_name}"
-            
-        # 3. GUARDAR LOCALMENTE PRIMERO (Temporalmente)
-        temp_path = BASE_UPLOAD_DIR / "temp"
-        temp_path.mkdir(parents=True, exist_ok=True)
-        file_dest = temp_path / unique_name
 
+        # 3. Rechazar archivos demasiado grandes sin leerlos (el tamaño ya viene del multipart)
+        max_bytes = settings.UPLOAD_MAX_FILE_SIZE_MB * 1024 * 1024
+        if file.size is not None and file.size > max_bytes:
+            await file.close()
+            raise HTTPException(
+                status_code=413,
+                detail=f"El archivo supera el tamaño máximo permitido ({settings.UPLOAD_MAX_FILE_SIZE_MB} MB)"
+            )
+
+        use_outbox = (
+            db is not None
+            and settings.UPLOAD_OUTBOX_ENABLED
+            and RemoteStorageService.is_configured()
+            and employee_name and activity_type
+        )
         try:
-            with open(file_dest, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error al procesar archivo temporal: {str(e)}")
+            # 4. Fotos: quitar EXIF, reducir, recomprimir y generar la miniatura (en su propio pool de hilos)
+            source, thumbnail = file.file, None
+            if image_processor.is_supported(file_ext):
+                source, thumbnail = await image_processor.process_async(file.file, file_ext)
+
+            # 5. Con sesión: deduplicar por contenido e indexar en `archivos_evidencia`
+            if db is not None:
+                return await FileManager._save_deduplicated(
+                    db, source, thumbnail, file_ext,
+                    original_name=file.filename,
+                    subdirectory=subdirectory,
+                    employee_name=employee_name,
+                    activity_type=activity_type,
+                    id_empleado=id_empleado,
+                    use_outbox=use_outbox
+                )
+
+            # 6. Sin sesión: publicar con nombre único y, si hay, la miniatura en la subcarpeta `thumbs/`
+            publish_options = dict(
+                folder=subdirectory, employee_name=employee_name, activity_type=activity_type, outbox_db=None
+            )
+            stored = await anyio.to_thread.run_sync(
+                functools.partial(FileManager._store_local, source, f"{uuid4()}{file_ext}", subdirectory),
+                limiter=FileManager._get_upload_limiter()
+            )
+            url = await FileManager._publish(stored.path, unique_name, **publish_options)
+            if thumbnail is not None:
+                thumb = await anyio.to_thread.run_sync(
+                    FileManager._store_local, thumbnail, f"{uuid4()}{file_ext}", subdirectory
+                )
+                await FileManager._publish(thumb.path, FileManager.thumbnail_name(unique_name), **publish_options)
+            return url
         finally:
             await file.close()
 
-        # 4. ¿TENEMOS SERVIDOR REMOTO CONFIGURADO?
-        if settings.REMOTE_STORAGE_HOST and employee_name and activity_type:
-            remote_url = RemoteStorageService.upload_file(
-                local_path=str(file_dest),
-                remote_filename=unique_name,
-                employee_name=employee_name,
-                activity_type=activity_type
+    @staticmethod
+    async def _save_deduplicated(
+        db: Session,
+        source: BinaryIO,
+        thumbnail: Optional[BinaryIO],
+        file_ext: str,
+        *,
+        original_name: str,
+        subdirectory: str,
+        employee_name: Optional[str],
+        activity_type: Optional[str],
+        id_empleado: Optional[int],
+        use_outbox: bool
+    ) -> str:
+        """
+        Guarda el archivo bajo una clave de contenido y lo indexa. La carpeta local es propia del
+        empleado y la actividad (<subdirectorio>/<id_empleado>/<actividad>/<sha256><ext>), el mismo
+        alcance que la búsqueda por hash: nunca se comparte un archivo con otro empleado.
+        Si el empleado ya subió ese mismo contenido para la misma actividad, reutiliza el archivo
+        existente (no se vuelve a transferir) y solo agrega otra referencia en el índice.
+        """
+        folder = FileManager._content_folder(subdirectory, id_empleado, activity_type)
+        publish_options = dict(
+            folder=folder,
+            employee_name=employee_name,
+            activity_type=activity_type,
+            outbox_db=db if use_outbox else None
+        )
+
+        # 1. Guardar con nombre provisional, calculando el hash mientras se escribe
+        stored = await anyio.to_thread.run_sync(
+            functools.partial(FileManager._store_local, source, f"{uuid4()}{file_ext}", folder),
+            limiter=FileManager._get_upload_limiter()
+        )
+
+        existing = crud.archivo_evidencia.get_by_hash(
+            db, sha256=stored.sha256, id_empleado=id_empleado, tipo_actividad=activity_type
+        )
+        if existing:
+            # 2a. Contenido repetido: se descarta la copia nueva. Si el original sigue local, se
+            # asegura su subida en cola (si la anterior ya terminó, el worker reutiliza su URL remota)
+            stored.path.unlink(missing_ok=True)
+            url, thumbnail_url = existing.url, existing.url_miniatura
+            if use_outbox:
+                name = url.rpartition("/")[2]
+                FileManager._enqueue_local(db, url, name, employee_name=employee_name, activity_type=activity_type)
+                if thumbnail_url:
+                    FileManager._enqueue_local(
+                        db, thumbnail_url, FileManager.thumbnail_name(name),
+                        employee_name=employee_name, activity_type=activity_type
+                    )
+        else:
+            # 2b. Contenido nuevo: se publica con su clave de contenido (cola, hosting o local)
+            content_name = f"{stored.sha256}{file_ext}"
+            url = await FileManager._publish(stored.path, content_name, **publish_options)
+
+            thumbnail_url = None
+            if thumbnail is not None:
+                thumb = await anyio.to_thread.run_sync(
+                    FileManager._store_local, thumbnail, f"{uuid4()}{file_ext}", folder
+                )
+                thumbnail_url = await FileManager._publish(
+                    thumb.path, FileManager.thumbnail_name(content_name), **publish_options
+                )
+
+        # 3. Cada subida es una referencia más en el índice (se confirma con el commit del registro dueño)
+        crud.archivo_evidencia.register(
+            db,
+            url=url,
+            url_miniatura=thumbnail_url,
+            id_empleado=id_empleado,
+            tipo_actividad=activity_type,
+            nombre_original=original_name,
+            tamano_bytes=stored.size,
+            sha256=stored.sha256
+        )
+        return url
+
+    @staticmethod
+    def _content_folder(subdirectory: str, id_empleado: Optional[int], activity_type: Optional[str]) -> str:
+        """Carpeta (relativa a static/uploads) de los archivos por contenido de un empleado y actividad."""
+        owner = str(id_empleado) if id_empleado is not None else "sin_empleado"
+        activity = normalizar_nombre(activity_type).replace(" ", "_") or "general"
+        return f"{subdirectory}/{owner}/{activity}"
+
+    @staticmethod
+    def _promote(path: Path, target: Path) -> None:
+        """Mueve el archivo provisional a su nombre definitivo (si ya existe es una clave de contenido: es el mismo)."""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            path.unlink(missing_ok=True)
+        else:
+            path.rename(target)
+
+    @staticmethod
+    async def _publish(
+        path: Path,
+        name: str,
+        *,
+        folder: str,
+        employee_name: Optional[str],
+        activity_type: Optional[str],
+        outbox_db: Optional[Session]
+    ) -> str:
+        """
+        Publica el archivo provisional `path` con el nombre `name`: lo sube directamente (outbox
+        desactivado) desde su copia provisional, que no comparte con ninguna otra subida; o bien lo
+        mueve a static/uploads/<folder>/<name> y lo encola para el hosting o lo deja local.
+        """
+        if outbox_db is None and RemoteStorageService.is_configured() and employee_name and activity_type:
+            remote_url = await anyio.to_thread.run_sync(
+                functools.partial(
+                    RemoteStorageService.upload_file,
+                    local_path=str(path),
+                    remote_filename=name,
+                    employee_name=employee_name,
+                    activity_type=activity_type
+                ),
+                limiter=FileManager._get_upload_limiter()
             )
-            
             if remote_url:
-                # Borrar temporal después de subir exitosamente
-                if os.path.exists(file_dest):
-                    os.remove(file_dest)
+                path.unlink(missing_ok=True)
                 return remote_url
 
-        # 5. SI NO HAY REMOTO O FALLÓ, MOVER A STATIC LOCAL (Fallback)
-        final_local_dir = BASE_UPLOAD_DIR / subdirectory
-        final_local_dir.mkdir(parents=True, exist_ok=True)
-        final_local_path = final_local_dir / unique_name
-        
-        shutil.move(str(file_dest), str(final_local_path))
-        
-        return f"/static/uploads/{subdirectory}/{unique_name}"
+        await anyio.to_thread.run_sync(FileManager._promote, path, BASE_UPLOAD_DIR / folder / name)
+        local_url = FileManager._local_url(folder, name)
+        if outbox_db is not None:
+            FileManager._enqueue_local(
+                outbox_db, local_url, name, employee_name=employee_name, activity_type=activity_type
+            )
+        return local_url
+
+    @staticmethod
+    def _enqueue_local(
+        db: Session, url: str, name: str, *, employee_name: Optional[str], activity_type: Optional[str]
+    ) -> None:
+        """Encola la subida de un archivo de static/uploads (si `url` ya es remota, no hay nada que hacer)."""
+        if not url.startswith(LOCAL_URL_PREFIX):
+            return
+        upload_outbox.enqueue(
+            db,
+            ruta_local=str(BASE_UPLOAD_DIR / url[len(LOCAL_URL_PREFIX):]),
+            url_local=url,
+            nombre_remoto=name,
+            nombre_empleado=employee_name,
+            tipo_actividad=activity_type
+        )
+
+    @staticmethod
+    async def save_upload_files(*uploads: dict) -> List[str]:
+        """
+        Guarda varios archivos en paralelo (por ejemplo, las dos fotos de una visita).
+        Cada elemento son los argumentos de `save_upload_file`. Retorna las URLs en el mismo orden.
+        """
+        return list(await asyncio.gather(
+            *(FileManager.save_upload_file(**upload) for upload in uploads)
+        ))
+
+    @staticmethod
+    def _get_upload_limiter() -> anyio.CapacityLimiter:
+        """Límite de subidas simultáneas por worker (evita agotar las sesiones FTP del hosting)."""
+        if FileManager._upload_limiter is None:
+            FileManager._upload_limiter = anyio.CapacityLimiter(settings.REMOTE_STORAGE_MAX_CONCURRENT_UPLOADS)
+        return FileManager._upload_limiter
+
+    @staticmethod
+    def thumbnail_name(unique_name: str) -> str:
+        """Nombre (relativo a la carpeta del original) de la miniatura de un archivo."""
+        return f"{THUMBNAIL_DIR}/{unique_name}"
+
+    @staticmethod
+    def thumbnail_url(path_url: str) -> str:
+        """URL de la miniatura de una foto: misma carpeta que el original, dentro de `thumbs/`."""
+        folder, _, name = path_url.rpartition("/")
+        return f"{folder}/{THUMBNAIL_DIR}/{name}"
+
+    @staticmethod
+    def _local_url(subdirectory: str, unique_name: str) -> str:
+        return f"{LOCAL_URL_PREFIX}{subdirectory}/{unique_name}"
+
+    @staticmethod
+    def _store_local(source: BinaryIO, unique_name: str, subdirectory: str) -> StoredFile:
+        """Guarda el archivo directamente en su carpeta local definitiva (static/uploads/<subdirectorio>)."""
+        reader = source if isinstance(source, _UploadReader) else FileManager._reader(source)
+        final_local_path = BASE_UPLOAD_DIR / subdirectory / unique_name
+        final_local_path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            with open(final_local_path, "wb") as buffer:
+                while True:
+                    chunk = reader.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    buffer.write(chunk)
+        except Exception as e:
+            # No dejar archivos a medias (por ejemplo, si se superó el tamaño máximo)
+            final_local_path.unlink(missing_ok=True)
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(status_code=500, detail=f"Error al guardar el archivo: {str(e)}")
+
+        return StoredFile(
+            url=FileManager._local_url(subdirectory, unique_name),
+            path=final_local_path,
+            size=reader.size,
+            sha256=reader.hexdigest()
+        )
 
     @staticmethod
-    def delete_file(path_url: str):
+    def _reader(source: BinaryIO) -> "_UploadReader":
+        return _UploadReader(source, max_bytes=settings.UPLOAD_MAX_FILE_SIZE_MB * 1024 * 1024)
+
+    @staticmethod
+    def release(db: Session, tipo_registro: str, id_registro: int, urls: List[Optional[str]]) -> None:
+        """
+        Libera los archivos de un registro que se va a borrar ('visita', 'llamada' o 'email'):
+        los quita del índice y borra del almacenamiento solo los que ya ningún otro registro usa
+        (el contenido deduplicado se comparte). No hace commit: se confirma junto con el borrado del registro.
         """
-        Borra un archivo. Si es una URL remota, por ahora solo loguea (o se podría implementar delete SFTP).
-        Si es local, lo borra del disco.
+        crud.archivo_evidencia.remove_by_owner(db, tipo_registro=tipo_registro, id_registro=id_registro)
+        for url in crud.archivo_evidencia.unreferenced(db, urls):
+            FileManager._delete_file(url)
+
+    @staticmethod
+    def _delete_file(path_url: str):
+        """
+        Borra un archivo (sin consultar el índice: usar `release`). Si la URL es del backend
+        de almacenamiento, lo borra allí. Si es local (static/uploads), lo borra del disco.
         """
         if not path_url:
             return
+
+        # Las fotos tienen además una miniatura (si no existe, no pasa nada)
+        is_image = image_processor.is_supported(os.path.splitext(path_url)[1])
             
-        if path_url.startswith("http"):
-            # Intentar borrar remotamente si es una URL
-            return RemoteStorageService.delete_file(path_url)
+        if RemoteStorageService.owns_url(path_url):
+            # Archivo del backend de almacenamiento (hosting, bucket o carpeta de evidencias)
+            deleted = RemoteStorageService.delete_file(path_url)
+            if is_image:
+                RemoteStorageService.delete_file(FileManager.thumbnail_url(path_url))
+            return deleted
 
-        # Limpiar el path por si viene con / inicial
-        clean_path = path_url.lstrip("/")
-        full_path = Path(clean_path)
-        
-        try:
-            if full_path.exists() and full_path.is_file():
-                os.remove(full_path)
-        except Exception:
-            pass
\ No newline at end of file
+        paths = [path_url, FileManager.thumbnail_url(path_url)] if is_image else [path_url]
+        for path in paths:
+            # Limpiar el path por si viene con / inicial
+            full_path = Path(path.lstrip("/"))
+            try:
+                if full_path.exists() and full_path.is_file():
+                    os.remove(full_path)
+            except Exception:
+                pass
\ No newline at end of file
@@ -0,0 +1,111 @@
+import io
+import logging
+from typing import BinaryIO, NamedTuple, Optional
+import anyio
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError
+from PIL.ExifTags import IFD
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Extensión -> formato de Pillow con el que se vuelve a guardar
+SUPPORTED_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG"}
+
+
+class ProcessedImage(NamedTuple):
+    image: io.BytesIO
+    thumbnail: io.BytesIO
+
+
+class ImageProcessor:
+    """
+    Normaliza las fotos de evidencia antes de guardarlas:
+    - Aplica la orientación EXIF y luego descarta el EXIF (conserva solo el GPS si IMAGE_KEEP_GPS).
+    - Reduce la imagen a IMAGE_MAX_DIMENSION px por lado y la recomprime (JPEG a IMAGE_JPEG_QUALITY).
+    - Genera una miniatura de IMAGE_THUMBNAIL_SIZE px por lado.
+    Es CPU intensivo: se ejecuta en hilos aparte, con un límite propio de trabajos simultáneos.
+    """
+
+    def __init__(self):
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+
+    @staticmethod
+    def is_supported(file_ext: str) -> bool:
+        return settings.IMAGE_PROCESSING_ENABLED and file_ext.lower() in SUPPORTED_FORMATS
+
+    async def process_async(self, source: BinaryIO, file_ext: str) -> ProcessedImage:
+        """Procesa la imagen en el pool de hilos de imágenes, sin bloquear el event loop."""
+        return await anyio.to_thread.run_sync(self.process, source, file_ext, limiter=self._get_limiter())
+
+    def process(self, source: BinaryIO, file_ext: str) -> ProcessedImage:
+        fmt = SUPPORTED_FORMATS[file_ext.lower()]
+        max_dimension = settings.IMAGE_MAX_DIMENSION
+
+        try:
+            source.seek(0)
+            img = Image.open(source)
+            if fmt == "JPEG":
+                # Decodifica directamente a una escala reducida (mucho menos memoria y CPU en fotos de 12+ MP)
+                img.draft("RGB", (max_dimension, max_dimension))
+            exif = img.getexif()
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+            raise HTTPException(status_code=400, detail=f"La imagen no es válida o está dañada: {e}")
+
+        if fmt == "JPEG" and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        image = self._save(img, fmt, settings.IMAGE_JPEG_QUALITY, exif=self._kept_exif(exif))
+        return ProcessedImage(image=image, thumbnail=self._make_thumbnail(img, fmt))
+
+    def make_thumbnail(self, source: BinaryIO, file_ext: str) -> io.BytesIO:
+        """Genera solo la miniatura de una imagen ya guardada (para regenerar las de fotos antiguas)."""
+        fmt = SUPPORTED_FORMATS[file_ext.lower()]
+        size = settings.IMAGE_THUMBNAIL_SIZE
+        source.seek(0)
+        img = Image.open(source)
+        if fmt == "JPEG":
+            img.draft("RGB", (size, size))
+        img = ImageOps.exif_transpose(img)
+        if fmt == "JPEG" and img.mode != "RGB":
+            img = img.convert("RGB")
+        return self._make_thumbnail(img, fmt)
+
+    def _make_thumbnail(self, img: Image.Image, fmt: str) -> io.BytesIO:
+        thumb = img.copy()
+        thumb.thumbnail((settings.IMAGE_THUMBNAIL_SIZE, settings.IMAGE_THUMBNAIL_SIZE), Image.Resampling.LANCZOS)
+        return self._save(thumb, fmt, settings.IMAGE_THUMBNAIL_QUALITY)
+
+    @staticmethod
+    def _kept_exif(exif: Image.Exif) -> Optional[Image.Exif]:
+        """EXIF a conservar: solo la ubicación GPS, y únicamente si está configurado."""
+        if not settings.IMAGE_KEEP_GPS:
+            return None
+        gps = exif.get_ifd(IFD.GPSInfo)
+        if not gps:
+            return None
+        kept = Image.Exif()
+        kept[IFD.GPSInfo] = gps
+        return kept
+
+    @staticmethod
+    def _save(img: Image.Image, fmt: str, quality: int, exif: Optional[Image.Exif] = None) -> io.BytesIO:
+        buffer = io.BytesIO()
+        options = {"optimize": True}
+        if fmt == "JPEG":
+            options.update(quality=quality, progressive=True)
+        if exif is not None:
+            options["exif"] = exif
+        img.save(buffer, format=fmt, **options)
+        buffer.seek(0)
+        return buffer
+
+    def _get_limiter(self) -> anyio.CapacityLimiter:
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(settings.IMAGE_PROCESSING_WORKERS)
+        return self._limiter
+
+
+image_processor = ImageProcessor()
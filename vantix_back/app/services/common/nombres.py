@@ -0,0 +1,153 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+_NO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+
+# Coincidencias cuyo puntaje queda a menos de esta distancia de la mejor se consideran empatadas
+MARGEN_AMBIGUEDAD = 0.1
+# Puntaje mínimo (similitud de difflib, 0 a 1) para aceptar una coincidencia aproximada
+PUNTAJE_MINIMO_APROXIMADO = 0.85
+
+
+def quitar_tildes(texto: str) -> str:
+    """Quita acentos, diéresis, etc.: 'Begoña Pérez' -> 'Begona Perez'."""
+    return "".join(
+        c for c in unicodedata.normalize('NFD', texto)
+        if unicodedata.category(c) != 'Mn'
+    )
+
+
+def normalizar_nombre(texto: Optional[str]) -> str:
+    """
+    Forma canónica de un nombre para compararlo: sin tildes, minúsculas, sin signos
+    y con un solo espacio entre palabras ('  José  M. Pérez' -> 'jose m perez').
+    """
+    if not texto:
+        return ""
+    return " ".join(_NO_ALFANUMERICO.sub(" ", quitar_tildes(texto).lower()).split())
+
+
+class Coincidencia(NamedTuple):
+    id: int
+    nombre: str
+    puntaje: float
+    tipo: str  # 'exacta', 'palabras' o 'aproximada'
+
+
+class ResultadoBusqueda(NamedTuple):
+    """Mejores coincidencias de una búsqueda (empatadas dentro de MARGEN_AMBIGUEDAD), de mayor a menor puntaje."""
+    consulta: str
+    coincidencias: List[Coincidencia]
+
+    @property
+    def ambigua(self) -> bool:
+        return len(self.coincidencias) > 1
+
+    @property
+    def id(self) -> Optional[int]:
+        """Id de la única coincidencia; None si no hubo ninguna o si es ambigua."""
+        return self.coincidencias[0].id if len(self.coincidencias) == 1 else None
+
+
+class IndiceNombres:
+    """
+    Índice de nombres normalizados (se normalizan una sola vez al construirlo).
+    `buscar` prueba en orden y se queda con el primer nivel que encuentra algo:
+    - exacta: mismo nombre normalizado (puntaje 1).
+    - palabras: todas las palabras buscadas están en el nombre (o son el inicio de una,
+      'Leo' -> 'Leonardo'); puntaje = promedio de lo cubierto de la búsqueda y del nombre.
+    - aproximada: similitud de difflib >= `puntaje_minimo` (errores de tipeo).
+    Si varios nombres quedan empatados el resultado es ambiguo: se reportan todos y no se elige ninguno.
+    """
+
+    def __init__(self, nombres: Iterable[Tuple[int, str]], *, puntaje_minimo: float = PUNTAJE_MINIMO_APROXIMADO):
+        self.puntaje_minimo = puntaje_minimo
+        self._nombres: Dict[int, str] = {}
+        self._palabras: Dict[int, Tuple[str, ...]] = {}
+        self._exactos: Dict[str, List[int]] = {}
+        self._por_palabra: Dict[str, Set[int]] = {}
+        for id_, nombre in nombres:
+            normalizado = normalizar_nombre(nombre)
+            if not normalizado:
+                continue
+            self._nombres[id_] = nombre
+            self._palabras[id_] = tuple(normalizado.split())
+            self._exactos.setdefault(normalizado, []).append(id_)
+            for palabra in self._palabras[id_]:
+                self._por_palabra.setdefault(palabra, set()).add(id_)
+        # Ordenadas para encontrar por prefijo con búsqueda binaria
+        self._vocabulario = sorted(self._por_palabra)
+
+    def __len__(self) -> int:
+        return len(self._nombres)
+
+    def buscar(self, texto: Optional[str]) -> ResultadoBusqueda:
+        consulta = normalizar_nombre(texto)
+        if not consulta:
+            return ResultadoBusqueda(consulta, [])
+
+        exactos = self._exactos.get(consulta)
+        if exactos:
+            return ResultadoBusqueda(consulta, [self._coincidencia(id_, 1.0, "exacta") for id_ in exactos])
+
+        for buscar_nivel in (self._por_palabras, self._aproximadas):
+            coincidencias = buscar_nivel(consulta)
+            if coincidencias:
+                return ResultadoBusqueda(consulta, self._mejores(coincidencias))
+        return ResultadoBusqueda(consulta, [])
+
+    def _por_palabras(self, consulta: str) -> List[Coincidencia]:
+        palabras = consulta.split()
+        candidatos: Optional[Set[int]] = None
+        for palabra in palabras:
+            ids = self._con_prefijo(palabra)
+            candidatos = ids if candidatos is None else candidatos & ids
+            if not candidatos:
+                return []
+
+        coincidencias = []
+        for id_ in candidatos:
+            nombre = self._palabras[id_]
+            # Una palabra completa vale 1; un prefijo, la parte de la palabra que cubre
+            cubiertas = sum(
+                max((len(p) / len(n) for n in nombre if n.startswith(p)), default=0) for p in palabras
+            )
+            # Promedio de lo que se cubre de la búsqueda y del nombre: 'José' empata entre dos José
+            puntaje = (cubiertas / len(palabras) + cubiertas / len(nombre)) / 2
+            coincidencias.append(self._coincidencia(id_, puntaje, "palabras"))
+        return coincidencias
+
+    def _aproximadas(self, consulta: str) -> List[Coincidencia]:
+        # Palabras ordenadas: 'Ruiz Alfonso' y 'Alfonso Ruiz' comparan igual
+        ordenada = " ".join(sorted(consulta.split()))
+        matcher = SequenceMatcher(b=ordenada, autojunk=False)
+        coincidencias = []
+        for id_, palabras in self._palabras.items():
+            matcher.set_seq1(" ".join(sorted(palabras)))
+            # Cotas baratas primero: descartan casi todo sin calcular la similitud completa
+            if matcher.real_quick_ratio() < self.puntaje_minimo or matcher.quick_ratio() < self.puntaje_minimo:
+                continue
+            puntaje = matcher.ratio()
+            if puntaje >= self.puntaje_minimo:
+                coincidencias.append(self._coincidencia(id_, puntaje, "aproximada"))
+        return coincidencias
+
+    def _con_prefijo(self, palabra: str) -> Set[int]:
+        ids: Set[int] = set()
+        i = bisect_left(self._vocabulario, palabra)
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(palabra):
+            ids |= self._por_palabra[self._vocabulario[i]]
+            i += 1
+        return ids
+
+    def _coincidencia(self, id_: int, puntaje: float, tipo: str) -> Coincidencia:
+        return Coincidencia(id_, self._nombres[id_], round(puntaje, 3), tipo)
+
+    @staticmethod
+    def _mejores(coincidencias: List[Coincidencia]) -> List[Coincidencia]:
+        coincidencias.sort(key=lambda c: (-c.puntaje, c.id))
+        mejor = coincidencias[0].puntaje
+        return [c for c in coincidencias if mejor - c.puntaje < MARGEN_AMBIGUEDAD]
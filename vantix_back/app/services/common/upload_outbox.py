@@ -0,0 +1,237 @@
+import os
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.archivos import SubidaPendiente, ArchivoEvidencia
+from app.models.crm import RegistroLlamada, RegistroEmail
+from app.models.enums import EstadoSubidaEnum
+from app.models.visita import RegistroVisita
+from app.services.external.remote_storage import RemoteStorageService
+
+logger = logging.getLogger(__name__)
+
+# Columnas que pueden guardar la URL local provisional de un archivo en cola (incluye el índice de la galería).
+# Todas están indexadas: cada reemplazo es una búsqueda por índice, no un recorrido de la tabla
+EVIDENCE_COLUMNS = (
+    (RegistroVisita, "url_foto_lugar"),
+    (RegistroVisita, "url_foto_sello"),
+    (RegistroLlamada, "url_foto_prueba"),
+    (RegistroEmail, "url_foto_prueba"),
+    (ArchivoEvidencia, "url"),
+    (ArchivoEvidencia, "url_miniatura"),
+)
+
+
+class UploadOutboxService:
+    """
+    Outbox de subidas al hosting.
+
+    El request guarda el archivo en `static/uploads` y encola la subida en la misma transacción
+    que el registro; responde de inmediato con la URL local (servida por /static).
+    Un hilo en segundo plano sube los archivos pendientes con reintentos y backoff exponencial
+    y, al terminar, reemplaza la URL local por la remota en las columnas url_foto_*.
+    Cada pendiente se toma con `FOR UPDATE SKIP LOCKED` y se confirma como 'Procesando' antes de
+    subirlo: la transferencia no mantiene abiertos ni el bloqueo ni la transacción. Mientras dura,
+    `proximo_intento` es el vencimiento del lease (UPLOAD_OUTBOX_LEASE_SECONDS): si el worker se cae,
+    otro la retoma al vencer.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        *,
+        ruta_local: str,
+        url_local: str,
+        nombre_remoto: str,
+        nombre_empleado: str,
+        tipo_actividad: str
+    ) -> SubidaPendiente:
+        """
+        Encola una subida. No hace commit: se confirma junto con el registro que usa el archivo.
+        Hay a lo sumo una subida en curso por `url_local`: si ya existe (en esta sesión o en la cola),
+        se retorna esa. La fila existente queda con FOR SHARE hasta el commit, así el worker no la da
+        por terminada (y reemplaza la URL) antes de que exista el registro que la usa.
+        """
+        for obj in db.new:
+            if isinstance(obj, SubidaPendiente) and obj.url_local == url_local:
+                return obj
+        existing = (
+            db.query(SubidaPendiente)
+            .filter(
+                SubidaPendiente.url_local == url_local,
+                SubidaPendiente.estado.in_((EstadoSubidaEnum.PENDIENTE, EstadoSubidaEnum.PROCESANDO))
+            )
+            .with_for_update(read=True)
+            .first()
+        )
+        if existing:
+            return existing
+
+        db_obj = SubidaPendiente(
+            ruta_local=ruta_local,
+            url_local=url_local,
+            nombre_remoto=nombre_remoto,
+            nombre_empleado=nombre_empleado,
+            tipo_actividad=tipo_actividad,
+            estado=EstadoSubidaEnum.PENDIENTE,
+            intentos=0
+        )
+        db.add(db_obj)
+        return db_obj
+
+    def process_next(self, db: Session) -> bool:
+        """Sube el siguiente archivo pendiente. Retorna False si no había nada que procesar."""
+        # Pendientes vencidos y subidas cuyo lease venció (su worker se cayó a mitad)
+        subida = (
+            db.query(SubidaPendiente)
+            .filter(
+                SubidaPendiente.estado.in_((EstadoSubidaEnum.PENDIENTE, EstadoSubidaEnum.PROCESANDO)),
+                SubidaPendiente.proximo_intento <= func.now()
+            )
+            .order_by(SubidaPendiente.proximo_intento)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if not subida:
+            db.rollback()
+            return False
+
+        # 1. Tomar la subida y confirmarlo antes de transferir
+        lease = datetime.now(timezone.utc) + timedelta(seconds=settings.UPLOAD_OUTBOX_LEASE_SECONDS)
+        subida.estado = EstadoSubidaEnum.PROCESANDO
+        subida.proximo_intento = lease
+        id_subida, ruta_local, url_local = subida.id_subida, subida.ruta_local, subida.url_local
+        upload_options = dict(
+            local_path=ruta_local,
+            remote_filename=subida.nombre_remoto,
+            employee_name=subida.nombre_empleado,
+            activity_type=subida.tipo_actividad
+        )
+        db.commit()
+
+        # 2. Transferir fuera de la transacción (el archivo local puede no existir si se eliminó la visita)
+        remote_url = RemoteStorageService.upload_file(**upload_options) if os.path.exists(ruta_local) else None
+
+        # 3. Registrar el resultado solo si el lease sigue siendo nuestro (si venció, otro worker la retomó)
+        subida = (
+            db.query(SubidaPendiente)
+            .filter(
+                SubidaPendiente.id_subida == id_subida,
+                SubidaPendiente.estado == EstadoSubidaEnum.PROCESANDO,
+                SubidaPendiente.proximo_intento == lease
+            )
+            .with_for_update()
+            .first()
+        )
+        if not subida:
+            db.rollback()
+            logger.warning(f"La subida de '{ruta_local}' superó su lease y la retomó otro worker")
+            return True
+
+        if not os.path.exists(ruta_local):
+            # No hay nada que subir: o se eliminó el registro, o una subida anterior del mismo archivo
+            # ya terminó (y borró la copia local); en ese caso los registros nuevos toman su URL remota
+            previous_url = (
+                db.query(SubidaPendiente.url_remota)
+                .filter(SubidaPendiente.url_local == url_local, SubidaPendiente.estado == EstadoSubidaEnum.SUBIDO)
+                .order_by(SubidaPendiente.fecha_subida.desc())
+                .limit(1)
+                .scalar()
+            )
+            if previous_url:
+                self._replace_url(db, url_local, previous_url)
+            db.delete(subida)
+            db.commit()
+            return True
+
+        if not remote_url:
+            self._schedule_retry(subida)
+            db.commit()
+            return True
+
+        self._replace_url(db, url_local, remote_url)
+        subida.estado = EstadoSubidaEnum.SUBIDO
+        subida.url_remota = remote_url
+        subida.fecha_subida = datetime.now(timezone.utc)
+        subida.ultimo_error = None
+        db.commit()
+
+        try:
+            os.remove(ruta_local)
+        except OSError as e:
+            logger.warning(f"No se pudo borrar el archivo local ya subido '{ruta_local}': {e}")
+        return True
+
+    def process_pending(self, db: Session, limit: int = 100) -> int:
+        """Procesa hasta `limit` subidas vencidas. Retorna cuántas se procesaron."""
+        processed = 0
+        while processed < limit and self.process_next(db):
+            processed += 1
+        return processed
+
+    def start(self) -> None:
+        """Inicia el hilo del worker (solo si hay hosting configurado)."""
+        if not settings.UPLOAD_OUTBOX_ENABLED or not RemoteStorageService.is_configured():
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="upload-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            processed = 0
+            db = SessionLocal()
+            try:
+                processed = self.process_pending(db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error procesando la cola de subidas: {e}")
+            finally:
+                db.close()
+            # Si la cola quedó vacía (o hubo error), esperar antes de volver a consultar
+            if not processed:
+                self._stop.wait(settings.UPLOAD_OUTBOX_POLL_SECONDS)
+
+    @staticmethod
+    def _replace_url(db: Session, url_local: str, remote_url: str) -> None:
+        """Reemplaza la URL local por la remota en los registros que la usan. No hace commit."""
+        for model, column in EVIDENCE_COLUMNS:
+            db.query(model).filter(getattr(model, column) == url_local).update(
+                {column: remote_url}, synchronize_session=False
+            )
+
+    @staticmethod
+    def _schedule_retry(subida: SubidaPendiente) -> None:
+        subida.intentos = (subida.intentos or 0) + 1
+        subida.ultimo_error = "No se pudo subir el archivo al hosting"
+        if subida.intentos >= settings.UPLOAD_OUTBOX_MAX_ATTEMPTS:
+            # Se deja de reintentar; el archivo sigue disponible en su URL local
+            subida.estado = EstadoSubidaEnum.FALLIDO
+            logger.error(f"Subida de '{subida.ruta_local}' abandonada tras {subida.intentos} intentos")
+            return
+        subida.estado = EstadoSubidaEnum.PENDIENTE
+        delay = min(
+            settings.UPLOAD_OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (subida.intentos - 1),
+            settings.UPLOAD_OUTBOX_BACKOFF_MAX_SECONDS
+        )
+        subida.proximo_intento = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+upload_outbox = UploadOutboxService()
@@ -0,0 +1,225 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.catalogo import ProductoCatalogo, SincronizacionCatalogo
+from app.services.external.upgrade_db import ExternalDBService
+
+logger = logging.getLogger(__name__)
+
+CATALOGO = "productos"
+
+# Cabecera con la fecha de los datos del catálogo entregados (ISO 8601)
+CATALOG_SYNCED_AT_HEADER = "X-Catalog-Synced-At"
+
+# pg_try_advisory_xact_lock: con varios workers, un solo proceso refresca la copia a la vez
+_LOCK_ID = 48_151_623
+
+# Columnas de productos_catalogo que vienen de UpgradeDB
+_COLUMNAS = ("codigo", "nombre", "descripcion", "marca", "modelo", "ecom_precio", "hash_origen")
+
+
+class CatalogoProductosService:
+    """
+    Copia local del catálogo de productos de UpgradeDB (tabla productos_catalogo).
+
+    La búsqueda del cotizador y los precios de las cotizaciones se leen de la copia, así que
+    el ERP no recibe una consulta por cada tecla. Un hilo la refresca cada PRODUCT_CATALOG_SYNC_MINUTES:
+    recorre el ERP por bloques de id trayendo solo la huella (md5) de cada producto, vuelve a traer
+    los que cambiaron o son nuevos y borra los que ya no existen. Todo el refresco es una transacción:
+    mientras corre se sigue leyendo la versión anterior completa.
+    Mientras no haya una sincronización completa, la búsqueda se hace directo en el ERP.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def sincronizar(self, db: Session, *, forzar: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Refresca la copia local (hace commit). Sin `forzar` no hace nada si la última sincronización
+        es más reciente que PRODUCT_CATALOG_SYNC_MINUTES.
+        Retorna {"total", "actualizados", "eliminados"}, o None si no hizo falta o si otro proceso ya
+        está sincronizando.
+        """
+        if not db.execute(select(func.pg_try_advisory_xact_lock(_LOCK_ID))).scalar():
+            db.rollback()
+            return None
+
+        estado = db.get(SincronizacionCatalogo, CATALOGO)
+        if not forzar and estado and estado.fecha_ultima_exitosa and (
+            datetime.now(timezone.utc) - estado.fecha_ultima_exitosa
+            < timedelta(minutes=settings.PRODUCT_CATALOG_SYNC_MINUTES)
+        ):
+            db.rollback()
+            return None
+
+        inicio = datetime.now(timezone.utc)
+        try:
+            resultado = self._refrescar(db)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error sincronizando el catálogo de productos: {e}")
+            self._guardar_estado(db, fecha_ultimo_intento=inicio, ultimo_error=str(e))
+            db.commit()
+            raise
+
+        self._guardar_estado(
+            db,
+            fecha_ultima_exitosa=inicio,
+            fecha_ultimo_intento=inicio,
+            ultimo_error=None,
+            total_registros=resultado["total"]
+        )
+        db.commit()
+        logger.info(
+            f"Catálogo de productos sincronizado: {resultado['total']} productos, "
+            f"{resultado['actualizados']} actualizados, {resultado['eliminados']} eliminados"
+        )
+        return resultado
+
+    @staticmethod
+    def fecha_sincronizacion(db: Session) -> Optional[datetime]:
+        """Fecha de la última sincronización completa (None si la copia aún no existe)."""
+        return db.query(SincronizacionCatalogo.fecha_ultima_exitosa).filter(
+            SincronizacionCatalogo.catalogo == CATALOGO
+        ).scalar()
+
+    @staticmethod
+    def estado(db: Session) -> Optional[SincronizacionCatalogo]:
+        return db.get(SincronizacionCatalogo, CATALOGO)
+
+    @staticmethod
+    def buscar(db: Session, *, search: Optional[str] = None, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Mismo resultado que `ExternalDBService.fetch_productos` (mismas claves), pero desde la copia local."""
+        query = db.query(
+            ProductoCatalogo.id_producto.label("id"),
+            *(getattr(ProductoCatalogo, columna) for columna in _COLUMNAS if columna != "hash_origen")
+        )
+        if search:
+            search_term = f"%{search}%"
+            query = query.filter(or_(ProductoCatalogo.nombre.ilike(search_term), ProductoCatalogo.codigo.ilike(search_term)))
+        query = query.order_by(ProductoCatalogo.nombre, ProductoCatalogo.id_producto).offset(skip).limit(limit)
+        return [dict(fila._mapping) for fila in query]
+
+    @staticmethod
+    def precios(db: Session, ids: Iterable[int]) -> Dict[int, Decimal]:
+        """Precio ecommerce vigente de los productos indicados (los que no están en la copia o no tienen precio no aparecen)."""
+        ids = set(ids)
+        if not ids:
+            return {}
+        filas = db.query(ProductoCatalogo.id_producto, ProductoCatalogo.ecom_precio).filter(
+            ProductoCatalogo.id_producto.in_(ids),
+            ProductoCatalogo.ecom_precio.isnot(None)
+        ).all()
+        return dict(filas)
+
+    def start(self) -> None:
+        """Inicia el hilo que refresca la copia."""
+        if not settings.PRODUCT_CATALOG_SYNC_ENABLED:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalogo-productos", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def sincronizar_ahora(self) -> None:
+        """
+        Refresco inmediato, aunque la copia esté al día, con su propia sesión (para BackgroundTasks).
+        Toma el mismo advisory lock que el hilo: si otro proceso ya está sincronizando, no hace nada.
+        """
+        self._sincronizar_sesion(forzar=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            self._sincronizar_sesion(forzar=False)
+            self._wake.wait(settings.PRODUCT_CATALOG_SYNC_MINUTES * 60)
+
+    def _sincronizar_sesion(self, *, forzar: bool) -> None:
+        db = SessionLocal()
+        try:
+            self.sincronizar(db, forzar=forzar)
+        except Exception:
+            db.rollback()  # Ya registrado en sincronizaciones_catalogo; se reintenta en el siguiente ciclo
+        finally:
+            db.close()
+
+    @staticmethod
+    def _refrescar(db: Session) -> Dict[str, int]:
+        """Compara las huellas del ERP con las locales y aplica los cambios. No hace commit."""
+        locales: Dict[int, str] = dict(db.query(ProductoCatalogo.id_producto, ProductoCatalogo.hash_origen).all())
+        vistos = set()
+        actualizados = 0
+        ultimo_id = 0
+        while True:
+            huellas: List[Tuple[int, str]] = ExternalDBService.fetch_productos_hashes(
+                after_id=ultimo_id, limit=settings.PRODUCT_CATALOG_SYNC_BATCH_SIZE
+            )
+            if not huellas:
+                break
+            ultimo_id = huellas[-1][0]
+            vistos.update(id_ for id_, _ in huellas)
+            cambiados = [id_ for id_, huella in huellas if locales.get(id_) != huella]
+            if cambiados:
+                actualizados += CatalogoProductosService._guardar_productos(
+                    db, ExternalDBService.fetch_productos_by_ids(cambiados)
+                )
+
+        eliminados = [id_ for id_ in locales if id_ not in vistos]
+        for i in range(0, len(eliminados), settings.PRODUCT_CATALOG_SYNC_BATCH_SIZE):
+            lote = eliminados[i:i + settings.PRODUCT_CATALOG_SYNC_BATCH_SIZE]
+            db.execute(delete(ProductoCatalogo).where(ProductoCatalogo.id_producto.in_(lote)))
+        return {"total": len(vistos), "actualizados": actualizados, "eliminados": len(eliminados)}
+
+    @staticmethod
+    def _guardar_productos(db: Session, productos: List[Dict[str, Any]]) -> int:
+        """INSERT ... ON CONFLICT de los productos traídos del ERP. No hace commit."""
+        if not productos:
+            return 0
+        stmt = insert(ProductoCatalogo)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProductoCatalogo.id_producto],
+            set_={
+                **{columna: stmt.excluded[columna] for columna in _COLUMNAS},
+                "fecha_sincronizacion": func.now(),
+            }
+        )
+        # executemany: SQLAlchemy lo agrupa en INSERTs de varias filas
+        db.execute(stmt, [
+            {
+                "id_producto": p["id"],
+                "codigo": p["codigo"],
+                "nombre": p["nombre"],
+                "descripcion": p["descripcion"],
+                "marca": p["marca"],
+                "modelo": p["modelo"],
+                "ecom_precio": p["ecom_precio"],
+                "hash_origen": p["hash"],
+            }
+            for p in productos
+        ])
+        return len(productos)
+
+    @staticmethod
+    def _guardar_estado(db: Session, **valores) -> None:
+        stmt = insert(SincronizacionCatalogo).values(catalogo=CATALOGO, **valores)
+        db.execute(stmt.on_conflict_do_update(index_elements=[SincronizacionCatalogo.catalogo], set_=valores))
+
+
+catalogo_productos = CatalogoProductosService()
@@ -0,0 +1,192 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """No se pudo obtener una conexión del pool dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones acotado y thread-safe (por defecto, para psycopg2).
+
+    - Nunca abre más de `max_size` conexiones a la vez.
+    - Cierra las conexiones ociosas por más de `idle_timeout` segundos (respetando `min_size`).
+    - Antes de entregar una conexión ociosa por más de `ping_after` segundos, verifica que siga viva.
+    - `ping`, `is_closed` y `close` permiten usarlo con otros clientes (por ejemplo, sesiones FTP).
+    """
+
+    def __init__(
+        self,
+        connect: Callable,
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300,
+        acquire_timeout: float = 10,
+        ping_after: float = 30,
+        ping: Optional[Callable] = None,
+        is_closed: Optional[Callable] = None,
+        close: Optional[Callable] = None,
+    ):
+        self._connect = connect
+        self._ping = ping or self._ping_psycopg2
+        self._is_closed = is_closed or (lambda conn: bool(conn.closed))
+        self._close = close or (lambda conn: conn.close())
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conexion, momento_de_liberacion)
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._discarded = 0
+
+    # --- API PÚBLICA ---
+
+    def acquire(self):
+        """Entrega una conexión viva del pool, creando una nueva si hay cupo."""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            conn, idle_since = self._checkout(deadline)
+            if conn is None:
+                return self._create()
+            if self._is_alive(conn, idle_since):
+                return conn
+            # La conexión murió mientras estaba ociosa: la descartamos y probamos con otra
+            self._discard(conn)
+
+    def release(self, conn, *, discard: bool = False) -> None:
+        """Devuelve una conexión al pool (o la descarta si está rota)."""
+        if discard or self._is_closed(conn):
+            self._discard(conn)
+            return
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        """Métricas del pool para dimensionarlo bajo carga."""
+        with self._cond:
+            return {
+                "size": self._size,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "created": self._created,
+                "discarded": self._discarded,
+            }
+
+    def close_all(self) -> None:
+        """Cierra todas las conexiones ociosas (las que están en uso se cierran al liberarse)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._discarded += len(idle)
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    # --- INTERNOS ---
+
+    def _checkout(self, deadline: float):
+        """
+        Reserva un cupo en el pool. Retorna (conexion, ociosa_desde) si hay una ociosa,
+        o (None, None) si el llamador debe crear una nueva conexión.
+        """
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    self._prune_idle(expired)
+                    if self._idle:
+                        # LIFO: reutilizamos la más reciente para que las demás puedan expirar
+                        conn, idle_since = self._idle.pop()
+                        self._in_use += 1
+                        return conn, idle_since
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._in_use += 1
+                        return None, None
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Pool de conexiones agotado ({self.max_size} en uso) tras {self.acquire_timeout}s de espera"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+        finally:
+            for conn in expired:
+                self._close_quietly(conn)
+
+    def _prune_idle(self, expired: list) -> None:
+        """Saca del pool las conexiones ociosas vencidas (se debe llamar con el lock tomado)."""
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            conn, idle_since = self._idle[0]
+            if now - idle_since < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._discarded += 1
+            expired.append(conn)
+
+    def _create(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def _discard(self, conn) -> None:
+        with self._cond:
+            self._size -= 1
+            self._in_use -= 1
+            self._discarded += 1
+            self._cond.notify()
+        self._close_quietly(conn)
+
+    def _is_alive(self, conn, idle_since: Optional[float]) -> bool:
+        if self._is_closed(conn):
+            return False
+        if idle_since is not None and time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            self._ping(conn)
+            return True
+        except Exception as e:
+            logger.warning(f"Conexión del pool descartada por fallar la verificación: {e}")
+            return False
+
+    @staticmethod
+    def _ping_psycopg2(conn) -> None:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+
+    def _close_quietly(self, conn) -> None:
+        try:
+            self._close(conn)
+        except Exception:
+            pass
@@ -1,13 +1,24 @@
-import ftplib
-import os
+import io
 import logging
-import unicodedata
-from typing import Optional
-from app.core.config import settings
+from typing import BinaryIO, List, Optional
+from app.services.common.nombres import quitar_tildes
+from app.services.external.storage import StorageBackend, get_backend
 
 logger = logging.getLogger(__name__)
 
+# Subcarpeta (junto al original) donde se guardan las miniaturas de las fotos
+THUMBNAIL_DIR = "thumbs"
+
+# Entradas que nunca se listan como archivos de evidencia
+_IGNORED_ENTRIES = ('cgi-bin', THUMBNAIL_DIR)
+
 class RemoteStorageService:
+    """
+    Almacenamiento de evidencias organizado como Empleado/Actividad/archivo.
+    El transporte lo pone el backend configurado en REMOTE_STORAGE_BACKEND (FTP, SFTP, S3 o disco local);
+    aquí solo se arman las rutas y URLs, y se convierten los errores en resultados vacíos.
+    """
+
     @staticmethod
     def _normalize_path_name(text: str) -> str:
         """
@@ -20,9 +31,8 @@ class RemoteStorageService:
         if not text:
             return "unknown"
         
-        # 1. Quitar acentos usando unicodedata
-        text = unicodedata.normalize('NFD', text)
-        text = "".join([c for c in text if unicodedata.category(c) != 'Mn'])
+        # 1. Quitar acentos (misma normalización que el índice de nombres de empleados)
+        text = quitar_tildes(text)
         
         # 2. Limpieza de caracteres y formato
         normalized = text.replace(" ", "_").replace(".", "").lower()
@@ -30,143 +40,106 @@ class RemoteStorageService:
         return normalized
 
     @staticmethod
-    def get_ftp_client():
-        """Establece una conexión FTP con el Web Hosting."""
-        if not settings.REMOTE_STORAGE_HOST or not settings.REMOTE_STORAGE_USER:
-            logger.warning("Configuración de almacenamiento remoto incompleta.")
-            return None
-            
-        try:
-            ftp = ftplib.FTP()
-            ftp.connect(settings.REMOTE_STORAGE_HOST, 21, timeout=30)
-            ftp.login(settings.REMOTE_STORAGE_USER, settings.REMOTE_STORAGE_PASSWORD)
-            return ftp
-        except Exception as e:
-            logger.error(f"Error conectando al servidor FTP: {e}")
-            return None
+    def backend() -> StorageBackend:
+        return get_backend()
 
     @staticmethod
-    def makedirs_ftp(ftp, remote_path):
-        """Crea directorios recursivamente en FTP."""
-        dirs = remote_path.split('/')
-        for d in dirs:
-            if not d: continue
-            try:
-                ftp.cwd(d)
-            except ftplib.error_perm:
-                ftp.mkd(d)
-                ftp.cwd(d)
+    def is_configured() -> bool:
+        return get_backend().is_configured()
+
+    @staticmethod
+    def pool_stats() -> dict:
+        """
+        Backend configurado y estadísticas de su pool de sesiones (en uso, en espera, creadas, descartadas).
+        `pool` es None en los backends que no mantienen conexiones (S3, local).
+        """
+        backend = get_backend()
+        return {"backend": backend.name, "pool": backend.stats() or None}
 
     @staticmethod
     def upload_file(local_path: str, remote_filename: str, employee_name: str, activity_type: str) -> Optional[str]:
         """
-        Sube un archivo al Web Hosting siguiendo la estructura:
-        public_html/Nombre_Empleado/Actividad/archivo.jpg
+        Sube un archivo siguiendo la estructura:
+        <ruta base>/Nombre_Empleado/Actividad/archivo.jpg
         """
-        ftp = RemoteStorageService.get_ftp_client()
-        if not ftp:
-            return None
-            
         try:
-            # 1. Normalizar nombres para carpetas
-            safe_employee = RemoteStorageService._normalize_path_name(employee_name)
-            safe_activity = RemoteStorageService._normalize_path_name(activity_type)
-            
-            # 2. Navegar a la ruta base
-            try:
-                for part in settings.REMOTE_STORAGE_BASE_PATH.split('/'):
-                    if part: 
-                        ftp.cwd(part)
-            except Exception as e:
-                current_dir = ftp.pwd()
-                visible = ftp.nlst()
-                logger.error(f"Error en FTP. Intentamos entrar a '{settings.REMOTE_STORAGE_BASE_PATH}' pero falló en la parte '{part}'. Directorio actual: {current_dir}. Contenido visible: {visible}. Error: {e}")
-                return None
-
-            # 3. Crear y entrar en carpetas de Empleado/Actividad
-            RemoteStorageService.makedirs_ftp(ftp, f"{safe_employee}/{safe_activity}")
-            
-            # 4. Subir el archivo
             with open(local_path, "rb") as f:
-                ftp.storbinary(f"STOR {remote_filename}", f)
-            
-            # 5. Retornar la URL pública
-            return f"{settings.REMOTE_STORAGE_BASE_URL}/{safe_employee}/{safe_activity}/{remote_filename}"
-            
+                return RemoteStorageService.upload_fileobj(f, remote_filename, employee_name, activity_type)
+        except OSError as e:
+            logger.error(f"Error abriendo el archivo local '{local_path}' para subirlo: {e}")
+            return None
+
+    @staticmethod
+    def upload_fileobj(fileobj: BinaryIO, remote_filename: str, employee_name: str, activity_type: str) -> Optional[str]:
+        """
+        Igual que `upload_file`, pero leyendo de un objeto tipo archivo por bloques.
+        El objeto debe admitir `seek(0)` para poder reintentar con otra sesión.
+        `remote_filename` puede incluir una subcarpeta (por ejemplo, thumbs/archivo.jpg).
+        """
+        backend = get_backend()
+        if not backend.is_configured():
+            logger.warning("Configuración de almacenamiento remoto incompleta.")
+            return None
+
+        # 1. Normalizar nombres para carpetas
+        safe_employee = RemoteStorageService._normalize_path_name(employee_name)
+        safe_activity = RemoteStorageService._normalize_path_name(activity_type)
+        key = f"{safe_employee}/{safe_activity}/{remote_filename}"
+
+        # 2. Subir (el backend crea las carpetas que falten)
+        try:
+            backend.upload_fileobj(fileobj, key)
         except Exception as e:
-            logger.error(f"Error subiendo archivo vía FTP: {e}")
+            logger.error(f"Error subiendo archivo vía {backend.name}: {e}")
             return None
-        finally:
-            ftp.quit()
+
+        # 3. Retornar la URL pública
+        return backend.public_url(key)
+
+    @staticmethod
+    def owns_url(path_url: str) -> bool:
+        """Indica si la URL corresponde a un archivo del backend configurado."""
+        return get_backend().key_from_url(path_url) is not None
 
     @staticmethod
     def delete_file(path_url: str) -> bool:
         """
-        Elimina un archivo del servidor FTP basándose en su URL pública.
+        Elimina un archivo del almacenamiento basándose en su URL pública.
         """
-        if not path_url.startswith(settings.REMOTE_STORAGE_BASE_URL):
+        backend = get_backend()
+        key = backend.key_from_url(path_url)
+        if key is None:
             return False
 
-        ftp = RemoteStorageService.get_ftp_client()
-        if not ftp:
+        if not backend.is_configured():
+            logger.warning("Configuración de almacenamiento remoto incompleta.")
             return False
 
         try:
-            # 1. Obtener la ruta relativa eliminando el BASE_URL
-            relative_path = path_url.replace(settings.REMOTE_STORAGE_BASE_URL, "").lstrip("/")
-            
-            # 2. Navegar a la ruta base configuración (public_html, etc)
-            if settings.REMOTE_STORAGE_BASE_PATH and settings.REMOTE_STORAGE_BASE_PATH != ".":
-                for part in settings.REMOTE_STORAGE_BASE_PATH.split('/'):
-                    if part: ftp.cwd(part)
-
-            # 3. Eliminar el archivo
-            ftp.delete(relative_path)
-            logger.info(f"Archivo eliminado exitosamente de FTP: {relative_path}")
+            backend.delete(key)
+            logger.info(f"Archivo eliminado exitosamente de {backend.name}: {key}")
             return True
         except Exception as e:
-            logger.error(f"Error eliminando archivo '{path_url}' vía FTP: {e}")
+            logger.error(f"Error eliminando archivo '{path_url}' vía {backend.name}: {e}")
             return False
-        finally:
-            ftp.quit()
 
     @staticmethod
-    def list_files(employee_name: str, activity_type: str) -> list:
-        """
-        Lista todas las URLs de archivos en el hosting para un empleado y actividad.
-        """
-        ftp = RemoteStorageService.get_ftp_client()
-        if not ftp:
+    def list_folder(relative_dir: str = "") -> List[str]:
+        """Nombres de las entradas de una carpeta (relativa a la ruta base). Vacío si no existe."""
+        backend = get_backend()
+        if not backend.is_configured():
             return []
+        return RemoteStorageService._list(backend, relative_dir)
 
-        try:
-            # 1. Normalizar nombres para la ruta
-            safe_employee = RemoteStorageService._normalize_path_name(employee_name)
-            safe_activity = RemoteStorageService._normalize_path_name(activity_type)
-            remote_path = f"{safe_employee}/{safe_activity}"
-            
-            # 2. Navegar a la ruta base
-            if settings.REMOTE_STORAGE_BASE_PATH and settings.REMOTE_STORAGE_BASE_PATH != ".":
-                for part in settings.REMOTE_STORAGE_BASE_PATH.split('/'):
-                    if part: ftp.cwd(part)
-
-            # 3. Intentar entrar a la carpeta del empleado
-            try:
-                ftp.cwd(remote_path)
-            except Exception:
-                return [] # La carpeta aún no existe
-
-            # 4. Obtener lista de archivos
-            files = ftp.nlst()
-            # Filtrar directorios ocultos si existen
-            files = [f for f in files if f not in ('.', '..', 'cgi-bin')]
-            
-            # 5. Construir URLs completas
-            base_url = settings.REMOTE_STORAGE_BASE_URL.rstrip("/")
-            return [f"{base_url}/{safe_employee}/{safe_activity}/{f}" for f in files]
+    @staticmethod
+    def download_file(relative_path: str) -> io.BytesIO:
+        """Descarga un archivo (ruta relativa a la ruta base) a memoria."""
+        buffer = io.BytesIO()
+        get_backend().download(relative_path, buffer)
+        buffer.seek(0)
+        return buffer
 
-        except Exception as e:
-            logger.error(f"Error listando archivos FTP para {employee_name}: {e}")
-            return []
-        finally:
-            ftp.quit()
+    @staticmethod
+    def _list(backend: StorageBackend, relative_dir: str) -> List[str]:
+        """Lista una carpeta sin 'cgi-bin' ni la carpeta de miniaturas."""
+        return [n for n in backend.list(relative_dir) if n not in _IGNORED_ENTRIES]
@@ -0,0 +1,49 @@
+import threading
+from typing import Optional
+from app.core.config import settings
+from app.services.external.storage.base import StorageBackend, PooledStorageBackend
+
+BACKENDS = ("ftp", "sftp", "s3", "local")
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str) -> StorageBackend:
+    """
+    Instancia el backend indicado. Los módulos se importan aquí para que cada
+    despliegue solo necesite la librería del backend que usa (paramiko, boto3).
+    """
+    name = (name or "").lower()
+    if name == "ftp":
+        from app.services.external.storage.ftp import FtpStorageBackend
+        return FtpStorageBackend(settings.REMOTE_STORAGE_BASE_URL)
+    if name == "sftp":
+        from app.services.external.storage.sftp import SftpStorageBackend
+        return SftpStorageBackend(settings.REMOTE_STORAGE_BASE_URL)
+    if name == "s3":
+        from app.services.external.storage.s3 import S3StorageBackend
+        return S3StorageBackend(settings.REMOTE_STORAGE_BASE_URL)
+    if name == "local":
+        from app.services.external.storage.local import LocalStorageBackend
+        return LocalStorageBackend(settings.REMOTE_STORAGE_LOCAL_BASE_URL)
+    raise ValueError(f"REMOTE_STORAGE_BACKEND inválido: '{name}'. Opciones: {', '.join(BACKENDS)}")
+
+
+def get_backend() -> StorageBackend:
+    """Backend configurado en REMOTE_STORAGE_BACKEND, compartido por el proceso (se crea al primer uso)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(settings.REMOTE_STORAGE_BACKEND)
+    return _backend
+
+
+def reset_backend() -> None:
+    """Cierra el backend actual; el siguiente `get_backend()` lo vuelve a crear con la configuración vigente."""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = None
@@ -0,0 +1,248 @@
+import logging
+import posixpath
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, List, Optional, Tuple, Type
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.external.db_pool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend(ABC):
+    """
+    Destino de las evidencias (hosting FTP, SFTP, bucket S3 o disco local).
+
+    Todas las operaciones usan claves relativas con '/' (empleado/actividad/archivo.jpg);
+    cada backend las ubica bajo su ruta base y construye la URL pública.
+    Los errores se propagan: `RemoteStorageService` decide si se loguean o se reintentan.
+    """
+    name: str = ""
+    BLOCK_SIZE = 64 * 1024  # Tamaño de bloque al enviar por streaming
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    @abstractmethod
+    def is_configured(self) -> bool:
+        """Indica si hay credenciales/ruta suficientes para usar el backend."""
+
+    @abstractmethod
+    def upload_fileobj(self, fileobj: BinaryIO, key: str) -> None:
+        """Guarda el contenido de `fileobj` (leído por bloques, desde el inicio) en `key`."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Borra el archivo `key`."""
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> List[str]:
+        """Nombres de las entradas (archivos y carpetas) directamente dentro de `prefix`. Vacío si no existe."""
+
+    @abstractmethod
+    def download(self, key: str, buffer: BinaryIO) -> None:
+        """Escribe el contenido de `key` en `buffer`."""
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Clave de un archivo a partir de su URL pública (None si la URL no es de este backend)."""
+        if not url or not self.base_url or not url.startswith(self.base_url + "/"):
+            return None
+        return url[len(self.base_url) + 1:]
+
+    def stats(self) -> dict:
+        """Métricas de conexiones del backend (vacío si no mantiene conexiones)."""
+        return {}
+
+    def close(self) -> None:
+        """Libera las conexiones ociosas."""
+
+
+class PooledStorageBackend(StorageBackend):
+    """
+    Base de los backends con sesiones persistentes (FTP, SFTP): las sesiones ya autenticadas
+    se reutilizan desde un `ConnectionPool`, una sesión rota se descarta y la operación se reintenta
+    una vez con otra, y las carpetas ya creadas se recuerdan para no volver a consultarlas.
+    """
+    # Errores que indican que la sesión quedó inutilizable (la operación se reintenta con otra)
+    BROKEN_SESSION_ERRORS: Tuple[Type[BaseException], ...] = (EOFError, OSError)
+    # Errores de "no existe" / "sin permiso" sobre una ruta (la sesión sigue sirviendo)
+    PATH_ERRORS: Tuple[Type[BaseException], ...] = ()
+
+    def __init__(self, base_url: str):
+        super().__init__(base_url)
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # Carpetas remotas que ya sabemos que existen (ruta absoluta -> True)
+        self._known_dirs = TTLCache(settings.REMOTE_STORAGE_DIR_CACHE_TTL_SECONDS, max_size=4096)
+
+    # --- SESIONES ---
+
+    @abstractmethod
+    def connect(self):
+        """Abre una sesión NUEVA y autenticada, con `base_dir` (ruta base absoluta) ya resuelto."""
+
+    @abstractmethod
+    def ping(self, conn) -> None:
+        """Verifica que una sesión ociosa siga viva (lanza excepción si no)."""
+
+    @abstractmethod
+    def is_closed(self, conn) -> bool:
+        """Indica si la sesión ya está cerrada."""
+
+    @abstractmethod
+    def close_session(self, conn) -> None:
+        """Cierra una sesión."""
+
+    def get_pool(self) -> ConnectionPool:
+        """Pool de sesiones compartido por el proceso (se crea al primer uso)."""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool(
+                        self.connect,
+                        min_size=0,
+                        max_size=settings.REMOTE_STORAGE_FTP_POOL_MAX_SIZE,
+                        idle_timeout=settings.REMOTE_STORAGE_FTP_IDLE_TIMEOUT,
+                        acquire_timeout=settings.REMOTE_STORAGE_FTP_ACQUIRE_TIMEOUT,
+                        ping_after=settings.REMOTE_STORAGE_FTP_KEEPALIVE_AFTER,
+                        ping=self.ping,
+                        is_closed=self.is_closed,
+                        close=self.close_session,
+                    )
+        return self._pool
+
+    @contextmanager
+    def session(self):
+        """
+        Presta una sesión del pool y la devuelve al terminar.
+        Si la operación termina con cualquier excepción, la sesión se descarta: además de las sesiones
+        rotas (el servidor cortó la conexión, caída de red), un error a mitad de una transferencia
+        (por ejemplo, el 413 del lector del upload) deja la conexión en un estado incierto.
+        """
+        pool = self.get_pool()
+        conn = pool.acquire()
+        completed = False
+        try:
+            yield conn
+            completed = True
+        finally:
+            pool.release(conn, discard=not completed)
+
+    def run(self, operation: Callable, description: str):
+        """Ejecuta `operation(conn)` con una sesión del pool; si la sesión estaba caída, reintenta una vez con otra nueva."""
+        try:
+            with self.session() as conn:
+                return operation(conn)
+        except self.BROKEN_SESSION_ERRORS as e:
+            # Un error de ruta puede heredar de OSError (SFTP): no es una sesión caída
+            if isinstance(e, self.PATH_ERRORS):
+                raise
+            logger.warning(f"Sesión {self.name} caída durante {description}, reintentando con una nueva: {e}")
+        with self.session() as conn:
+            return operation(conn)
+
+    def stats(self) -> dict:
+        return self.get_pool().stats()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close_all()
+
+    # --- CARPETAS ---
+
+    @abstractmethod
+    def _stat_dir(self, conn, remote_path: str) -> None:
+        """Lanza uno de PATH_ERRORS si la carpeta no existe."""
+
+    @abstractmethod
+    def _mkdir(self, conn, remote_path: str) -> None:
+        """Crea una sola carpeta (el padre ya existe)."""
+
+    @abstractmethod
+    def _store(self, conn, fileobj: BinaryIO, remote_file: str) -> None:
+        """Envía el contenido por streaming a la ruta absoluta `remote_file`."""
+
+    @abstractmethod
+    def _listdir(self, conn, remote_dir: str) -> List[str]:
+        """Lista una carpeta por ruta absoluta (lanza uno de PATH_ERRORS si no existe)."""
+
+    @abstractmethod
+    def _remove(self, conn, remote_file: str) -> None:
+        """Borra un archivo por ruta absoluta."""
+
+    @abstractmethod
+    def _retrieve(self, conn, remote_file: str, buffer: BinaryIO) -> None:
+        """Descarga un archivo por ruta absoluta en `buffer`."""
+
+    def forget_dir(self, remote_path: str) -> None:
+        """Olvida una carpeta y sus ancestros de la caché (pudieron haberse borrado desde fuera)."""
+        path = remote_path.rstrip('/')
+        while path and path != '/':
+            self._known_dirs.pop(path)
+            path = posixpath.dirname(path)
+
+    def makedirs(self, conn, remote_path: str) -> None:
+        """
+        Crea directorios recursivamente (ruta absoluta; solo crea los tramos que faltan).
+        Las carpetas ya vistas se recuerdan, así que una carpeta conocida no cuesta ningún round trip.
+        """
+        if self._known_dirs.get(remote_path):
+            return
+
+        try:
+            self._stat_dir(conn, remote_path)
+        except self.PATH_ERRORS:
+            parent = posixpath.dirname(remote_path.rstrip('/'))
+            if parent and parent != remote_path:
+                self.makedirs(conn, parent)
+            self._mkdir(conn, remote_path)
+        self._known_dirs.set(remote_path, True)
+
+    # --- OPERACIONES ---
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str) -> None:
+        def _upload(conn):
+            # Crear las carpetas (si faltan) y subir con ruta absoluta
+            remote_file = posixpath.join(conn.base_dir, key)
+            remote_dir = posixpath.dirname(remote_file)
+            self.makedirs(conn, remote_dir)
+            fileobj.seek(0)
+            try:
+                self._store(conn, fileobj, remote_file)
+            except self.PATH_ERRORS:
+                # La carpeta en caché pudo haberse borrado desde fuera: la olvidamos y la recreamos
+                self.forget_dir(remote_dir)
+                self.makedirs(conn, remote_dir)
+                fileobj.seek(0)
+                self._store(conn, fileobj, remote_file)
+
+        self.run(_upload, f"la subida de {key}")
+
+    def delete(self, key: str) -> None:
+        self.run(lambda conn: self._remove(conn, posixpath.join(conn.base_dir, key)), f"el borrado de {key}")
+
+    def list(self, prefix: str = "") -> List[str]:
+        def _list(conn):
+            remote_dir = posixpath.join(conn.base_dir, prefix) if prefix else conn.base_dir
+            try:
+                names = self._listdir(conn, remote_dir)
+            except self.PATH_ERRORS:
+                self.forget_dir(remote_dir)
+                return []  # La carpeta aún no existe (o está vacía)
+            # Algunos servidores devuelven la ruta completa: nos quedamos con el nombre
+            return [n for n in (posixpath.basename(name) for name in names) if n not in ('.', '..')]
+
+        return self.run(_list, f"el listado de {prefix or '/'}")
+
+    def download(self, key: str, buffer: BinaryIO) -> None:
+        def _download(conn):
+            buffer.seek(0)
+            buffer.truncate()
+            self._retrieve(conn, posixpath.join(conn.base_dir, key), buffer)
+
+        self.run(_download, f"la descarga de {key}")
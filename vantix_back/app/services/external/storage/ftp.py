@@ -0,0 +1,64 @@
+import ftplib
+import logging
+import posixpath
+from typing import BinaryIO, List
+from app.core.config import settings
+from app.services.external.storage.base import PooledStorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+class FtpStorageBackend(PooledStorageBackend):
+    """Web Hosting por FTP (ftplib), con sesiones reutilizadas y STOR por bloques."""
+    name = "FTP"
+    # `error_perm` (5xx) NO está aquí: es un error de la operación, la sesión sigue sirviendo
+    BROKEN_SESSION_ERRORS = (EOFError, OSError, ftplib.error_temp, ftplib.error_reply, ftplib.error_proto)
+    PATH_ERRORS = (ftplib.error_perm,)
+
+    def is_configured(self) -> bool:
+        return bool(settings.REMOTE_STORAGE_HOST and settings.REMOTE_STORAGE_USER)
+
+    def connect(self):
+        """Abre una sesión FTP NUEVA y autenticada con el Web Hosting (usada por el pool)."""
+        try:
+            ftp = ftplib.FTP()
+            ftp.connect(settings.REMOTE_STORAGE_HOST, settings.REMOTE_STORAGE_FTP_PORT, timeout=30)
+            ftp.login(settings.REMOTE_STORAGE_USER, settings.REMOTE_STORAGE_PASSWORD)
+        except Exception as e:
+            logger.error(f"Error conectando al servidor FTP: {e}")
+            raise e
+
+        # Ruta base absoluta: las operaciones usan rutas completas y no dependen del `cwd` de la sesión
+        base_path = settings.REMOTE_STORAGE_BASE_PATH or "."
+        ftp.base_dir = posixpath.normpath(posixpath.join(ftp.pwd(), base_path))
+        return ftp
+
+    def ping(self, ftp) -> None:
+        ftp.voidcmd("NOOP")
+
+    def is_closed(self, ftp) -> bool:
+        return ftp.sock is None
+
+    def close_session(self, ftp) -> None:
+        try:
+            ftp.quit()
+        except Exception:
+            ftp.close()
+
+    def _stat_dir(self, ftp, remote_path: str) -> None:
+        ftp.cwd(remote_path)
+
+    def _mkdir(self, ftp, remote_path: str) -> None:
+        ftp.mkd(remote_path)
+
+    def _store(self, ftp, fileobj: BinaryIO, remote_file: str) -> None:
+        ftp.storbinary(f"STOR {remote_file}", fileobj, blocksize=self.BLOCK_SIZE)
+
+    def _listdir(self, ftp, remote_dir: str) -> List[str]:
+        return ftp.nlst(remote_dir)
+
+    def _remove(self, ftp, remote_file: str) -> None:
+        ftp.delete(remote_file)
+
+    def _retrieve(self, ftp, remote_file: str, buffer: BinaryIO) -> None:
+        ftp.retrbinary(f"RETR {remote_file}", buffer.write, blocksize=self.BLOCK_SIZE)
@@ -0,0 +1,59 @@
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, List
+from uuid import uuid4
+from app.core.config import settings
+from app.services.external.storage.base import StorageBackend
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Carpeta del propio servidor (por defecto static/evidencias, servida por /static).
+    Útil sin hosting externo o con un disco compartido; escribe por bloques y reemplaza
+    el archivo de forma atómica, así nunca se sirve un archivo a medio escribir.
+    """
+    name = "local"
+
+    def __init__(self, base_url: str):
+        super().__init__(base_url)
+        self.root = Path(settings.REMOTE_STORAGE_LOCAL_ROOT)
+
+    def is_configured(self) -> bool:
+        # No usa credenciales: basta con la carpeta raíz (vacía = backend sin configurar)
+        return bool(settings.REMOTE_STORAGE_LOCAL_ROOT)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        # Una clave nunca puede salir de la carpeta raíz
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Clave de almacenamiento inválida: {key}")
+        return path
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{uuid4()}.tmp")
+        fileobj.seek(0)
+        try:
+            with open(tmp_path, "wb") as buffer:
+                shutil.copyfileobj(fileobj, buffer, self.BLOCK_SIZE)
+            os.replace(tmp_path, path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink()
+
+    def list(self, prefix: str = "") -> List[str]:
+        folder = self._path(prefix) if prefix else self.root
+        if not folder.is_dir():
+            return []
+        return [entry.name for entry in os.scandir(folder) if not entry.name.startswith(".")]
+
+    def download(self, key: str, buffer: BinaryIO) -> None:
+        buffer.seek(0)
+        buffer.truncate()
+        with open(self._path(key), "rb") as source:
+            shutil.copyfileobj(source, buffer, self.BLOCK_SIZE)
@@ -0,0 +1,86 @@
+import mimetypes
+import posixpath
+from typing import BinaryIO, List
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from app.core.config import settings
+from app.services.external.storage.base import StorageBackend
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Bucket compatible con S3 (AWS, MinIO, Cloudflare R2, Wasabi...).
+
+    Un solo cliente boto3 (thread-safe) por proceso: reutiliza sus conexiones HTTP keep-alive.
+    Los archivos grandes se suben en multipart por partes de REMOTE_STORAGE_S3_MULTIPART_CHUNK_MB,
+    leyendo el origen por streaming (nunca entero en memoria).
+    """
+    name = "S3"
+
+    def __init__(self, base_url: str):
+        super().__init__(base_url)
+        self.bucket = settings.REMOTE_STORAGE_S3_BUCKET
+        # La ruta base se usa como prefijo de las claves ("." o vacío = raíz del bucket)
+        base_path = posixpath.normpath(settings.REMOTE_STORAGE_BASE_PATH or ".").strip("/")
+        self.prefix = "" if base_path == "." else f"{base_path}/"
+        self._client = None
+        chunk_size = settings.REMOTE_STORAGE_S3_MULTIPART_CHUNK_MB * 1024 * 1024
+        self._transfer_config = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            max_concurrency=settings.REMOTE_STORAGE_S3_MULTIPART_CONCURRENCY,
+            io_chunksize=self.BLOCK_SIZE,
+        )
+
+    def is_configured(self) -> bool:
+        return bool(self.bucket and settings.REMOTE_STORAGE_S3_ACCESS_KEY)
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=settings.REMOTE_STORAGE_S3_ENDPOINT_URL or None,
+                region_name=settings.REMOTE_STORAGE_S3_REGION,
+                aws_access_key_id=settings.REMOTE_STORAGE_S3_ACCESS_KEY,
+                aws_secret_access_key=settings.REMOTE_STORAGE_S3_SECRET_KEY,
+                config=Config(
+                    # Cada subida multipart usa varias conexiones a la vez
+                    max_pool_connections=settings.REMOTE_STORAGE_MAX_CONCURRENT_UPLOADS
+                    * settings.REMOTE_STORAGE_S3_MULTIPART_CONCURRENCY,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                    # MinIO y la mayoría de servicios compatibles usan rutas (endpoint/bucket/clave)
+                    s3={"addressing_style": "path" if settings.REMOTE_STORAGE_S3_ENDPOINT_URL else "auto"},
+                ),
+            )
+        return self._client
+
+    def upload_fileobj(self, fileobj: BinaryIO, key: str) -> None:
+        fileobj.seek(0)
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            self.prefix + key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self._transfer_config,
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def list(self, prefix: str = "") -> List[str]:
+        # Con Delimiter='/' el bucket se recorre como carpetas: archivos (Contents) y subcarpetas (CommonPrefixes)
+        folder = self.prefix + (f"{prefix.strip('/')}/" if prefix else "")
+        names = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=folder, Delimiter="/"):
+            names += [item["Prefix"][len(folder):].rstrip("/") for item in page.get("CommonPrefixes", [])]
+            names += [item["Key"][len(folder):] for item in page.get("Contents", [])]
+        return [n for n in names if n]
+
+    def download(self, key: str, buffer: BinaryIO) -> None:
+        buffer.seek(0)
+        buffer.truncate()
+        self.client.download_fileobj(self.bucket, self.prefix + key, buffer, Config=self._transfer_config)
@@ -0,0 +1,86 @@
+import logging
+import posixpath
+import stat
+from typing import BinaryIO, List
+import paramiko
+from app.core.config import settings
+from app.services.external.storage.base import PooledStorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+class SftpStorageBackend(PooledStorageBackend):
+    """
+    Servidor SSH por SFTP (paramiko). Cada sesión del pool es un transporte SSH con su canal SFTP;
+    las subidas usan escritura en pipeline (no esperan el ACK de cada bloque).
+    """
+    name = "SFTP"
+    BROKEN_SESSION_ERRORS = (EOFError, OSError, paramiko.SSHException)
+    # paramiko traduce los estados SFTP a FileNotFoundError/PermissionError (subclases de OSError)
+    PATH_ERRORS = (FileNotFoundError, PermissionError)
+
+    def is_configured(self) -> bool:
+        return bool(settings.REMOTE_STORAGE_HOST and settings.REMOTE_STORAGE_USER)
+
+    def connect(self):
+        """Abre una sesión SFTP NUEVA y autenticada (usada por el pool)."""
+        transport = None
+        try:
+            transport = paramiko.Transport((settings.REMOTE_STORAGE_HOST, settings.REMOTE_STORAGE_PORT))
+            transport.set_keepalive(settings.REMOTE_STORAGE_FTP_KEEPALIVE_AFTER)
+            transport.connect(username=settings.REMOTE_STORAGE_USER, password=settings.REMOTE_STORAGE_PASSWORD)
+            sftp = paramiko.SFTPClient.from_transport(transport)
+        except Exception as e:
+            if transport is not None:
+                transport.close()
+            logger.error(f"Error conectando al servidor SFTP: {e}")
+            raise e
+
+        # Ruta base absoluta: las operaciones usan rutas completas y no dependen del directorio actual
+        sftp.base_dir = sftp.normalize(settings.REMOTE_STORAGE_BASE_PATH or ".")
+        return sftp
+
+    def ping(self, sftp) -> None:
+        sftp.stat(sftp.base_dir)
+
+    def is_closed(self, sftp) -> bool:
+        transport = sftp.get_channel().get_transport()
+        return sftp.sock.closed or not transport.is_active()
+
+    def close_session(self, sftp) -> None:
+        transport = sftp.get_channel().get_transport()
+        try:
+            sftp.close()
+        finally:
+            transport.close()
+
+    def _stat_dir(self, sftp, remote_path: str) -> None:
+        if not stat.S_ISDIR(sftp.stat(remote_path).st_mode):
+            raise FileNotFoundError(remote_path)
+
+    def _mkdir(self, sftp, remote_path: str) -> None:
+        sftp.mkdir(remote_path)
+
+    def _store(self, sftp, fileobj: BinaryIO, remote_file: str) -> None:
+        with sftp.open(remote_file, "wb", bufsize=self.BLOCK_SIZE) as remote:
+            remote.set_pipelined(True)
+            while True:
+                chunk = fileobj.read(self.BLOCK_SIZE)
+                if not chunk:
+                    break
+                remote.write(chunk)
+
+    def _listdir(self, sftp, remote_dir: str) -> List[str]:
+        return sftp.listdir(remote_dir)
+
+    def _remove(self, sftp, remote_file: str) -> None:
+        sftp.remove(remote_file)
+
+    def _retrieve(self, sftp, remote_file: str, buffer: BinaryIO) -> None:
+        with sftp.open(remote_file, "rb", bufsize=self.BLOCK_SIZE) as remote:
+            remote.prefetch()
+            while True:
+                chunk = remote.read(self.BLOCK_SIZE)
+                if not chunk:
+                    break
+                buffer.write(chunk)
@@ -1,29 +1,77 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from app.core.config import settings
+from app.services.external.db_pool import ConnectionPool
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import date
 from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
 class ExternalDBService:
+    _pool = None
+    _pool_lock = threading.Lock()
+
     @staticmethod
     def get_connection():
-        """Establece una conexión con la base de datos externa de Upgrade."""
+        """Establece una conexión NUEVA con la base de datos externa de Upgrade (usada por el pool)."""
         try:
             conn = psycopg2.connect(
                 host=settings.EXTERNAL_DB_HOST,
                 port=settings.EXTERNAL_DB_PORT,
                 user=settings.EXTERNAL_DB_USER,
                 password=settings.EXTERNAL_DB_PASSWORD,
-                database=settings.EXTERNAL_DB_NAME
+                database=settings.EXTERNAL_DB_NAME,
+                connect_timeout=settings.EXTERNAL_DB_CONNECT_TIMEOUT
             )
+            # Solo hacemos lecturas: autocommit evita conexiones "idle in transaction" dentro del pool
+            conn.autocommit = True
             return conn
         except Exception as e:
             logger.error(f"Error conectando a la base de datos externa: {e}")
             raise e
 
+    @classmethod
+    def get_pool(cls) -> ConnectionPool:
+        """Pool de conexiones compartido por el proceso (se crea al primer uso)."""
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    cls._pool = ConnectionPool(
+                        cls.get_connection,
+                        min_size=settings.EXTERNAL_DB_POOL_MIN_SIZE,
+                        max_size=settings.EXTERNAL_DB_POOL_MAX_SIZE,
+                        idle_timeout=settings.EXTERNAL_DB_POOL_IDLE_TIMEOUT,
+                        acquire_timeout=settings.EXTERNAL_DB_POOL_ACQUIRE_TIMEOUT,
+                        ping_after=settings.EXTERNAL_DB_POOL_PING_AFTER,
+                    )
+        return cls._pool
+
+    @classmethod
+    @contextmanager
+    def connection(cls):
+        """
+        Presta una conexión del pool y la devuelve al terminar.
+        Si la conexión queda rota (caída de red, servidor reiniciado), se descarta en vez de reutilizarse.
+        """
+        pool = cls.get_pool()
+        conn = pool.acquire()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            pool.release(conn, discard=broken)
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """Estadísticas del pool (en uso, esperando, creadas, descartadas)."""
+        return cls.get_pool().stats()
+
 
     @staticmethod
     def fetch_ventas_detalladas(
@@ -36,8 +84,7 @@ class ExternalDBService:
         Trae el resumen de Notas de Pedido (Cabecera) para un vendedor. 
         Evita duplicados por productos usando agregación.
         """
-        conn = ExternalDBService.get_connection()
-        try:
+        with ExternalDBService.connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = """
                     SELECT 
@@ -80,16 +127,13 @@ class ExternalDBService:
                 
                 cur.execute(query, params)
                 return cur.fetchall()
-        finally:
-            conn.close()
 
     @staticmethod
     def sum_ventas_monto(vendedor_id_externo: int, fecha_inicio: date, fecha_fin: date) -> Decimal:
         """
         Obtiene el monto total de notas de pedido (Suma de columna total) para un vendedor en un periodo.
         """
-        conn = ExternalDBService.get_connection()
-        try:
+        with ExternalDBService.connection() as conn:
             with conn.cursor() as cur:
                 query = """
                     SELECT SUM(total) 
@@ -102,16 +146,13 @@ class ExternalDBService:
                 cur.execute(query, (vendedor_id_externo, fecha_inicio, fecha_fin))
                 result = cur.fetchone()
                 return result[0] if result and result[0] else Decimal("0.00")
-        finally:
-            conn.close()
 
     @staticmethod
     def fetch_resumen_ventas_vendedores(fecha_inicio: date, fecha_fin: date):
         """
         Trae el total vendido por CADA vendedor en un rango de fechas usando Notas de Pedido Aprobadas.
         """
-        conn = ExternalDBService.get_connection()
-        try:
+        with ExternalDBService.connection() as conn:
             with conn.cursor() as cur:
                 query = """
                     SELECT vendedor_id, SUM(total) 
@@ -124,8 +165,6 @@ class ExternalDBService:
                 cur.execute(query, (fecha_inicio, fecha_fin))
                 result = cur.fetchall()
                 return {row[0]: Decimal(str(row[1] or 0)) for row in result}
-        finally:
-            conn.close()
 
     @staticmethod
     def fetch_productos(limit: int = 100, offset: int = 0, search: str = None):
@@ -133,8 +172,7 @@ class ExternalDBService:
         Trae el listado de productos desde la base de datos externa para ser usados en las cotizaciones.
         Permite búsqueda por nombre o código.
         """
-        conn = ExternalDBService.get_connection()
-        try:
+        with ExternalDBService.connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = """
                     SELECT 
@@ -161,8 +199,50 @@ class ExternalDBService:
                 
                 cur.execute(query, params)
                 return cur.fetchall()
-        finally:
-            conn.close()
+
+    # Huella de cada producto: si no cambia, la copia local (productos_catalogo) no vuelve a traer la fila
+    _PRODUCTO_HASH = "md5(row(p.codigo, p.nombre, p.descripcion, m.nombre, p.modelo, p.ecom_precio)::text)"
+
+    @staticmethod
+    def fetch_productos_hashes(after_id: int = 0, limit: int = 5000):
+        """
+        Id y huella (md5) de los productos con id mayor que `after_id`, en orden de id (paginación por llave).
+        Es lo único que se lee del ERP en cada refresco de la copia local, salvo los productos que cambiaron.
+        """
+        with ExternalDBService.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT p.id, {ExternalDBService._PRODUCTO_HASH}
+                    FROM extcs.productos p
+                    LEFT JOIN extcs.marcas m ON p.marca_id = m.id
+                    WHERE p.id > %s
+                    ORDER BY p.id ASC
+                    LIMIT %s
+                """, (after_id, limit))
+                return cur.fetchall()
+
+    @staticmethod
+    def fetch_productos_by_ids(ids: list):
+        """Trae los productos indicados (con su huella) para actualizar la copia local."""
+        if not ids:
+            return []
+        with ExternalDBService.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(f"""
+                    SELECT 
+                        p.id,
+                        p.codigo,
+                        p.nombre,
+                        p.descripcion,
+                        m.nombre as marca,
+                        p.modelo,
+                        p.ecom_precio,
+                        {ExternalDBService._PRODUCTO_HASH} as hash
+                    FROM extcs.productos p
+                    LEFT JOIN extcs.marcas m ON p.marca_id = m.id
+                    WHERE p.id = ANY(%s)
+                """, (list(ids),))
+                return cur.fetchall()
 
     @staticmethod
     def fetch_almacenes(limit: int = 100, offset: int = 0, search: str = None):
@@ -170,8 +250,7 @@ class ExternalDBService:
         Trae el listado de almacenes desde la base de datos externa.
         Permite búsqueda por nombre o código.
         """
-        conn = ExternalDBService.get_connection()
-        try:
+        with ExternalDBService.connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = """
                     SELECT 
@@ -196,16 +275,13 @@ class ExternalDBService:
                 
                 cur.execute(query, params)
                 return cur.fetchall()
-        finally:
-            conn.close()
 
     @staticmethod
     def fetch_monedas():
         """
         Trae el listado de monedas desde la base de datos externa.
         """
-        conn = ExternalDBService.get_connection()
-        try:
+        with ExternalDBService.connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = """
                     SELECT 
@@ -219,16 +295,13 @@ class ExternalDBService:
                 """
                 cur.execute(query)
                 return cur.fetchall()
-        finally:
-            conn.close()
 
     @staticmethod
     def fetch_formas_pago():
         """
         Trae el listado de formas de pago desde la base de datos externa.
         """
-        conn = ExternalDBService.get_connection()
-        try:
+        with ExternalDBService.connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = """
                     SELECT 
@@ -241,5 +314,3 @@ class ExternalDBService:
                 """
                 cur.execute(query)
                 return cur.fetchall()
-        finally:
-            conn.close()
@@ -2,7 +2,7 @@ from typing import Optional
 from datetime import date
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from app.models.empleado import Empleado
+from app.schemas.empleado import EmpleadoPrincipal
 from app.schemas.finanzas import GastoCreate
 from app import crud
 from app.models.enums import EstadoPlanEnum, TipoActividadEnum
@@ -11,7 +11,7 @@ from app.models.finanzas import GastoMovilidad
 
 class GastoValidatorService:
     @staticmethod
-    def validate_gasto_creation(db: Session, gasto_in: GastoCreate, current_user: Empleado):
+    def validate_gasto_creation(db: Session, gasto_in: GastoCreate, current_user: EmpleadoPrincipal):
         """
         Contiene las reglas de negocio para validar la creación de un gasto de movilidad.
         """
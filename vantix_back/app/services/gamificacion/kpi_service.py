@@ -1,7 +1,9 @@
+from sqlalchemy import func, and_, update
 from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.models.kpi import InformeProductividad, IncentivoPago, MaestroMetas
-from app.models.plan import PlanTrabajoSemanal
+from app.models.plan import PlanTrabajoSemanal, DetallePlanTrabajo
+from app.models.enums import TipoActividadEnum
 from decimal import Decimal
 from typing import List, Optional
 from app.services.external.upgrade_db import ExternalDBService
@@ -19,46 +21,55 @@ class KPIService:
     ) -> Optional[InformeProductividad]:
         """
         Actualiza una métrica específica usando los pesos del Maestro de Metas vinculado.
-        """
-        informe = crud.kpi.get_by_plan(db, id_plan=id_plan)
-        if not informe or not informe.id_maestro_meta:
-            return None
-        
-        maestro = db.query(MaestroMetas).filter(MaestroMetas.id_maestro == informe.id_maestro_meta).first()
-        if not maestro:
-            return None
 
+        El incremento y los puntos se aplican con un único UPDATE ... RETURNING atómico en la
+        base de datos, así dos registros simultáneos del mismo vendedor no se pisan entre sí.
+        """
         # Mapeo de tipo de actividad a columna y peso
         mapping = {
-            "visita": ("real_visitas", maestro.puntos_visita),
-            "visita_asistida": ("real_visitas_asistidas", maestro.puntos_visita_asistida),
-            "llamada": ("real_llamadas", maestro.puntos_llamada),
-            "email": ("real_emails", maestro.puntos_email),
-            "cotizacion": ("real_cotizaciones", maestro.puntos_cotizacion),
-            "venta": ("real_ventas_monto", maestro.puntos_venta)
+            "visita": (InformeProductividad.real_visitas, MaestroMetas.puntos_visita),
+            "visita_asistida": (InformeProductividad.real_visitas_asistidas, MaestroMetas.puntos_visita_asistida),
+            "llamada": (InformeProductividad.real_llamadas, MaestroMetas.puntos_llamada),
+            "email": (InformeProductividad.real_emails, MaestroMetas.puntos_email),
+            "cotizacion": (InformeProductividad.real_cotizaciones, MaestroMetas.puntos_cotizacion),
+            "venta": (InformeProductividad.real_ventas_monto, MaestroMetas.puntos_venta)
         }
 
         if tipo_actividad not in mapping:
-            return informe
-
-        col_name, peso = mapping[tipo_actividad]
-        
-        # 1. Actualizar valor real
-        current_val = getattr(informe, col_name, 0)
-        setattr(informe, col_name, max(0, current_val + increment))
-        
-        # 2. Sumar puntos
-        informe.puntos_alcanzados = max(0, informe.puntos_alcanzados + (increment * peso))
-        
-        db.add(informe)
+            return crud.kpi.get_by_plan(db, id_plan=id_plan)
+
+        columna, peso = mapping[tipo_actividad]
+
+        # 1. Actualizar valor real y sumar puntos en la misma sentencia (UPDATE ... FROM maestro_metas)
+        stmt = (
+            update(InformeProductividad)
+            .where(
+                InformeProductividad.id_plan == id_plan,
+                MaestroMetas.id_maestro == InformeProductividad.id_maestro_meta
+            )
+            .values({
+                columna: func.greatest(0, func.coalesce(columna, 0) + increment),
+                InformeProductividad.puntos_alcanzados: func.greatest(
+                    0,
+                    func.coalesce(InformeProductividad.puntos_alcanzados, 0) + increment * func.coalesce(peso, 0)
+                )
+            })
+            .returning(InformeProductividad, MaestroMetas.puntaje_objetivo)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        fila = db.execute(stmt).first()
+        if not fila:
+            db.rollback()
+            return None
+
+        informe, puntaje_objetivo = fila
+        alcanzo_meta = bool(puntaje_objetivo) and informe.puntos_alcanzados >= puntaje_objetivo
         db.commit()
-        db.refresh(informe)
-        
-        # 3. Verificar bono (Cálculo de porcentaje manual ya que quitamos la columna Computed)
-        porcentaje = (informe.puntos_alcanzados / maestro.puntaje_objetivo * 100) if maestro.puntaje_objetivo > 0 else 0
-        if porcentaje >= 100:
+
+        # 2. Verificar bono a partir de la fila retornada (sin volver a consultar el maestro)
+        if alcanzo_meta:
             KPIService.check_and_generate_bonus(db, informe=informe)
-            
+
         return informe
 
     @staticmethod
@@ -89,78 +100,15 @@ class KPIService:
     @staticmethod
     def sync_real_time_metrics(db: Session, *, id_informe: int) -> Optional[InformeProductividad]:
         """Sincroniza los valores reales consultando las tablas de actividad."""
-        from app.models.visita import RegistroVisita
-        from app.models.crm import RegistroLlamada, RegistroEmail
-        
         informe = crud.kpi.get(db, id=id_informe)
         if not informe or not informe.id_maestro_meta:
             return None
 
-        maestro = db.query(MaestroMetas).filter(MaestroMetas.id_maestro == informe.id_maestro_meta).first()
-        plan = db.query(PlanTrabajoSemanal).filter(PlanTrabajoSemanal.id_plan == informe.id_plan).first()
-        if not plan or not maestro:
+        actualizados = KPIService.recompute_plans_metrics(db, id_planes=[informe.id_plan])
+        if not actualizados:
             return None
 
-        # 1. Visitas
-        informe.real_visitas = db.query(RegistroVisita).filter(
-            RegistroVisita.id_empleado == plan.id_empleado,
-            RegistroVisita.fecha_visita >= plan.fecha_inicio_semana,
-            RegistroVisita.fecha_visita <= plan.fecha_fin_semana,
-            RegistroVisita.id_visita_asistida == None
-        ).count()
-        
-        informe.real_visitas_asistidas = db.query(RegistroVisita).filter(
-            RegistroVisita.id_empleado == plan.id_empleado,
-            RegistroVisita.fecha_visita >= plan.fecha_inicio_semana,
-            RegistroVisita.fecha_visita <= plan.fecha_fin_semana,
-            RegistroVisita.id_visita_asistida != None
-        ).count()
-
-        # 2. Llamadas
-        informe.real_llamadas = db.query(RegistroLlamada).filter(
-            RegistroLlamada.id_empleado == plan.id_empleado,
-            RegistroLlamada.fecha_registro >= plan.fecha_inicio_semana,
-            RegistroLlamada.fecha_registro <= plan.fecha_fin_semana
-        ).count()
-
-        # 3. Emails
-        informe.real_emails = db.query(RegistroEmail).filter(
-            RegistroEmail.id_empleado == plan.id_empleado,
-            RegistroEmail.fecha_registro >= plan.fecha_inicio_semana,
-            RegistroEmail.fecha_registro <= plan.fecha_fin_semana
-        ).count()
-
-        # 4. Cotizaciones y Ventas (Upgrade DB)
-        empleado = plan.empleado
-        if empleado and empleado.id_vendedor_externo:
-            informe.real_cotizaciones = ExternalDBService.count_cotizaciones(
-                vendedor_id_externo=empleado.id_vendedor_externo,
-                fecha_inicio=plan.fecha_inicio_semana,
-                fecha_fin=plan.fecha_fin_semana
-            )
-            informe.real_ventas_monto = ExternalDBService.sum_ventas_monto(
-                vendedor_id_externo=empleado.id_vendedor_externo,
-                fecha_inicio=plan.fecha_inicio_semana,
-                fecha_fin=plan.fecha_fin_semana
-            )
-
-        # 4. Calcular Puntos Totales usando pesos del maestro vinculado
-        puntos = (informe.real_visitas * maestro.puntos_visita)
-        puntos += (informe.real_visitas_asistidas * maestro.puntos_visita_asistida)
-        puntos += (informe.real_llamadas * maestro.puntos_llamada)
-        puntos += (informe.real_emails * maestro.puntos_email)
-        puntos += (informe.real_cotizaciones * maestro.puntos_cotizacion)
-        puntos += int(informe.real_ventas_monto * (maestro.puntos_venta or 0))
-
-        informe.puntos_alcanzados = puntos
-        db.add(informe)
-        db.commit()
         db.refresh(informe)
-        
-        porcentaje = (puntos / maestro.puntaje_objetivo * 100) if maestro.puntaje_objetivo > 0 else 0
-        if porcentaje >= 100:
-            KPIService.check_and_generate_bonus(db, informe=informe)
-
         return informe
 
     @staticmethod
@@ -169,40 +117,139 @@ class KPIService:
         Sincroniza masivamente las ventas de todos los empleados para la semana
         que termina en la fecha indicada.
         """
-        # 1. Buscar planes que terminen en esa fecha
-        planes = db.query(PlanTrabajoSemanal).filter(
-            PlanTrabajoSemanal.fecha_fin_semana == fecha_fin_sabado
+        id_planes = [
+            id_plan for (id_plan,) in db.query(PlanTrabajoSemanal.id_plan).filter(
+                PlanTrabajoSemanal.fecha_fin_semana == fecha_fin_sabado
+            ).all()
+        ]
+        if not id_planes:
+            return 0
+
+        return len(KPIService.recompute_plans_metrics(db, id_planes=id_planes))
+
+    @staticmethod
+    def recompute_plans_metrics(db: Session, *, id_planes: List[int]) -> List[InformeProductividad]:
+        """
+        Recalcula en bloque los valores reales, los puntos y los bonos de los informes
+        vinculados a los planes indicados.
+
+        En lugar de consultar empleado por empleado, hace un puñado de consultas agrupadas
+        (visitas, visitas asistidas, llamadas, emails, cotizaciones y ventas de Upgrade)
+        y guarda todo en una sola transacción.
+        """
+        from app.models.visita import RegistroVisita
+        from app.models.crm import RegistroLlamada, RegistroEmail
+        from app.models.cotizacion import Cotizacion
+        from app.models.empleado import Empleado
+
+        if not id_planes:
+            return []
+
+        # 1. Informes con su maestro y los datos del plan/empleado (una sola consulta)
+        filas = db.query(
+            InformeProductividad,
+            MaestroMetas,
+            PlanTrabajoSemanal.id_empleado,
+            PlanTrabajoSemanal.fecha_inicio_semana,
+            PlanTrabajoSemanal.fecha_fin_semana,
+            Empleado.id_vendedor_externo
+        ).join(
+            MaestroMetas, MaestroMetas.id_maestro == InformeProductividad.id_maestro_meta
+        ).join(
+            PlanTrabajoSemanal, PlanTrabajoSemanal.id_plan == InformeProductividad.id_plan
+        ).outerjoin(
+            Empleado, Empleado.id_empleado == PlanTrabajoSemanal.id_empleado
+        ).filter(
+            InformeProductividad.id_plan.in_(id_planes)
         ).all()
 
-        if not planes:
-            return 0
+        if not filas:
+            return []
+
+        ids = [fila[0].id_plan for fila in filas]
+
+        def contar_por_plan(columna_plan, *filtros) -> dict:
+            query = db.query(columna_plan, func.count()).filter(columna_plan.in_(ids), *filtros)
+            return dict(query.group_by(columna_plan).all())
+
+        # 2. Actividad registrada en Vantix, agrupada por plan
+        visitas = contar_por_plan(RegistroVisita.id_plan)
+        llamadas = contar_por_plan(RegistroLlamada.id_plan)
+        emails = contar_por_plan(RegistroEmail.id_plan)
 
-        # Determinamos el rango basado en el primer plan 
-        # (Asumimos que todos los planes que terminan el mismo sábado empezaron el mismo lunes)
-        f_inicio = planes[0].fecha_inicio_semana
-        f_fin = planes[0].fecha_fin_semana
-
-        # 2. Traer todos los totales de Upgrade de una vez
-        ventas_upgrade = ExternalDBService.fetch_resumen_ventas_vendedores(f_inicio, f_fin)
-
-        actualizados = 0
-        for plan in planes:
-            # Solo si el empleado tiene ID externo
-            if plan.empleado and plan.empleado.id_vendedor_externo:
-                id_ext = plan.empleado.id_vendedor_externo
-                monto_real = ventas_upgrade.get(id_ext, Decimal("0.00"))
-                
-                # Actualizar el informe asociado
-                if plan.informe_kpi:
-                    informe = plan.informe_kpi
-                    informe.real_ventas_monto = monto_real
-                    
-                    # Forzamos una sincronización completa para recalcular puntos y verificar bonos
-                    # usando la lógica ya existente en sync_real_time_metrics
-                    KPIService.sync_real_time_metrics(db, id_informe=informe.id_informe)
-                    actualizados += 1
-        
-        return actualizados
+        # Las visitas asistidas se identifican por la agenda: actividades "Visita asistida" marcadas como realizadas
+        asistidas = contar_por_plan(
+            DetallePlanTrabajo.id_plan,
+            DetallePlanTrabajo.tipo_actividad == TipoActividadEnum.VISITA_ASISTIDA,
+            DetallePlanTrabajo.estado == "Realizado"
+        )
+
+        # 3. Cotizaciones emitidas por el empleado dentro de la semana de cada plan
+        cotizaciones = dict(
+            db.query(PlanTrabajoSemanal.id_plan, func.count(Cotizacion.id_cotizacion))
+            .join(Cotizacion, and_(
+                Cotizacion.id_empleado == PlanTrabajoSemanal.id_empleado,
+                Cotizacion.fecha_emision >= PlanTrabajoSemanal.fecha_inicio_semana,
+                Cotizacion.fecha_emision <= PlanTrabajoSemanal.fecha_fin_semana
+            ))
+            .filter(PlanTrabajoSemanal.id_plan.in_(ids))
+            .group_by(PlanTrabajoSemanal.id_plan)
+            .all()
+        )
+
+        # 4. Ventas de Upgrade: una consulta agrupada por cada rango de fechas distinto (normalmente uno)
+        ventas_por_rango = {}
+        for _, _, _, f_inicio, f_fin, id_externo in filas:
+            if id_externo and (f_inicio, f_fin) not in ventas_por_rango:
+                ventas_por_rango[(f_inicio, f_fin)] = ExternalDBService.fetch_resumen_ventas_vendedores(f_inicio, f_fin)
+
+        # 5. Bonos ya generados (para no duplicarlos)
+        con_bono = {
+            id_plan for (id_plan,) in db.query(IncentivoPago.id_plan_origen)
+            .filter(IncentivoPago.id_plan_origen.in_(ids)).all()
+        }
+
+        informes = []
+        for informe, maestro, id_empleado, f_inicio, f_fin, id_externo in filas:
+            total_visitas = visitas.get(informe.id_plan, 0)
+            informe.real_visitas_asistidas = min(asistidas.get(informe.id_plan, 0), total_visitas)
+            informe.real_visitas = total_visitas - informe.real_visitas_asistidas
+            informe.real_llamadas = llamadas.get(informe.id_plan, 0)
+            informe.real_emails = emails.get(informe.id_plan, 0)
+            informe.real_cotizaciones = cotizaciones.get(informe.id_plan, 0)
+            if id_externo:
+                informe.real_ventas_monto = ventas_por_rango[(f_inicio, f_fin)].get(id_externo, Decimal("0.00"))
+
+            informe.puntos_alcanzados = KPIService.calcular_puntos(informe, maestro)
+            informes.append(informe)
+
+            if (
+                informe.id_plan not in con_bono
+                and bool(maestro.puntaje_objetivo)
+                and informe.puntos_alcanzados >= maestro.puntaje_objetivo
+            ):
+                db.add(IncentivoPago(
+                    id_empleado=id_empleado,
+                    id_plan_origen=informe.id_plan,
+                    monto_bono=Decimal("50.00"),
+                    concepto="Bono por cumplimiento de meta semanal al 100%",
+                    estado_pago="Pendiente"
+                ))
+                con_bono.add(informe.id_plan)
+
+        db.commit()
+        return informes
+
+    @staticmethod
+    def calcular_puntos(informe: InformeProductividad, maestro: MaestroMetas) -> int:
+        """Calcula los puntos totales de un informe usando los pesos del maestro vinculado."""
+        puntos = ((informe.real_visitas or 0) * maestro.puntos_visita)
+        puntos += ((informe.real_visitas_asistidas or 0) * maestro.puntos_visita_asistida)
+        puntos += ((informe.real_llamadas or 0) * maestro.puntos_llamada)
+        puntos += ((informe.real_emails or 0) * maestro.puntos_email)
+        puntos += ((informe.real_cotizaciones or 0) * maestro.puntos_cotizacion)
+        puntos += int((informe.real_ventas_monto or 0) * (maestro.puntos_venta or 0))
+        return puntos
 
     @staticmethod
     def get_weekly_sales_report(db: Session, fecha_inicio: date, fecha_fin: date, id_empleado: Optional[int] = None):
@@ -0,0 +1,56 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.kpi import MaestroMetasResponse
+
+
+class MaestroMetasCache:
+    """
+    Caché en memoria del Maestro de Metas (cambia, como mucho, una vez por semana).
+
+    Guarda copias (schemas) y no objetos ORM, para poder compartirlas entre sesiones.
+    - Por id_maestro.
+    - Por fecha -> meta vigente (también recuerda cuando NO hay meta para esa fecha).
+    Los endpoints de creación/edición/eliminación la invalidan; el TTL cubre el caso de
+    varios workers, donde la invalidación solo llega al proceso que atendió el cambio.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self._by_id = TTLCache(ttl_seconds)
+        self._by_fecha = TTLCache(ttl_seconds)
+
+    def get(self, db: Session, id_maestro: int) -> Optional[MaestroMetasResponse]:
+        """Obtiene una meta por su id, consultando la BD solo si no está en caché."""
+        meta = self._by_id.get(id_maestro)
+        if meta:
+            return meta
+
+        db_obj = crud.maestro_metas.get(db, id=id_maestro)
+        meta = MaestroMetasResponse.model_validate(db_obj) if db_obj else None
+        if meta:
+            self._by_id.set(id_maestro, meta)
+        return meta
+
+    def get_by_fecha(self, db: Session, fecha: date) -> Optional[MaestroMetasResponse]:
+        """Obtiene la meta vigente para una fecha, consultando la BD solo si no está en caché."""
+        encontrado, meta = self._by_fecha.lookup(fecha)
+        if encontrado:
+            return meta
+
+        db_obj = crud.maestro_metas.get_by_fecha(db, fecha=fecha)
+        meta = MaestroMetasResponse.model_validate(db_obj) if db_obj else None
+        self._by_fecha.set(fecha, meta)
+        if meta:
+            self._by_id.set(meta.id_maestro, meta)
+        return meta
+
+    def invalidate(self) -> None:
+        """Vacía la caché completa (se llama al crear, editar o eliminar metas)."""
+        self._by_id.clear()
+        self._by_fecha.clear()
+
+
+maestro_metas_cache = MaestroMetasCache(ttl_seconds=settings.METAS_CACHE_TTL_SECONDS)
@@ -0,0 +1,363 @@
+import logging
+import re
+from contextlib import nullcontext
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from app import crud, models
+from app.core.config import settings
+from app.models.enums import CategoriaClienteEnum
+from app.services.common.nombres import IndiceNombres
+from app.services.sales.cartera_lectores import Origen, abrir_libro
+
+logger = logging.getLogger(__name__)
+
+# Hojas del libro que no son carteras de un vendedor
+HOJAS_EXCLUIDAS = ("calendarizaci", "edutec")
+
+# Bloques de contacto de la cartera, en el orden de las columnas del Excel/CSV: columna con el nombre
+# que abre el bloque ('Nombre del contacto', 'Gerente General', 'Logístico/TI'), seguida de su celular
+# y su correo ('Celular 2', 'Correo electrónico 2'...). Sufijo de las columnas de cartera_clientes.
+CONTACTOS = (
+    ("contacto", ('nombre', 'contacto')),
+    ("gerente", ('gerente',)),
+    ("logistico", ('logístic', 'logistic')),
+)
+
+# Conteos que se acumulan por bloque, por hoja y en el resumen
+CONTEOS = ("filas_procesadas", "registros_insertados", "registros_actualizados", "registros_omitidos_o_duplicados")
+
+# Palabras clave por categoría, en orden de prioridad (la primera que coincide gana)
+CATEGORIAS = (
+    (CategoriaClienteEnum.GOBIERNO.value, ('GOBIERNO', 'ESTADO', 'PUBLICO', 'MUNICIPALIDAD', 'MINISTERIO', 'UGEL')),
+    # Empresas grandes, B2B
+    (CategoriaClienteEnum.CORPORATIVO.value, ('CORPORATIVO', 'EMPRESA', 'PRIVADO', 'INDUSTRIA', 'B2B')),
+    # Comercio, B2C
+    (CategoriaClienteEnum.RETAIL.value, ('RETAIL', 'MINORISTA', 'TIENDA', 'COMERCIO', 'B2C')),
+)
+
+
+def limpiar_columna(serie: pd.Series) -> pd.Series:
+    """
+    Versión vectorizada de "limpiar dato": texto sin espacios en los extremos y
+    <NA> para nulos, celdas vacías y el texto 'nan'.
+    """
+    texto = serie.astype("string")
+    limpio = texto.str.strip()
+    return limpio.mask((limpio == "") | (texto.str.lower() == "nan"))
+
+
+def mapear_categorias(serie: pd.Series) -> pd.Series:
+    """Convierte la columna de categoría del Excel a los valores del Enum (<NA> si no se reconoce)."""
+    texto = limpiar_columna(serie).str.upper()
+    condiciones = [
+        texto.str.contains("|".join(map(re.escape, claves)), regex=True).fillna(False).to_numpy(dtype=bool)
+        for _, claves in CATEGORIAS
+    ]
+    valores = np.select(condiciones, [valor for valor, _ in CATEGORIAS], default=None)
+    return pd.Series(valores, index=serie.index, dtype="string")
+
+
+def _sumar_conteo(destino: Dict[str, Any], conteo: Dict[str, int]) -> None:
+    for clave in CONTEOS:
+        destino[clave] += conteo[clave]
+
+
+def _buscar_columna(columnas: Iterable[str], claves: Iterable[str], *, todas: bool = False) -> Optional[str]:
+    """Primera columna cuyo nombre contiene alguna (o todas, con `todas`) de las claves."""
+    claves = tuple(claves)
+    for col in columnas:
+        coincide = all(x in col for x in claves) if todas else any(x in col for x in claves)
+        if coincide:
+            return col
+    return None
+
+
+class CarteraImportService:
+
+    @staticmethod
+    def importar_libro(
+        db: Session,
+        origen: Origen,
+        *,
+        actualizar_existentes: bool = False,
+        id_empleado: Optional[int] = None,
+        tamano_bloque: Optional[int] = None,
+        columnas_extendidas: bool = False,
+        al_terminar_hoja: Optional[Callable[[Dict[str, Any]], None]] = None,
+        al_terminar_bloque: Optional[Callable[[Dict[str, Any]], None]] = None,
+        al_avanzar: Optional[Callable[[], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Importa un libro .xlsx o .csv: cada hoja es la cartera de un vendedor (por el nombre de la hoja,
+        salvo que se indique `id_empleado` para todas).
+        El libro se lee en streaming: hoja por hoja y, dentro de cada hoja, por bloques de filas
+        (la memoria no depende del tamaño del archivo). Cada hoja se guarda en su
+        propio SAVEPOINT: si una hoja falla se anota en `errores` y las demás se importan igual.
+        Si el nombre de una hoja coincide con varios empleados, la hoja se importa sin asignar y
+        los candidatos se reportan en `coincidencias_ambiguas`.
+        Con `columnas_extendidas` (importador de línea de comandos) también se importan los bloques de
+        contacto, gerente y logístico, y las observaciones e interacciones del archivo (ver `_resolver_columnas`).
+        `al_terminar_hoja(resumen)` se llama tras cada hoja (por ejemplo, para publicar el avance y
+        hacer commit). Con `al_terminar_bloque(resumen)` (commit por lotes de `tamano_bloque` filas)
+        las hojas no van en SAVEPOINT: si una falla se conservan sus bloques ya confirmados y solo se
+        descarta el bloque en curso. `al_avanzar()` se llama tras cada bloque guardado, en ambos modos
+        (por ejemplo, para un latido: no debe usar `db`). Sin callbacks no hace commit. Retorna el resumen final.
+        """
+        # Índice de empleados para vinculación automática por nombre de hoja (se normaliza una vez por importación)
+        empleados = db.query(
+            models.empleado.Empleado.id_empleado, models.empleado.Empleado.nombre_completo
+        ).filter(models.empleado.Empleado.activo == True).all()
+        indice_empleados = IndiceNombres(empleados)
+
+        por_bloque = al_terminar_bloque is not None
+        rucs_vistos: Set[str] = set()
+        with abrir_libro(origen) as libro:
+            # Saltamos hojas que no son carteras
+            hojas = [h for h in libro.hojas if not any(x in h.lower() for x in HOJAS_EXCLUIDAS)]
+            resumen = {
+                "hojas_total": len(hojas),
+                "hojas_procesadas": 0,
+                "hojas_leidas": [],
+                "filas_procesadas": 0,
+                "registros_insertados": 0,
+                "registros_actualizados": 0,
+                "registros_omitidos_o_duplicados": 0,
+                "errores": [],
+                "coincidencias_ambiguas": [],
+            }
+
+            for nombre_hoja in hojas:
+                # --- Busqueda de empleado por nombre de hoja ---
+                # Sin la numeración: '6. Alfonso Ruiz' -> 'Alfonso Ruiz'
+                busqueda = indice_empleados.buscar(re.sub(r'^\d+\.\s*', '', nombre_hoja))
+                id_empleado_hoja = id_empleado or busqueda.id
+                if not id_empleado and busqueda.ambigua:
+                    # Varios vendedores posibles: la hoja se importa sin asignar y se reporta
+                    resumen["coincidencias_ambiguas"].append({
+                        "hoja": nombre_hoja,
+                        "candidatos": [
+                            {"id_empleado": c.id, "nombre_completo": c.nombre, "puntaje": c.puntaje, "tipo": c.tipo}
+                            for c in busqueda.coincidencias
+                        ],
+                    })
+
+                # RUC de esta hoja: pasan a `rucs_vistos` solo si la hoja se guarda
+                # (con commit por bloque, en cuanto se confirma cada bloque)
+                rucs_hoja = rucs_vistos if por_bloque else set(rucs_vistos)
+                conteo_hoja = dict.fromkeys(CONTEOS, 0)
+                try:
+                    with nullcontext() if por_bloque else db.begin_nested():
+                        for conteo in CarteraImportService._importar_hoja(
+                            db,
+                            libro.filas(nombre_hoja),
+                            nombre_hoja=nombre_hoja,
+                            id_empleado=id_empleado_hoja,
+                            rucs_vistos=rucs_hoja,
+                            actualizar_existentes=actualizar_existentes,
+                            tamano_bloque=tamano_bloque or settings.CARTERA_IMPORT_CHUNK_ROWS,
+                            columnas_extendidas=columnas_extendidas
+                        ):
+                            if por_bloque:
+                                _sumar_conteo(resumen, conteo)
+                                al_terminar_bloque(resumen)
+                            else:
+                                _sumar_conteo(conteo_hoja, conteo)
+                            if al_avanzar:
+                                al_avanzar()
+                except Exception as e:
+                    if por_bloque:
+                        db.rollback()
+                    logger.error(f"Error importando la hoja '{nombre_hoja}': {e}")
+                    resumen["errores"].append(f"{nombre_hoja}: {e}")
+                else:
+                    rucs_vistos = rucs_hoja
+                    resumen["hojas_leidas"].append(
+                        f"{nombre_hoja} (Asignado a ID: {id_empleado_hoja})" if id_empleado_hoja else nombre_hoja
+                    )
+                    _sumar_conteo(resumen, conteo_hoja)
+
+                resumen["hojas_procesadas"] += 1
+                if al_terminar_hoja:
+                    al_terminar_hoja(resumen)
+
+        return resumen
+
+    @staticmethod
+    def _importar_hoja(
+        db: Session,
+        filas: Iterator[Tuple[Any, ...]],
+        *,
+        nombre_hoja: str,
+        id_empleado: Optional[int],
+        rucs_vistos: Set[str],
+        actualizar_existentes: bool,
+        tamano_bloque: int,
+        columnas_extendidas: bool = False
+    ) -> Iterator[Dict[str, int]]:
+        """
+        Importa una hoja por bloques de `tamano_bloque` filas: lee un bloque, lo limpia y lo guarda
+        con `bulk_upsert` antes de leer el siguiente (memoria constante).
+        No hace commit. Genera los conteos de cada bloque ya guardado.
+        """
+        columnas, pendientes = CarteraImportService._leer_encabezado(filas)
+        posiciones = CarteraImportService._resolver_columnas(columnas, extendidas=columnas_extendidas)
+        if posiciones is None:
+            return
+
+        # Primero las filas leídas al buscar el encabezado (en bloques del mismo tamaño),
+        # luego el resto de la hoja bloque a bloque
+        pendientes = iter(pendientes)
+        siguiente_bloque = lambda: list(islice(chain(pendientes, filas), tamano_bloque))
+        for bloque in iter(siguiente_bloque, []):
+            lote, omitidas = CarteraImportService.procesar_bloque(
+                bloque, posiciones, nombre_hoja=nombre_hoja, id_empleado=id_empleado, rucs_vistos=rucs_vistos
+            )
+            resultado = crud.cartera.bulk_upsert(
+                db, rows=CarteraImportService.a_registros([lote]), update_existing=actualizar_existentes
+            )
+            rucs_vistos.update(lote["ruc_dni"].dropna())
+            yield {
+                "filas_procesadas": len(bloque),
+                "registros_insertados": resultado["insertados"],
+                "registros_actualizados": resultado["actualizados"],
+                "registros_omitidos_o_duplicados": omitidas + resultado["omitidos"],
+            }
+
+    @staticmethod
+    def _leer_encabezado(filas: Iterator[Tuple[Any, ...]]) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """
+        --- BUSCADOR INTELIGENTE DE ENCABEZADOS ---
+        Busca en las primeras CARTERA_IMPORT_HEADER_SCAN_ROWS filas la primera que menciona
+        'ruc' y 'cliente' (si ninguna, la primera). Retorna (nombres de columna limpios,
+        filas de datos ya leídas después del encabezado).
+        """
+        iniciales = list(islice(filas, settings.CARTERA_IMPORT_HEADER_SCAN_ROWS))
+        if not iniciales:
+            return [], []
+        header_pos = 0
+        for i, fila in enumerate(iniciales):
+            fila_texto = " ".join(str(valor).lower() for valor in fila)
+            if 'ruc' in fila_texto and 'cliente' in fila_texto:
+                header_pos = i
+                break
+
+        # Limpiamos los nombres de las columnas: minúsculas y sin saltos de línea ni espacios dobles
+        # (evita 'Categoría del\ncliente')
+        columnas = [" ".join(str(c).lower().split()) for c in iniciales[header_pos]]
+        return columnas, iniciales[header_pos + 1:]
+
+    @staticmethod
+    def _resolver_columnas(columnas: List[str], *, extendidas: bool = False) -> Optional[Dict[str, Optional[int]]]:
+        """
+        Posición de cada dato en la fila (una vez por hoja). Si un nombre de columna se repite vale
+        su primera aparición ('celular' y 'correo electrónico' quedan como las del contacto principal).
+        Con `extendidas`, el celular y el correo de cada contacto son los primeros que aparecen
+        dentro de su bloque (ver CONTACTOS), sin columna 'Nombre del contacto' el bloque del
+        contacto principal empieza en la primera columna, y se ubican las observaciones e interacciones.
+        None si la hoja no tiene columna de nombre del cliente.
+        """
+        primeras = list(dict.fromkeys(columnas))
+        nombre_col = _buscar_columna(primeras, ('nombre', 'cliente'), todas=True)
+        if not nombre_col:
+            return None
+        nombres = {
+            "nombre": nombre_col,
+            "ruc": _buscar_columna(primeras, ('ruc',)),
+            "categoria": _buscar_columna(primeras, ('categor', 'sector', 'clasifica', 'tipo', 'rubro')),
+            "direccion": _buscar_columna(primeras, ('direcci', 'domicilio', 'ubicaci', 'calle', 'av.')),
+            "observaciones": _buscar_columna(primeras, ('observaci',)) if extendidas else None,
+            "interaccion": _buscar_columna(primeras, ('interacci',)) if extendidas else None,
+        }
+        posiciones = {dato: (columnas.index(col) if col else None) for dato, col in nombres.items()}
+
+        if not extendidas:
+            posiciones.update({
+                f"{dato}_{contacto}": None for contacto, _ in CONTACTOS for dato in ("nombre", "celular", "email")
+            })
+            posiciones["celular_contacto"] = columnas.index('celular') if 'celular' in primeras else None
+            posiciones["email_contacto"] = columnas.index('correo electrónico') if 'correo electrónico' in primeras else None
+            return posiciones
+
+        inicios = {}
+        for contacto, claves in CONTACTOS:
+            col = _buscar_columna(primeras, claves, todas=contacto == "contacto")
+            inicios[contacto] = columnas.index(col) if col else None
+        for contacto, inicio in inicios.items():
+            posiciones[f"nombre_{contacto}"] = inicio
+            if inicio is None and contacto != "contacto":
+                posiciones[f"celular_{contacto}"] = posiciones[f"email_{contacto}"] = None
+                continue
+            inicio = inicio or 0
+            fin = min((i for i in inicios.values() if i is not None and i > inicio), default=len(columnas))
+            bloque = range(inicio, fin)
+            posiciones[f"celular_{contacto}"] = next((i for i in bloque if 'celular' in columnas[i]), None)
+            posiciones[f"email_{contacto}"] = next(
+                (i for i in bloque if 'correo' in columnas[i] or 'email' in columnas[i]), None
+            )
+        return posiciones
+
+    @staticmethod
+    def procesar_bloque(
+        filas: List[Tuple[Any, ...]],
+        posiciones: Dict[str, Optional[int]],
+        *,
+        nombre_hoja: str,
+        id_empleado: Optional[int],
+        rucs_vistos: Set[str]
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Convierte un bloque de filas de datos en las filas a importar; la limpieza se aplica a columnas completas.
+        `rucs_vistos` son los RUC ya importados (bloques y hojas anteriores): un RUC repetido vale solo la primera vez.
+        Retorna (filas con las columnas de importación, filas omitidas).
+        """
+        # dtype=object: los valores quedan tal como vienen del Excel (sin convertir enteros a decimales)
+        df = pd.DataFrame(filas, dtype=object)
+
+        def columna(dato: str) -> pd.Series:
+            pos = posiciones[dato]
+            if pos is not None and pos in df.columns:
+                return limpiar_columna(df[pos])
+            return pd.Series(pd.NA, index=df.index, dtype="string")
+
+        nombre = columna("nombre")
+        # Pandas a veces lee los RUCs como decimales (Ej: 20123.0)
+        ruc = columna("ruc").str.replace(r'\.0$', '', regex=True)
+
+        # Sin nombre no hay cliente; RUC repetido (en el bloque o antes): vale la primera fila
+        con_nombre = nombre.notna()
+        repetido = ruc.notna() & con_nombre & (ruc.where(con_nombre).duplicated(keep='first') | ruc.isin(rucs_vistos))
+        validas = con_nombre & ~repetido
+
+        # Observaciones e interacciones del archivo en un solo campo, más la hoja de origen
+        observaciones = pd.Series(f"Importado de la hoja: {nombre_hoja}", index=df.index, dtype="string")
+        for dato in ("interaccion", "observaciones"):
+            texto = columna(dato)
+            observaciones = (texto + " | " + observaciones).where(texto.notna(), observaciones)
+
+        categoria = posiciones["categoria"]
+        filas_importar = pd.DataFrame({
+            "nombre_cliente": nombre,
+            "ruc_dni": ruc,
+            "id_empleado": id_empleado,
+            "categoria": mapear_categorias(df[categoria]) if categoria in df.columns else pd.NA,
+            "direccion": columna("direccion"),
+            **{
+                f"{dato}_{contacto}": columna(f"{dato}_{contacto}")
+                for contacto, _ in CONTACTOS
+                for dato in ("nombre", "celular", "email")
+            },
+            "observaciones": observaciones,
+        })[validas]
+        return filas_importar, int((~validas).sum())
+
+    @staticmethod
+    def a_registros(lotes: List[pd.DataFrame]) -> List[Dict[str, Any]]:
+        """Une las hojas procesadas en dicts para `crud.cartera.bulk_upsert` (<NA> -> None)."""
+        lotes = [lote for lote in lotes if not lote.empty]
+        if not lotes:
+            return []
+        filas = pd.concat(lotes, ignore_index=True).astype(object)
+        return filas.where(filas.notna(), None).to_dict("records")
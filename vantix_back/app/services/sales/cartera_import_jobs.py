@@ -0,0 +1,247 @@
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+from uuid import uuid4
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.enums import EstadoImportacionEnum
+from app.models.importacion import TrabajoImportacion
+from app.services.sales.cartera_import import CarteraImportService
+
+logger = logging.getLogger(__name__)
+
+# El archivo recibido se copia por bloques (nunca entero en memoria)
+CHUNK_SIZE = 1024 * 1024
+
+
+class CarteraImportJobService:
+    """
+    Importación masiva de cartera en segundo plano.
+
+    El request solo guarda el archivo en CARTERA_IMPORT_DIR y crea un `TrabajoImportacion`
+    (responde al instante con su id). Un hilo del worker toma los trabajos pendientes con
+    `FOR UPDATE SKIP LOCKED` (con varios workers cada trabajo se procesa una sola vez),
+    importa el libro hoja por hoja y confirma el avance tras cada hoja. Tras cada bloque de filas
+    renueva `fecha_actualizacion` (latido): una hoja larga no se reencola mientras sigue avanzando.
+    Reenviar el mismo archivo mientras su trabajo sigue en curso devuelve ese mismo trabajo.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def crear_trabajo(
+        self,
+        db: Session,
+        *,
+        archivo: UploadFile,
+        actualizar_existentes: bool,
+        id_empleado: Optional[int]
+    ) -> TrabajoImportacion:
+        """Guarda el archivo recibido y encola su importación (hace commit)."""
+        carpeta = Path(settings.CARTERA_IMPORT_DIR)
+        carpeta.mkdir(parents=True, exist_ok=True)
+        ruta = carpeta / f"{uuid4()}{Path(archivo.filename).suffix.lower()}"
+        sha256 = self._guardar(archivo, ruta)
+
+        trabajo = crud.trabajo_importacion.get_en_curso_by_hash(
+            db, sha256=sha256, actualizar_existentes=actualizar_existentes
+        )
+        if trabajo:
+            ruta.unlink(missing_ok=True)
+            return trabajo
+
+        trabajo = TrabajoImportacion(
+            id_empleado=id_empleado,
+            nombre_archivo=archivo.filename,
+            ruta_archivo=str(ruta),
+            sha256=sha256,
+            actualizar_existentes=actualizar_existentes,
+            estado=EstadoImportacionEnum.PENDIENTE,
+            hojas_procesadas=0,
+            filas_procesadas=0,
+            registros_insertados=0,
+            registros_actualizados=0,
+            registros_omitidos=0,
+            hojas_leidas=[],
+            errores=[],
+            coincidencias_ambiguas=[]
+        )
+        db.add(trabajo)
+        try:
+            db.commit()
+        except Exception:
+            db.rollback()
+            ruta.unlink(missing_ok=True)
+            raise
+        db.refresh(trabajo)
+
+        # El worker de este proceso lo toma de inmediato (los demás, en su siguiente consulta)
+        self._wake.set()
+        return trabajo
+
+    def process_next(self, db: Session) -> bool:
+        """Procesa el siguiente trabajo pendiente. Retorna False si no había nada que procesar."""
+        trabajo = (
+            db.query(TrabajoImportacion)
+            .filter(TrabajoImportacion.estado == EstadoImportacionEnum.PENDIENTE)
+            .order_by(TrabajoImportacion.fecha_creacion, TrabajoImportacion.id_trabajo)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if not trabajo:
+            db.rollback()
+            return False
+
+        ahora = datetime.now(timezone.utc)
+        trabajo.estado = EstadoImportacionEnum.PROCESANDO
+        trabajo.fecha_inicio = ahora
+        trabajo.fecha_actualizacion = ahora
+        trabajo.fecha_fin = None
+        self._publicar_avance(trabajo, {})
+        db.commit()
+
+        def al_terminar_hoja(resumen: Dict[str, Any]) -> None:
+            self._publicar_avance(trabajo, resumen)
+            trabajo.fecha_actualizacion = datetime.now(timezone.utc)
+            db.commit()
+
+        id_trabajo = trabajo.id_trabajo
+
+        def al_avanzar() -> None:
+            self._latido(id_trabajo)
+
+        try:
+            CarteraImportService.importar_libro(
+                db,
+                trabajo.ruta_archivo,
+                actualizar_existentes=trabajo.actualizar_existentes,
+                al_terminar_hoja=al_terminar_hoja,
+                al_avanzar=al_avanzar
+            )
+            trabajo.estado = EstadoImportacionEnum.COMPLETADO
+        except Exception as e:
+            # Error con el libro completo (archivo corrupto, no es Excel...): lo ya confirmado se conserva
+            db.rollback()
+            logger.error(f"Error en la importación {trabajo.id_trabajo}: {e}")
+            trabajo.estado = EstadoImportacionEnum.FALLIDO
+            trabajo.errores = [*(trabajo.errores or []), f"Error procesando el archivo: {e}"]
+
+        trabajo.fecha_fin = datetime.now(timezone.utc)
+        trabajo.fecha_actualizacion = trabajo.fecha_fin
+        db.commit()
+        Path(trabajo.ruta_archivo).unlink(missing_ok=True)
+        return True
+
+    def requeue_stale(self, db: Session) -> int:
+        """Vuelve a encolar los trabajos de un worker que se cayó a mitad (sin avance en CARTERA_IMPORT_STALE_MINUTES)."""
+        limite = datetime.now(timezone.utc) - timedelta(minutes=settings.CARTERA_IMPORT_STALE_MINUTES)
+        reencolados = db.query(TrabajoImportacion).filter(
+            TrabajoImportacion.estado == EstadoImportacionEnum.PROCESANDO,
+            TrabajoImportacion.fecha_actualizacion < limite
+        ).update({TrabajoImportacion.estado: EstadoImportacionEnum.PENDIENTE}, synchronize_session=False)
+        db.commit()
+        return reencolados
+
+    def start(self) -> None:
+        """Inicia el hilo del worker."""
+        if not settings.CARTERA_IMPORT_WORKER_ENABLED:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cartera-import", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            processed = False
+            db = SessionLocal()
+            try:
+                self.requeue_stale(db)
+                processed = self.process_next(db)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error procesando las importaciones de cartera: {e}")
+            finally:
+                db.close()
+            # Sin trabajos (o tras un error), esperar a que llegue uno nuevo o a la siguiente consulta
+            if not processed:
+                self._wake.wait(settings.CARTERA_IMPORT_POLL_SECONDS)
+
+    @staticmethod
+    def _guardar(archivo: UploadFile, ruta: Path) -> str:
+        """Copia el archivo recibido a disco por bloques, con límite de tamaño. Retorna su SHA-256."""
+        max_bytes = settings.CARTERA_IMPORT_MAX_FILE_SIZE_MB * 1024 * 1024
+        digest = hashlib.sha256()
+        size = 0
+        archivo.file.seek(0)
+        try:
+            with open(ruta, "wb") as buffer:
+                while True:
+                    chunk = archivo.file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"El archivo supera el tamaño máximo permitido ({settings.CARTERA_IMPORT_MAX_FILE_SIZE_MB} MB)"
+                        )
+                    digest.update(chunk)
+                    buffer.write(chunk)
+        except Exception:
+            # No dejar archivos a medias
+            ruta.unlink(missing_ok=True)
+            raise
+        return digest.hexdigest()
+
+    @staticmethod
+    def _latido(id_trabajo: int) -> None:
+        """
+        Renueva `fecha_actualizacion` en una sesión aparte: la hoja en curso sigue en su SAVEPOINT
+        sin confirmar y no se puede hacer commit de la sesión del trabajo a mitad de hoja.
+        """
+        db = SessionLocal()
+        try:
+            db.query(TrabajoImportacion).filter(TrabajoImportacion.id_trabajo == id_trabajo).update(
+                {TrabajoImportacion.fecha_actualizacion: datetime.now(timezone.utc)}, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            # Un latido perdido no detiene la importación
+            db.rollback()
+            logger.warning(f"No se pudo renovar el latido de la importación {id_trabajo}: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _publicar_avance(trabajo: TrabajoImportacion, resumen: Dict[str, Any]) -> None:
+        trabajo.hojas_total = resumen.get("hojas_total")
+        trabajo.hojas_procesadas = resumen.get("hojas_procesadas", 0)
+        trabajo.filas_procesadas = resumen.get("filas_procesadas", 0)
+        trabajo.registros_insertados = resumen.get("registros_insertados", 0)
+        trabajo.registros_actualizados = resumen.get("registros_actualizados", 0)
+        trabajo.registros_omitidos = resumen.get("registros_omitidos_o_duplicados", 0)
+        # Listas nuevas: la columna JSONB solo se marca como modificada si cambia el objeto
+        trabajo.hojas_leidas = list(resumen.get("hojas_leidas", []))
+        trabajo.errores = list(resumen.get("errores", []))
+        trabajo.coincidencias_ambiguas = list(resumen.get("coincidencias_ambiguas", []))
+
+
+cartera_import_jobs = CarteraImportJobService()
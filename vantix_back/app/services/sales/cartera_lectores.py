@@ -0,0 +1,134 @@
+import csv
+import io
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple, Union
+import pandas as pd
+from openpyxl import load_workbook
+
+Origen = Union[str, Path, BinaryIO]
+
+# Los .xlsx son archivos zip; cualquier otro formato (.xls) se lee con pandas
+FIRMA_ZIP = b"PK\x03\x04"
+
+# Separadores que se prueban al detectar el formato de un CSV (Excel en español exporta con ';')
+SEPARADORES_CSV = ",;\t|"
+
+
+def _nombre_archivo(origen: Origen) -> Optional[str]:
+    nombre = origen if isinstance(origen, (str, Path)) else getattr(origen, "name", None)
+    return str(nombre) if isinstance(nombre, (str, Path)) else None
+
+
+def _tiene_datos(fila: Tuple[Any, ...]) -> bool:
+    # Filas totalmente vacías (formato sin datos) no cuentan
+    return any(valor is not None and valor != "" for valor in fila)
+
+
+class LectorLibro(ABC):
+    """Lee un libro hoja por hoja, entregando las filas como tuplas de valores (sin encabezado)."""
+
+    @property
+    @abstractmethod
+    def hojas(self) -> List[str]:
+        """Nombres de las hojas, en el orden del libro."""
+
+    @abstractmethod
+    def filas(self, hoja: str) -> Iterator[Tuple[Any, ...]]:
+        """Filas de la hoja que tienen algún dato, a medida que se piden."""
+
+    def close(self) -> None:
+        self._libro.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LectorXlsx(LectorLibro):
+    """
+    Lector en streaming de .xlsx (openpyxl en modo solo lectura): las filas se leen del XML
+    a medida que se piden, así que la memoria no crece con el tamaño de la hoja.
+    """
+
+    def __init__(self, origen: Origen):
+        self._libro = load_workbook(origen, read_only=True, data_only=True, keep_links=False)
+
+    @property
+    def hojas(self) -> List[str]:
+        return self._libro.sheetnames
+
+    def filas(self, hoja: str) -> Iterator[Tuple[Any, ...]]:
+        for fila in self._libro[hoja].iter_rows(values_only=True):
+            if _tiene_datos(fila):
+                yield fila
+
+
+class LectorPandas(LectorLibro):
+    """Respaldo para formatos sin lectura en streaming (.xls): carga una hoja a la vez con pandas."""
+
+    def __init__(self, origen: Origen):
+        self._libro = pd.ExcelFile(origen)
+
+    @property
+    def hojas(self) -> List[str]:
+        return self._libro.sheet_names
+
+    def filas(self, hoja: str) -> Iterator[Tuple[Any, ...]]:
+        df = self._libro.parse(hoja, header=None, dtype=object)
+        for fila in df.itertuples(index=False, name=None):
+            fila = tuple(None if pd.isna(valor) else valor for valor in fila)
+            if _tiene_datos(fila):
+                yield fila
+
+
+class LectorCsv(LectorLibro):
+    """
+    Un CSV es un libro de una sola hoja, leída en streaming con el módulo csv.
+    La hoja toma el nombre del archivo; en las exportaciones de Google Sheets
+    ('Libro - 4. Jose Leonardo.csv') solo la parte después del último ' - '.
+    """
+
+    def __init__(self, origen: Origen, *, encoding: str = "utf-8-sig"):
+        if isinstance(origen, (str, Path)):
+            self._libro = open(origen, "r", encoding=encoding, newline="")
+        else:
+            self._libro = io.TextIOWrapper(origen, encoding=encoding, newline="")
+        self._nombre = Path(_nombre_archivo(origen) or "CSV").stem.rsplit(" - ", 1)[-1].strip()
+
+    @property
+    def hojas(self) -> List[str]:
+        return [self._nombre]
+
+    def filas(self, hoja: str) -> Iterator[Tuple[Any, ...]]:
+        muestra = self._libro.read(64 * 1024)
+        self._libro.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=SEPARADORES_CSV)
+        except csv.Error:
+            dialecto = csv.excel
+        for fila in csv.reader(self._libro, dialecto):
+            fila = tuple(fila)
+            if _tiene_datos(fila):
+                yield fila
+
+
+def _es_csv(origen: Origen) -> bool:
+    nombre = _nombre_archivo(origen)
+    return bool(nombre) and Path(nombre).suffix.lower() == ".csv"
+
+
+def abrir_libro(origen: Origen) -> LectorLibro:
+    """Abre el libro con el lector en streaming si es .xlsx o .csv (o con pandas si no lo es)."""
+    if _es_csv(origen):
+        return LectorCsv(origen)
+    if isinstance(origen, (str, Path)):
+        with open(origen, "rb") as f:
+            firma = f.read(len(FIRMA_ZIP))
+    else:
+        posicion = origen.tell()
+        firma = origen.read(len(FIRMA_ZIP))
+        origen.seek(posicion)
+    return LectorXlsx(origen) if firma == FIRMA_ZIP else LectorPandas(origen)
@@ -3,18 +3,16 @@ from datetime import date
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.models.plan import PlanTrabajoSemanal, DetallePlanTrabajo
-from app.models.kpi import InformeProductividad, MaestroMetas
+from app.models.kpi import InformeProductividad
 from app.models.enums import TipoActividadEnum
 from app.schemas.plan import PlanCreate
+from app.services.gamificacion.metas_cache import maestro_metas_cache
 
 class PlanValidatorService:
     @staticmethod
     def create_weekly_plan(db: Session, plan_in: PlanCreate, id_empleado: int) -> PlanTrabajoSemanal:
         # 1. VALIDACIÓN: Buscar el maestro de metas configurado para esta semana específica
-        maestro_activo = db.query(MaestroMetas).filter(
-            MaestroMetas.fecha_inicio_semana <= plan_in.fecha_inicio_semana,
-            MaestroMetas.fecha_fin_semana >= plan_in.fecha_inicio_semana
-        ).first()
+        maestro_activo = maestro_metas_cache.get_by_fecha(db, plan_in.fecha_inicio_semana)
         
         # Si no se encuentra uno exacto, usamos el último creado como "comodín" o histórico (opcional), 
         # pero según lo solicitado, alertaremos que se debe crear la meta:
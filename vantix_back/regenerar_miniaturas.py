@@ -0,0 +1,84 @@
+"""
+Genera las miniaturas que faltan para las fotos ya almacenadas (hosting y static/uploads).
+
+Uso:
+    python regenerar_miniaturas.py              # solo las fotos sin miniatura
+    python regenerar_miniaturas.py --force      # vuelve a generar todas
+    python regenerar_miniaturas.py --solo-local # no toca el hosting
+"""
+import argparse
+import os
+import posixpath
+from pathlib import Path
+from app.services.common.file_manager import BASE_UPLOAD_DIR
+from app.services.common.image_processor import SUPPORTED_FORMATS, image_processor
+from app.services.external.remote_storage import RemoteStorageService, THUMBNAIL_DIR
+
+
+def es_foto(nombre: str) -> bool:
+    return os.path.splitext(nombre)[1].lower() in SUPPORTED_FORMATS
+
+
+def regenerar_remotas(force: bool) -> int:
+    """Recorre Empleado/Actividad en el hosting y sube las miniaturas que falten."""
+    generadas = 0
+    # Las carpetas de empleado y actividad están normalizadas (sin puntos); los archivos sí tienen extensión
+    for empleado in [e for e in RemoteStorageService.list_folder() if "." not in e]:
+        for actividad in [a for a in RemoteStorageService.list_folder(empleado) if "." not in a]:
+            carpeta = f"{empleado}/{actividad}"
+            existentes = set() if force else set(RemoteStorageService.list_folder(f"{carpeta}/{THUMBNAIL_DIR}"))
+            for nombre in RemoteStorageService.list_folder(carpeta):
+                if not es_foto(nombre) or nombre in existentes:
+                    continue
+                try:
+                    original = RemoteStorageService.download_file(posixpath.join(carpeta, nombre))
+                    miniatura = image_processor.make_thumbnail(original, os.path.splitext(nombre)[1])
+                except Exception as e:
+                    print(f"  [!] {carpeta}/{nombre}: {e}")
+                    continue
+                if RemoteStorageService.upload_fileobj(miniatura, f"{THUMBNAIL_DIR}/{nombre}", empleado, actividad):
+                    generadas += 1
+                    print(f"  {carpeta}/{nombre}")
+    return generadas
+
+
+def regenerar_locales(force: bool) -> int:
+    """Genera las miniaturas de las fotos guardadas en static/uploads (fallback o pendientes de subir)."""
+    generadas = 0
+    if not BASE_UPLOAD_DIR.exists():
+        return 0
+    for ruta in BASE_UPLOAD_DIR.rglob("*"):
+        if not ruta.is_file() or not es_foto(ruta.name) or ruta.parent.name == THUMBNAIL_DIR:
+            continue
+        destino = ruta.parent / THUMBNAIL_DIR / ruta.name
+        if destino.exists() and not force:
+            continue
+        try:
+            with open(ruta, "rb") as original:
+                miniatura = image_processor.make_thumbnail(original, ruta.suffix)
+        except Exception as e:
+            print(f"  [!] {ruta}: {e}")
+            continue
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        Path(destino).write_bytes(miniatura.getvalue())
+        generadas += 1
+        print(f"  {ruta}")
+    return generadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenera las miniaturas de las fotos de evidencia.")
+    parser.add_argument("--force", action="store_true", help="Regenerar también las miniaturas existentes")
+    parser.add_argument("--solo-local", action="store_true", help="Procesar solo static/uploads")
+    args = parser.parse_args()
+
+    print("Miniaturas locales...")
+    total = regenerar_locales(args.force)
+    if not args.solo_local and RemoteStorageService.is_configured():
+        print("Miniaturas en el hosting...")
+        total += regenerar_remotas(args.force)
+    print(f"Miniaturas generadas: {total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+
+# Configuración mínima para importar `app` sin .env (las pruebas usan SQLite en memoria, no estos servidores)
+for variable, valor in {
+    "PROJECT_NAME": "Vantix", "POSTGRES_SERVER": "localhost", "POSTGRES_USER": "test", "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test", "EXTERNAL_DB_HOST": "localhost", "EXTERNAL_DB_PORT": "5432", "EXTERNAL_DB_USER": "test",
+    "EXTERNAL_DB_PASSWORD": "test", "EXTERNAL_DB_NAME": "test", "SECRET_KEY": "test", "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30", "REMOTE_STORAGE_BASE_PATH": "uploads", "REMOTE_STORAGE_BASE_URL": "http://localhost",
+}.items():
+    os.environ.setdefault(variable, valor)
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+import app.models  # noqa: F401  (registra todas las tablas en Base.metadata)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_en_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def db():
+    """Sesión sobre una base SQLite en memoria con todas las tablas creadas."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def contar_consultas(db):
+    """Lista donde se anota cada sentencia SQL que ejecuta `db` (vaciarla antes de medir)."""
+    consultas = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: consultas.append(args[2]))
+    return consultas
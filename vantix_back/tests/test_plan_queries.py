@@ -0,0 +1,78 @@
+from datetime import date, time
+
+from app import crud
+from app.models.clientes import CarteraClientes
+from app.models.empleado import Empleado
+from app.models.enums import TipoActividadEnum
+from app.models.geo import Departamento, Distrito, Provincia
+from app.models.kpi import InformeProductividad, MaestroMetas
+from app.models.plan import DetallePlanTrabajo, PlanTrabajoSemanal
+from app.schemas.plan import PlanResponse
+
+
+def _crear_planes(db, cantidad: int) -> None:
+    """Agrega planes de un mismo empleado, cada uno con agenda (clientes distintos, con distrito) e informe KPI."""
+    empleado = db.query(Empleado).first()
+    if empleado is None:
+        departamento = Departamento(nombre="Lima")
+        provincia = Provincia(nombre="Lima", departamento=departamento)
+        db.add_all([
+            Distrito(nombre="Miraflores", ubigeo="150122", provincia=provincia),
+            Empleado(nombre_completo="Vendedor", dni="12345678", email_corporativo="vendedor@vantix.pe"),
+            MaestroMetas(nombre_meta="Semana Estándar"),
+        ])
+        db.flush()
+        empleado = db.query(Empleado).one()
+    distrito = db.query(Distrito).one()
+    maestro = db.query(MaestroMetas).one()
+
+    inicio = db.query(PlanTrabajoSemanal).count()
+    for i in range(inicio, inicio + cantidad):
+        plan = PlanTrabajoSemanal(
+            id_empleado=empleado.id_empleado,
+            fecha_inicio_semana=date(2026, 1, 5),
+            fecha_fin_semana=date(2026, 1, 10),
+        )
+        plan.detalles_agenda = [
+            DetallePlanTrabajo(
+                dia_semana="Lunes",
+                hora_programada=time(9 + j),
+                tipo_actividad=TipoActividadEnum.VISITA,
+                cliente=CarteraClientes(nombre_cliente=f"Cliente {i}-{j}", ruc_dni=f"20{i:05d}{j:04d}", distrito=distrito),
+            )
+            for j in range(3)
+        ]
+        plan.informe_kpi = InformeProductividad(maestro=maestro)
+        db.add(plan)
+    db.commit()
+    db.expunge_all()
+
+
+def _consultas_al_listar(db, contar_consultas) -> int:
+    """Sentencias para listar todos los planes y serializarlos con `PlanResponse`, como /planes."""
+    contar_consultas.clear()
+    planes, _ = crud.plan.get_multi_page(db, limit=100)
+    respuesta = [PlanResponse.model_validate(plan) for plan in planes]
+    assert all(len(p.detalles_agenda) == 3 and p.detalles_agenda[0].cliente.distrito for p in respuesta)
+    assert all(p.informe_kpi and p.informe_kpi.maestro for p in respuesta)
+    db.expunge_all()
+    return len(contar_consultas)
+
+
+def test_listado_de_planes_no_crece_con_la_cantidad_de_planes(db, contar_consultas):
+    _crear_planes(db, 2)
+    pocos = _consultas_al_listar(db, contar_consultas)
+    _crear_planes(db, 10)
+    muchos = _consultas_al_listar(db, contar_consultas)
+    assert db.query(PlanTrabajoSemanal).count() == 12
+    assert muchos == pocos
+
+
+def test_detalle_de_plan_carga_agenda_e_informe_de_una_vez(db, contar_consultas):
+    _crear_planes(db, 1)
+    id_plan = db.query(PlanTrabajoSemanal.id_plan).scalar()
+    contar_consultas.clear()
+    plan = crud.plan.get_detail(db, id=id_plan)
+    PlanResponse.model_validate(plan)
+    # Plan + informe + meta en un JOIN; la agenda con sus clientes y distritos en otro
+    assert len(contar_consultas) == 2
@@ -0,0 +1,171 @@
+import io
+import threading
+
+import boto3
+import pytest
+from moto import mock_aws
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import FTPHandler
+from pyftpdlib.servers import ThreadedFTPServer
+
+from app.core.config import settings
+from app.services.external.remote_storage import RemoteStorageService
+from app.services.external.storage import get_backend, reset_backend
+
+CONTENIDO = b"evidencia de visita " * 1000
+CARPETA = "ana_perez/visita"
+
+
+@pytest.fixture
+def usar_backend(monkeypatch):
+    """Configura REMOTE_STORAGE_BACKEND (más los ajustes dados) y recrea el backend compartido."""
+    def configurar(nombre: str, **ajustes):
+        for clave, valor in {"REMOTE_STORAGE_BACKEND": nombre, **ajustes}.items():
+            monkeypatch.setattr(settings, clave, valor)
+        reset_backend()
+        return get_backend()
+
+    yield configurar
+    reset_backend()
+
+
+@pytest.fixture
+def local(usar_backend, tmp_path):
+    return usar_backend(
+        "local", REMOTE_STORAGE_LOCAL_ROOT=str(tmp_path), REMOTE_STORAGE_LOCAL_BASE_URL="/static/evidencias"
+    )
+
+
+@pytest.fixture
+def s3(usar_backend):
+    """Bucket simulado con moto; la ruta base se usa como prefijo de las claves."""
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="evidencias")
+        yield usar_backend(
+            "s3",
+            REMOTE_STORAGE_S3_BUCKET="evidencias",
+            REMOTE_STORAGE_S3_ENDPOINT_URL=None,
+            REMOTE_STORAGE_S3_REGION="us-east-1",
+            REMOTE_STORAGE_S3_ACCESS_KEY="test",
+            REMOTE_STORAGE_S3_SECRET_KEY="test",
+            REMOTE_STORAGE_S3_MULTIPART_CHUNK_MB=5,  # Mínimo que admite S3 por parte
+            REMOTE_STORAGE_BASE_PATH="vantix",
+            REMOTE_STORAGE_BASE_URL="https://cdn.vantix.pe",
+        )
+
+
+@pytest.fixture
+def ftp(usar_backend, tmp_path):
+    """Servidor FTP local (pyftpdlib) en un puerto libre, con la carpeta temporal como raíz."""
+    autorizador = DummyAuthorizer()
+    autorizador.add_user("vantix", "clave", str(tmp_path), perm="elradfmw")
+    servidor = ThreadedFTPServer(("127.0.0.1", 0), type("Handler", (FTPHandler,), {"authorizer": autorizador}))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        yield usar_backend(
+            "ftp",
+            REMOTE_STORAGE_HOST="127.0.0.1",
+            REMOTE_STORAGE_FTP_PORT=servidor.address[1],
+            REMOTE_STORAGE_USER="vantix",
+            REMOTE_STORAGE_PASSWORD="clave",
+            REMOTE_STORAGE_BASE_PATH="public_html",
+            REMOTE_STORAGE_BASE_URL="https://hosting.vantix.pe",
+        )
+    finally:
+        servidor.close_all()
+
+
+@pytest.fixture(params=["local", "s3", "ftp"])
+def backend(request):
+    return request.getfixturevalue(request.param)
+
+
+def _subir(contenido: bytes = CONTENIDO, nombre: str = "foto.jpg") -> str:
+    return RemoteStorageService.upload_fileobj(io.BytesIO(contenido), nombre, "Ana Pérez", "Visita")
+
+
+# --- Contrato común de StorageBackend ---
+
+def test_sube_descarga_lista_y_borra(backend):
+    assert backend.is_configured()
+    url = _subir()
+    assert url == f"{backend.base_url}/{CARPETA}/foto.jpg"
+    assert RemoteStorageService.owns_url(url)
+    assert RemoteStorageService.download_file(f"{CARPETA}/foto.jpg").read() == CONTENIDO
+
+    # Las carpetas Empleado/Actividad se crean al subir
+    assert RemoteStorageService.list_folder() == ["ana_perez"]
+    assert RemoteStorageService.list_folder("ana_perez") == ["visita"]
+    assert RemoteStorageService.list_folder(CARPETA) == ["foto.jpg"]
+
+    assert RemoteStorageService.delete_file(url)
+    assert RemoteStorageService.list_folder(CARPETA) == []
+
+
+def test_subir_de_nuevo_reemplaza_el_archivo(backend):
+    _subir()
+    _subir(b"otra foto")
+    assert RemoteStorageService.download_file(f"{CARPETA}/foto.jpg").read() == b"otra foto"
+
+
+def test_miniaturas_y_carpetas_inexistentes_no_se_listan(backend):
+    _subir()
+    _subir(nombre="thumbs/foto.jpg")
+    assert RemoteStorageService.list_folder(CARPETA) == ["foto.jpg"]
+    assert RemoteStorageService.list_folder("nadie/visita") == []
+
+
+def test_no_reconoce_urls_de_otro_almacenamiento(backend):
+    for url in ("https://otro.pe/ana_perez/visita/foto.jpg", "/static/uploads/visitas/foto.jpg", ""):
+        assert not RemoteStorageService.owns_url(url)
+        assert not RemoteStorageService.delete_file(url)
+
+
+# --- Particularidades de cada backend ---
+
+def test_local_no_permite_claves_fuera_de_la_raiz(local):
+    with pytest.raises(ValueError):
+        local.upload_fileobj(io.BytesIO(CONTENIDO), "../fuera.jpg")
+
+
+def test_local_sin_carpeta_raiz_no_esta_configurado(usar_backend):
+    assert not usar_backend("local", REMOTE_STORAGE_LOCAL_ROOT="").is_configured()
+    assert RemoteStorageService.upload_fileobj(io.BytesIO(CONTENIDO), "foto.jpg", "Ana", "Visita") is None
+
+
+def test_s3_archivos_grandes_se_suben_en_multipart(s3):
+    grande = bytes(range(256)) * (11 * 1024 * 1024 // 256)  # 11 MB: tres partes de 5 MB
+    url = RemoteStorageService.upload_fileobj(io.BytesIO(grande), "informe.pdf", "Ana Pérez", "Visita")
+    _subir()
+
+    # La URL pública no lleva el prefijo; la clave en el bucket sí
+    assert url == f"https://cdn.vantix.pe/{CARPETA}/informe.pdf"
+    objeto = s3.client.head_object(Bucket="evidencias", Key=f"vantix/{CARPETA}/informe.pdf")
+    assert objeto["ETag"].endswith('-3"')
+    assert objeto["ContentType"] == "application/pdf"
+    pequeno = s3.client.head_object(Bucket="evidencias", Key=f"vantix/{CARPETA}/foto.jpg")
+    assert "-" not in pequeno["ETag"]
+    assert RemoteStorageService.download_file(f"{CARPETA}/informe.pdf").read() == grande
+
+
+def test_ftp_makedirs_solo_crea_los_tramos_que_faltan(ftp, tmp_path, monkeypatch):
+    with ftp.session() as conn:
+        ftp.makedirs(conn, f"{conn.base_dir}/ana_perez")
+        ftp.makedirs(conn, f"{conn.base_dir}/{CARPETA}/thumbs")
+        assert (tmp_path / "public_html" / CARPETA / "thumbs").is_dir()
+
+        # Una carpeta ya creada se recuerda: no cuesta ningún comando más
+        comandos = []
+        monkeypatch.setattr(ftp, "_stat_dir", lambda conn, ruta: comandos.append(("CWD", ruta)))
+        monkeypatch.setattr(ftp, "_mkdir", lambda conn, ruta: comandos.append(("MKD", ruta)))
+        ftp.makedirs(conn, f"{conn.base_dir}/{CARPETA}/thumbs")
+        ftp.makedirs(conn, f"{conn.base_dir}/{CARPETA}")
+        assert comandos == []
+
+
+def test_ftp_error_a_mitad_de_una_transferencia_descarta_la_sesion(ftp):
+    with pytest.raises(RuntimeError):
+        with ftp.session():
+            raise RuntimeError("413 a mitad de la subida")
+    assert ftp.stats()["discarded"] == 1
+    assert _subir() == f"https://hosting.vantix.pe/{CARPETA}/foto.jpg"
@@ -149,13 +149,22 @@ const CarteraList = () => {
 
     try {
       setLoading(true);
-      const formData = new FormData();
-      formData.append('file', file);
-
-      const response = await clienteService.importExcel(formData);
+      const trabajo = await clienteService.importMasivo(file, (avance) => {
+        setImportStatus({
+          type: 'info',
+          message: avance.estado === 'Pendiente'
+            ? 'Importación en cola, esperando a ser procesada...'
+            : `Importando: hoja ${avance.hojas_procesadas} de ${avance.hojas_total ?? '?'}, `
+              + `${avance.filas_procesadas} filas procesadas`
+        });
+      });
       setImportStatus({
-        type: 'success',
-        message: response.message || 'Importación exitosa'
+        type: trabajo.errores?.length ? 'error' : 'success',
+        message: `Importación finalizada: ${trabajo.registros_insertados} nuevos, ${trabajo.registros_actualizados} actualizados, ${trabajo.registros_omitidos} omitidos`
+          + (trabajo.errores?.length ? ` (${trabajo.errores.join(' | ')})` : '')
+          + (trabajo.coincidencias_ambiguas?.length
+            ? `. Hojas sin asignar por nombre ambiguo: ${trabajo.coincidencias_ambiguas.map(c => c.hoja).join(', ')}`
+            : '')
       });
       fetchInitialData();
       if (selectedVendedor) fetchClientes(selectedVendedor.id_empleado);
@@ -248,7 +257,9 @@ const CarteraList = () => {
             exit={{ opacity: 0, y: -20 }}
             className={`status-banner ${importStatus.type}`}
           >
-            {importStatus.type === 'success' ? <CheckCircle size={18} /> : <AlertCircle size={18} />}
+            {importStatus.type === 'success' ? <CheckCircle size={18} />
+              : importStatus.type === 'info' ? <FileSpreadsheet size={18} />
+              : <AlertCircle size={18} />}
             <span>{importStatus.message}</span>
           </motion.div>
         )}
@@ -448,6 +459,7 @@ const CarteraList = () => {
         }
         .status-banner.success { background: #ecfdf5; color: #059669; border: 1px solid #10b981; }
         .status-banner.error { background: #fef2f2; color: #dc2626; border: 1px solid #ef4444; }
+        .status-banner.info { background: #eff6ff; color: #2563eb; border: 1px solid #3b82f6; }
 
         .vendedores-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 1.5rem; }
 
@@ -1,6 +1,10 @@
 export const BASE_URL = import.meta.env.PUBLIC_API_URL || 'http://127.0.0.1:8000';
 const API_URL = `${BASE_URL}/api/v1`;
 
+// Importación masiva: intervalo de consulta del avance y espera máxima mientras sigue en cola
+const IMPORT_POLL_MS = 1500;
+const IMPORT_MAX_PENDIENTE_MS = 2 * 60 * 1000;
+
 // Helper para peticiones autenticadas
 const authFetch = async (endpoint, options = {}) => {
     const isBrowser = typeof window !== 'undefined';
@@ -144,7 +148,7 @@ export const clienteService = {
         return response.json();
     },
 
-    async importMasivo(file) {
+    async importMasivo(file, onProgress = null) {
         const formData = new FormData();
         formData.append('file', file);
         const response = await authFetch('/cartera/importar-masivo/', {
@@ -155,6 +159,31 @@ export const clienteService = {
             const error = await response.json();
             throw new Error(error.detail || 'Error en la importación masiva');
         }
+
+        // La importación corre en segundo plano: consultamos su avance hasta que termine.
+        // Si ningún worker la toma (worker desactivado o caído), dejamos de esperar y lo informamos.
+        let trabajo = await response.json();
+        const enColaDesde = Date.now();
+        while (trabajo.estado === 'Pendiente' || trabajo.estado === 'Procesando') {
+            if (onProgress) onProgress(trabajo);
+            if (trabajo.estado === 'Pendiente' && Date.now() - enColaDesde > IMPORT_MAX_PENDIENTE_MS) {
+                throw new Error(
+                    `La importación #${trabajo.id_trabajo} sigue en cola: ningún proceso la ha tomado todavía. `
+                    + 'Se procesará cuando el worker de importaciones esté activo.'
+                );
+            }
+            await new Promise((resolve) => setTimeout(resolve, IMPORT_POLL_MS));
+            trabajo = await this.getImportacion(trabajo.id_trabajo);
+        }
+        if (trabajo.estado === 'Fallido') {
+            throw new Error(trabajo.errores?.join(' | ') || 'Error en la importación masiva');
+        }
+        return trabajo;
+    },
+
+    async getImportacion(idTrabajo) {
+        const response = await authFetch(`/cartera/importar-masivo/${idTrabajo}`);
+        if (!response.ok) throw new Error('Error al consultar la importación');
         return response.json();
     }
 };